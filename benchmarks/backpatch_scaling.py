@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+# Regression benchmark: compile time must grow linearly with the number of conditions.
+#
+# Compiles synthetic programs with an increasing number of if/while conditions and checks that
+# the compile time per condition of the largest program stays close to the one of the smallest.
+
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+MPPC = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'mppc.py')
+SIZES = (12500, 25000, 50000, 100000)
+MAX_SLOWDOWN = 2.0  # allowed growth of the time per condition between the smallest and largest size
+
+
+def generate_program(conditions):
+    lines = ['program scaling', '{', '    declare a, b;', '    {', '        a := 0;', '        b := 0']
+    for i in range(conditions):
+        if i % 2:
+            lines.append('        ;while (a > %d or b < %d) a := %d' % (i % 1000, i % 997, i % 100))
+        else:
+            lines.append('        ;if (a < %d and not [b = %d]) then a := %d else b := %d'
+                         % (i % 1000, i % 991, i % 100, i % 101))
+    lines += ['    }', '}']
+    return '\n'.join(lines) + '\n'
+
+
+def compile_time(directory, conditions):
+    source_path = os.path.join(directory, 'scaling%d.min' % conditions)
+    with open(source_path, 'w', encoding='utf-8') as source_file:
+        source_file.write(generate_program(conditions))
+    start = time.perf_counter()
+    subprocess.run([sys.executable, MPPC, source_path], check=True, stdout=subprocess.DEVNULL)
+    return time.perf_counter() - start
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        per_condition = list()
+        for conditions in SIZES:
+            elapsed = compile_time(directory, conditions)
+            per_condition.append(elapsed / conditions)
+            print('%7d conditions: %7.2fs  (%.1f us/condition)' % (conditions, elapsed, 1e6 * elapsed / conditions))
+    slowdown = per_condition[-1] / per_condition[0]
+    print('slowdown per condition: %.2fx (limit %.2fx)' % (slowdown, MAX_SLOWDOWN))
+    if slowdown > MAX_SLOWDOWN:
+        print('FAIL: compile time grows faster than linearly')
+        sys.exit(1)
+    print('OK')
+
+
+if __name__ == '__main__':
+    main()
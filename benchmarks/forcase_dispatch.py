@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+# Dispatch benchmark: MIPS instructions MARS executes for forcase statements of 4, 16 and 64 arms.
+#
+# Every arm compares one variable with a constant, densely packed (0, 1, 2 ...) or sparse (0, 37, 74 ...).
+# Each program is compiled at -O 1 twice in process, once with the linear chain of conditions and once with the
+# jump table or binary search dispatch, and run with MARS, which counts the basic instructions executed.
+# Both runs must print the same sum. Needs java and the MARS jar, given with --mars or MARS_JAR.
+#
+# Usage: forcase_dispatch.py [--mars Mars.jar] [--iterations N]
+
+import argparse
+import contextlib
+import io
+import os
+import subprocess
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import mppc  # noqa: E402
+
+ARMS = (4, 16, 64)
+ITERATIONS = 1000
+SPARSE_STEP = 37
+
+
+# A forcase of arms arms run for iterations values of x, every arm and the default taken in turn.
+def generate_program(arms, step, iterations):
+    when = ['                when (x = %d) : { s := s + %d; x := 32000 }' % (i * step, i + 1) for i in range(arms)]
+    return '\n'.join(['program dispatch', '{', '    declare i, x, s;', '    {',
+                      '        i := 0;', '        s := 0;',
+                      '        while (i < %d)' % iterations, '        {',
+                      '            x := (i - (i / %d) * %d) * %d;' % (arms + 1, arms + 1, step),
+                      '            forcase'] + when +
+                     ['            default: s := s + 0;', '            i := i + 1', '        };',
+                      '        print(s)', '    }', '}']) + '\n'
+
+
+def compile_asm(source, dispatch):
+    saved = mppc.min_dispatch_arms
+    mppc.min_dispatch_arms = saved if dispatch else float('inf')
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            return mppc.Compiler(optimization_level=1).compile(source, 'dispatch.min').get_asm_code()
+    finally:
+        mppc.min_dispatch_arms = saved
+
+
+# What the program printed and the number of instructions MARS executed, the last line of its output with ic.
+def run_mars(mars, asm_code):
+    with tempfile.TemporaryDirectory() as directory:
+        asm_filepath = os.path.join(directory, 'dispatch.asm')
+        with open(asm_filepath, 'w', encoding='utf-8') as outfile:
+            outfile.write(asm_code)
+        output = subprocess.run(['java', '-jar', mars, 'nc', 'ic', asm_filepath], stdout=subprocess.PIPE,
+                                universal_newlines=True, check=True).stdout
+    lines = [line for line in output.splitlines() if line.strip()]
+    return lines[0], int(lines[-1].split()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Count the instructions MARS executes for forcase dispatch.')
+    parser.add_argument('--mars', default=os.environ.get('MARS_JAR', 'Mars.jar'),
+                        help='MARS jar (default: $MARS_JAR or Mars.jar)')
+    parser.add_argument('--iterations', type=int, default=ITERATIONS,
+                        help='values dispatched on by every program (default: %(default)s)')
+    args = parser.parse_args()
+    if not os.path.exists(args.mars):
+        parser.error('MARS jar \'%s\' not found, pass it with --mars or MARS_JAR' % args.mars)
+
+    print('%-7s %5s %14s %14s %9s' % ('layout', 'arms', 'linear', 'dispatch', 'speedup'))
+    failed = False
+    for layout, step in (('dense', 1), ('sparse', SPARSE_STEP)):
+        for arms in ARMS:
+            source = generate_program(arms, step, args.iterations)
+            linear_output, linear = run_mars(args.mars, compile_asm(source, False))
+            dispatch_output, dispatch = run_mars(args.mars, compile_asm(source, True))
+            print('%-7s %5d %14d %14d %8.2fx' % (layout, arms, linear, dispatch, linear / dispatch))
+            if linear_output != dispatch_output:
+                print('FAIL: the dispatch printed %s instead of %s' % (dispatch_output, linear_output))
+                failed = True
+    if failed:
+        sys.exit(1)
+    print('OK')
+
+
+if __name__ == '__main__':
+    main()
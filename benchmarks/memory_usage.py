@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+# Memory benchmark: bytes held per quad, token and symbol table entity, and peak memory of a large compilation.
+#
+# Quads, tokens and entities are allocated once per program element, so their size bounds the memory
+# of large programs. tracemalloc measures the objects directly and the peak of one in-process compilation
+# of a synthetic program, and the benchmark fails if any object grows past its limit.
+
+import contextlib
+import io
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lexer_token import Token, TokenType  # noqa: E402
+from mppc import Compiler  # noqa: E402
+from quad import Quad  # noqa: E402
+from symbol_table import Variable  # noqa: E402
+
+OBJECTS = 100000
+STATEMENTS = 50000
+MAX_BYTES = {'Quad': 80, 'Token': 72, 'Variable': 64}  # allowed bytes per object
+
+
+def generate_program(statements):
+    variables = ['v%d' % i for i in range(50)]
+    lines = ['program memory', '{', '    declare %s;' % ', '.join(variables), '    {', '        v0 := 1']
+    for i in range(statements):
+        target, source = variables[i % 50], variables[(i * 7) % 50]
+        if i % 3:
+            lines.append('        ;%s := %s + %d * %s' % (target, source, i % 100, variables[(i * 13) % 50]))
+        else:
+            lines.append('        ;if (%s < %d) then %s := %s - 1' % (source, i % 1000, target, target))
+    lines += ['    }', '}']
+    return '\n'.join(lines) + '\n'
+
+
+# Bytes allocated per object by make(), measured over OBJECTS live objects.
+def bytes_per_object(make):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    objects = [make() for _ in range(OBJECTS)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    list_bytes = sys.getsizeof(objects)
+    del objects
+    return (after - before - list_bytes) / OBJECTS
+
+
+def main():
+    # the fields are shared objects so only the objects themselves are measured
+    sizes = {'Quad': bytes_per_object(lambda: Quad(0, '+', 'a', 'b', 'T_1')),
+             'Token': bytes_per_object(lambda: Token(TokenType.ID_TK, 'a', 1, 1)),
+             'Variable': bytes_per_object(lambda: Variable('a', 12))}
+    failed = False
+    for name, size in sizes.items():
+        print('%-9s %6.1f bytes/object (limit %d)' % (name, size, MAX_BYTES[name]))
+        failed = failed or size > MAX_BYTES[name]
+
+    source = generate_program(STATEMENTS)
+    compiler = Compiler()
+    tracemalloc.start()
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = compiler.compile(source, 'memory.min')
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    quads = result.get_intermediate_code().count('\n')
+    print('%d statements, %d quads: peak %.1f MiB (%.0f bytes/quad)' % (STATEMENTS, quads, peak / 2 ** 20, peak / quads))
+    if failed:
+        print('FAIL: an object takes more memory than its limit')
+        sys.exit(1)
+    print('OK')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+# Synthetic minimal++ program generator for the benchmarks.
+#
+# Every program is valid and runs to its end: loops count down a counter variable no other statement writes,
+# subprograms only call the subprograms declared before them and no value can overflow, because every
+# variable starts at 0, operands are at most MAX_OPERAND and multiplied by small constants only, and every
+# stored value is divided back into that range. The same parameters and seed always give the same program.
+# Loops nest and call subprograms that loop too, so the run time of a program grows exponentially with the
+# nesting, the benchmarks only compile them.
+#
+# Usage: program_generator.py [--statements N] [--depth N] ... > program.min
+
+import argparse
+import random
+
+DEFAULTS = {'statements': 1000, 'depth': 2, 'subprograms': 2, 'subprogram_depth': 1, 'declarations': 4,
+            'expression_length': 3, 'seed': 0}
+LOOP_COUNT = 3  # iterations of every generated loop
+MAX_OPERAND = 99
+MAX_FACTOR = 3
+
+
+class ProgramGenerator:
+    # statements: statements of the whole program, spread over the main program and every subprogram
+    # depth: deepest nesting of if, while and forcase statements
+    # subprograms: subprograms declared in every scope that declares some
+    # subprogram_depth: deepest nesting of subprogram declarations, 0 for none
+    # declarations: variables declared in every scope, besides the loop counters
+    # expression_length: operands of every expression
+    def __init__(self, statements=1000, depth=2, subprograms=2, subprogram_depth=1, declarations=4,
+                 expression_length=3, seed=0):
+        self.__depth = depth
+        self.__subprograms = subprograms
+        self.__subprogram_depth = subprogram_depth
+        self.__declarations = max(1, declarations)
+        self.__expression_length = max(1, expression_length)
+        self.__random = random.Random(seed)
+        self.__next_name = 0
+        blocks = 1 + sum(subprograms ** level for level in range(1, subprogram_depth + 1))
+        self.__block_statements = max(1, statements // blocks)
+
+    def __name(self, prefix):
+        self.__next_name += 1
+        return '%s%d' % (prefix, self.__next_name)
+
+    def program(self):
+        lines = ['program bench', '{']
+        lines += self.__block(1, 0, [], [], [])
+        lines.append('}')
+        return '\n'.join(lines) + '\n'
+
+    # Declarations, subprograms and statements of a block at subprogram nesting level.
+    # variables are the variables visible from the enclosing scopes, callables the subprograms callable from
+    # the block as (name, parameter modes, is function). A function body ends with a return statement.
+    def __block(self, indent, level, variables, callables, parameters, is_function=False):
+        pad = '    ' * indent
+        local_variables = [self.__name('v') for _ in range(self.__declarations)]
+        counters = ['c%d' % depth for depth in range(self.__depth)]
+        lines = ['%sdeclare %s;' % (pad, ', '.join(local_variables + counters))]
+        variables = variables + parameters + local_variables
+        callables = list(callables)
+        if level < self.__subprogram_depth:
+            for _ in range(self.__subprograms):
+                subprogram_lines, subprogram = self.__subprogram(indent, level + 1, variables, callables)
+                lines += subprogram_lines
+                callables.append(subprogram)
+        # subprogram frames are not cleared, so locals start as whatever the last frame there left
+        body = ['%s%s := 0' % ('    ' * (indent + 2), variable) for variable in local_variables + counters]
+        body += self.__statements(self.__block_statements, indent + 2, 0, variables, counters, callables)
+        if is_function:
+            body.append('%sreturn %s' % ('    ' * (indent + 2), self.__value(variables + counters, callables)))
+        lines += ['%s{' % pad] + [';\n'.join(body)] + ['%s}' % pad]
+        return lines
+
+    def __subprogram(self, indent, level, variables, callables):
+        pad = '    ' * indent
+        is_function = self.__random.random() < 0.5
+        name = self.__name('f' if is_function else 'p')
+        modes = [self.__random.choice(('in', 'inout')) for _ in range(self.__random.randint(0, 2))]
+        parameters = [self.__name('a') for _ in modes]
+        lines = ['%s%s %s(%s)' % (pad, 'function' if is_function else 'procedure', name,
+                                  ', '.join('%s %s' % (mode, parameter) for mode, parameter in zip(modes, parameters))),
+                 '%s{' % pad]
+        lines += self.__block(indent + 1, level, variables, callables, parameters, is_function)
+        lines.append('%s}' % pad)
+        return lines, (name, modes, is_function)
+
+    # count statements at indent, nested depth statements deep, as lines without their separating ';'.
+    def __statements(self, count, indent, depth, variables, counters, callables):
+        pad = '    ' * indent
+        statements = list()
+        while count > 0:
+            kind = self.__random.random()
+            if depth < self.__depth and count >= 3 and kind < 0.3:
+                nested = self.__random.randint(1, min(count - 1, 6))
+                statements.append(self.__compound(nested, indent, depth, variables, counters, callables))
+                count -= nested + 1
+                continue
+            readable = variables + counters
+            procedures = [callable for callable in callables if not callable[2]]
+            if kind < 0.4:
+                statements.append('%sprint(%s)' % (pad, self.__expression(readable, callables)))
+            elif kind < 0.5 and procedures:
+                name, modes, _ = self.__random.choice(procedures)
+                statements.append('%scall %s(%s)' % (pad, name, self.__arguments(modes, variables)))
+            else:
+                statements.append('%s%s := %s' % (pad, self.__random.choice(variables),
+                                                  self.__value(readable, callables)))
+            count -= 1
+        return statements
+
+    def __compound(self, count, indent, depth, variables, counters, callables):
+        pad = '    ' * indent
+        inner = '    ' * (indent + 1)
+        counter = counters[depth]
+        kind = self.__random.choice(('if', 'while', 'forcase'))
+        if kind == 'if':
+            then_count = max(1, count // 2)
+            then_part = self.__statements(then_count, indent + 1, depth + 1, variables, counters, callables)
+            text = '%sif (%s) then\n%s{\n%s\n%s}' % (pad, self.__condition(variables + counters, callables), pad,
+                                                   ';\n'.join(then_part), pad)
+            if count > then_count:
+                else_part = self.__statements(count - then_count, indent + 1, depth + 1, variables, counters, callables)
+                text += '\n%selse\n%s{\n%s\n%s}' % (pad, pad, ';\n'.join(else_part), pad)
+            return text
+        body = ['%s%s := %s - 1' % (inner, counter, counter)]
+        body += self.__statements(count, indent + 1, depth + 1, variables, counters, callables)
+        if kind == 'while':
+            return '%s%s := %d;\n%swhile (%s > 0 and %s)\n%s{\n%s\n%s}' % (
+                pad, counter, LOOP_COUNT, pad, counter, self.__condition(variables + counters, callables), pad,
+                ';\n'.join(body), pad)
+        # every arm counts down the same counter, so the forcase leaves through default
+        return '%s%s := %d;\n%sforcase\n%s    when (%s > 0 and %s) :\n%s{\n%s\n%s}\n%sdefault: %s := 0' % (
+            pad, counter, LOOP_COUNT, pad, pad, counter, self.__condition(variables + counters, callables), inner,
+            ';\n'.join(body), inner, pad, counter)
+
+    def __condition(self, readable, callables):
+        operator = self.__random.choice(('<', '<=', '>', '>=', '=', '<>'))
+        condition = '%s %s %s' % (self.__expression(readable, callables, 2), operator,
+                                  self.__expression(readable, callables, 2))
+        if self.__random.random() < 0.2:
+            condition = 'not [%s]' % condition
+        return condition
+
+    # Operands joined by +, - and * by a constant, at most expression_length * MAX_FACTOR * MAX_OPERAND.
+    def __expression(self, readable, callables, length=None):
+        length = length or self.__expression_length
+        functions = [callable for callable in callables if callable[2]]
+        expression = ''
+        multiplied = True  # no operator before the first operand
+        for _ in range(length):
+            kind = self.__random.random()
+            if kind < 0.05 and functions:
+                name, modes, _ = self.__random.choice(functions)
+                writable = [variable for variable in readable if not variable.startswith('c')]
+                operand = '%s(%s)' % (name, self.__arguments(modes, writable))
+            elif kind < 0.55:
+                operand = self.__random.choice(readable)
+            else:
+                operand = str(self.__random.randint(0, MAX_OPERAND))
+            if not expression:
+                expression = operand
+                continue
+            operator = self.__random.choice(('+', '-', '*') if not multiplied else ('+', '-'))
+            if operator == '*':
+                operand = str(self.__random.randint(0, MAX_FACTOR))
+            expression = '%s %s %s' % (expression, operator, operand)
+            multiplied = operator == '*'
+        return expression
+
+    # An expression divided back to at most MAX_OPERAND, for values that are stored.
+    def __value(self, readable, callables):
+        return '(%s) / %d' % (self.__expression(readable, callables), self.__expression_length * MAX_FACTOR)
+
+    # Actual parameters for modes: an operand for every 'in' and a variable no loop counts with for every 'inout'.
+    # Calls are left out of the arguments, the MIPS backend cannot pass the parameters of nested calls.
+    def __arguments(self, modes, variables):
+        arguments = list()
+        for mode in modes:
+            if mode == 'in':
+                arguments.append('in ' + self.__expression(variables, [], 1))
+            else:
+                arguments.append('inout ' + self.__random.choice(variables))
+        return ', '.join(arguments)
+
+
+def generate_program(**parameters):
+    return ProgramGenerator(**parameters).program()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Print a synthetic minimal++ program.')
+    for parameter, default in DEFAULTS.items():
+        parser.add_argument('--' + parameter.replace('_', '-'), type=int, default=default,
+                            help='(default: %(default)s)')
+    args = parser.parse_args()
+    print(generate_program(**vars(args)), end='')
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+# Benchmark runner: compile synthetic programs of growing size and shape and compare with a stored baseline.
+#
+# Every case is a program of program_generator.py compiled in process. The best compile time of REPEAT
+# compilations, the peak memory of one more compilation traced by tracemalloc and the size of the .int, .c and
+# .asm output are compared with the baseline of the same optimization level, and the runner fails if one of
+# them grew past its tolerance. Times depend on the machine, so refresh the baseline with --save after
+# changing machines or on purpose.
+#
+# Usage: run_benchmarks.py [-O LEVEL] [--cases NAME,...] [--save] [--baseline FILE]
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mppc import Compiler  # noqa: E402
+from program_generator import generate_program  # noqa: E402
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+REPEAT = 3
+# allowed growth of every measure over the baseline
+TOLERANCES = {'compile_time': 0.25, 'peak_memory': 0.10, 'output_size': 0.02}
+# case name -> program_generator parameters
+CASES = {
+    'statements-1k': dict(statements=1000),
+    'statements-4k': dict(statements=4000),
+    'statements-16k': dict(statements=16000),
+    'nested-statements': dict(statements=4000, depth=8),
+    'many-subprograms': dict(statements=4000, subprograms=4, subprogram_depth=2),
+    'nested-subprograms': dict(statements=4000, subprograms=1, subprogram_depth=10),
+    'wide-scopes': dict(statements=4000, declarations=200),
+    'long-expressions': dict(statements=2000, expression_length=24),
+}
+
+
+def measure(source, optimization_level):
+    compiler = Compiler(optimization_level=optimization_level)
+    times = list()
+    for _ in range(REPEAT):
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            result = compiler.compile(source, 'benchmark.min')
+            times.append(time.perf_counter() - start)
+    tracemalloc.start()
+    with contextlib.redirect_stdout(io.StringIO()):
+        compiler.compile(source, 'benchmark.min')
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    output_size = sum(len(code) for code in (result.get_intermediate_code(), result.get_c_code() or '',
+                                             result.get_asm_code()))
+    return {'compile_time': min(times), 'peak_memory': peak, 'output_size': output_size,
+            'quads': len(result.get_quads())}
+
+
+def load_baseline(filepath):
+    if not os.path.exists(filepath):
+        return {'levels': dict()}
+    with open(filepath, 'r', encoding='utf-8') as infile:
+        return json.load(infile)
+
+
+# The measures of results that grew past their tolerance over baseline, as (case, measure, growth).
+def regressions(results, baseline):
+    found = list()
+    for case, measures in results.items():
+        for measure_name, tolerance in TOLERANCES.items():
+            expected = baseline.get(case, dict()).get(measure_name)
+            if expected and measures[measure_name] > expected * (1 + tolerance):
+                found.append((case, measure_name, measures[measure_name] / expected - 1))
+    return found
+
+
+def growth(value, expected):
+    return '%+6.1f%%' % (100.0 * (value / expected - 1)) if expected else '     - '
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compile synthetic programs and compare with a stored baseline.')
+    parser.add_argument('-O', '--optimize', type=int, choices=(0, 1, 2), default=0, metavar='LEVEL',
+                        help='optimization level of the compilations (default: 0)')
+    parser.add_argument('--cases', help='comma separated cases to run (default: all of %s)' % ', '.join(CASES))
+    parser.add_argument('--baseline', default=BASELINE, help='baseline file (default: %(default)s)')
+    parser.add_argument('--save', action='store_true', help='store the results as the baseline of this level')
+    args = parser.parse_args()
+    cases = args.cases.split(',') if args.cases else list(CASES)
+    for case in cases:
+        if case not in CASES:
+            parser.error('unknown case \'%s\'' % case)
+
+    stored = load_baseline(args.baseline)
+    baseline = stored['levels'].get(str(args.optimize), dict())
+    results = dict()
+    print('%-20s %9s %10s %15s %15s %15s' % ('case', 'source', 'quads', 'compile time', 'peak memory', 'output'))
+    for case in cases:
+        source = generate_program(**CASES[case])
+        results[case] = measure(source, args.optimize)
+        measures, expected = results[case], baseline.get(case, dict())
+        print('%-20s %7.0fKB %10d %7.3fs %s %5.1fMB %s %6.0fKB %s'
+              % (case, len(source) / 1000, measures['quads'], measures['compile_time'],
+                 growth(measures['compile_time'], expected.get('compile_time')), measures['peak_memory'] / 2 ** 20,
+                 growth(measures['peak_memory'], expected.get('peak_memory')), measures['output_size'] / 1000,
+                 growth(measures['output_size'], expected.get('output_size'))))
+
+    if args.save:
+        stored['levels'].setdefault(str(args.optimize), dict()).update(results)
+        with open(args.baseline, 'w', encoding='utf-8') as outfile:
+            json.dump(stored, outfile, indent=1, sort_keys=True)
+            outfile.write('\n')
+        print('Baseline of level %d saved to %s' % (args.optimize, args.baseline))
+        return
+    found = regressions(results, baseline)
+    for case, measure_name, grown in found:
+        print('REGRESSION: %s %s grew by %.1f%% (tolerance %.0f%%)'
+              % (case, measure_name, 100 * grown, 100 * TOLERANCES[measure_name]))
+    if found:
+        sys.exit(1)
+    print('OK' if baseline else 'No baseline for level %d, run with --save to store one' % args.optimize)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+# Memory benchmark: peak memory of --stream must follow the largest subprogram, not the whole program.
+#
+# Compiles programs of an increasing number of equally sized subprograms with and without streaming, measuring
+# the peak of every in-process compilation with tracemalloc, and fails if the streamed peak of the largest
+# program grew past a fraction of the peak without streaming. The source text and its line index stay in memory
+# either way, so the streamed peak still grows a little with the program.
+
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mppc import Compiler, compile_to_files  # noqa: E402
+from program_generator import generate_program  # noqa: E402
+
+SUBPROGRAMS = (10, 40, 160)
+STATEMENTS = 200  # statements of every subprogram and of the main program
+MAX_RATIO = 0.15  # allowed streamed peak of the largest program over its peak without streaming
+
+
+def peak_memory(input_filename, stream):
+    compiler = Compiler()
+    tracemalloc.start()
+    with contextlib.redirect_stdout(io.StringIO()):
+        compile_to_files(compiler, input_filename, stream=stream)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        input_filename = os.path.join(directory, 'streaming.min')
+        for subprograms in SUBPROGRAMS:
+            with open(input_filename, 'w', encoding='utf-8') as outfile:
+                outfile.write(generate_program(statements=STATEMENTS * (subprograms + 1), subprograms=subprograms,
+                                               subprogram_depth=1))
+            whole, streamed = peak_memory(input_filename, False), peak_memory(input_filename, True)
+            print('%4d subprograms: peak %6.1f MiB, streamed %5.1f MiB (%.0f%%)'
+                  % (subprograms, whole / 2 ** 20, streamed / 2 ** 20, 100.0 * streamed / whole))
+    if streamed > whole * MAX_RATIO:
+        print('FAIL: the streamed peak is over %.0f%% of the peak without streaming' % (100 * MAX_RATIO))
+        sys.exit(1)
+    print('OK')
+
+
+if __name__ == '__main__':
+    main()
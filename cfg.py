@@ -0,0 +1,260 @@
+# This file holds the classes needed to build the control flow graph of a subprogram's quads.
+# The quads of one block (begin_block ... end_block) are split into basic blocks at the labels set by
+# backpatch() and after every jump, then linked with successor and predecessor edges.
+
+relational_operators = ('=', '<>', '<', '<=', '>', '>=')
+
+
+# True if quad may transfer control to the label in its z field.
+def is_jump(quad):
+    return quad.get_op() == 'jump' or quad.get_op() in relational_operators
+
+
+# Quads following every table quad of quads by its label: its entries, then the quad reached when the value
+# is out of range.
+def jump_tables(quads):
+    tables = dict()
+    for i, quad in enumerate(quads):
+        if quad.get_op() == 'table':
+            tables[quad.get_label()] = quads[i + 1:i + 2 + int(quad.get_z())]
+    return tables
+
+
+# Labels jumped to from inside quads. Control flow merges at these labels.
+def jump_targets(quads):
+    targets = set()
+    for quad in quads:
+        if is_jump(quad) and isinstance(quad.get_z(), int):
+            targets.add(quad.get_z())
+    return targets
+
+
+class BasicBlock:
+    def __init__(self, index, quads):
+        self.__index = index  # position in the graph's blocks list, blocks are kept in quad order
+        self.__quads = quads
+        self.__successors = list()
+        self.__predecessors = list()
+
+    def get_index(self):
+        return self.__index
+
+    def get_quads(self):
+        return self.__quads
+
+    def get_first_label(self):
+        return self.__quads[0].get_label()
+
+    def get_last_quad(self):
+        return self.__quads[-1]
+
+    def get_successors(self):
+        return self.__successors
+
+    def get_predecessors(self):
+        return self.__predecessors
+
+    def add_successor(self, block):
+        if block not in self.__successors:
+            self.__successors.append(block)
+            block.__predecessors.append(self)
+
+    def __str__(self):
+        return 'B' + str(self.__index) + ' [' + str(self.get_first_label()) + '..' + str(
+            self.get_last_quad().get_label()) + '] -> ' + ', '.join('B' + str(block.get_index()) for block in self.__successors)
+
+
+class Loop:
+    def __init__(self, header, blocks):
+        self.__header = header  # the block every back edge of the loop jumps to
+        self.__blocks = blocks  # set of the blocks in the loop body, header included
+        self.__parent = None  # innermost loop containing this one
+
+    def get_header(self):
+        return self.__header
+
+    def get_blocks(self):
+        return self.__blocks
+
+    def get_parent(self):
+        return self.__parent
+
+    def set_parent(self, parent):
+        self.__parent = parent
+
+    def get_depth(self):
+        depth = 1
+        loop = self.__parent
+        while loop is not None:
+            depth += 1
+            loop = loop.get_parent()
+        return depth
+
+
+class ControlFlowGraph:
+    # Build the graph in time linear to the number of quads.
+    def __init__(self, quads):
+        self.__blocks = list()
+        self.__block_of_label = dict()  # label of any quad -> its basic block
+        self.__immediate_dominators = None  # computed on the first dominator query
+        self.__loops = None  # computed on the first loop query
+        targets = jump_targets(quads)
+        current = list()
+        for quad in quads:
+            if current and quad.get_label() in targets:
+                self.__add_block(current)
+                current = list()
+            current.append(quad)
+            if is_jump(quad) or quad.get_op() in ('halt', 'table'):
+                self.__add_block(current)
+                current = list()
+        if current:
+            self.__add_block(current)
+        for block, following in zip(self.__blocks, self.__blocks[1:] + [None]):
+            last_quad = block.get_last_quad()
+            if last_quad.get_op() == 'table':
+                # every entry is a jump and so a block of its own, as is the quad after them
+                for successor in self.__blocks[block.get_index() + 1:block.get_index() + 2 + int(last_quad.get_z())]:
+                    block.add_successor(successor)
+                continue
+            if is_jump(last_quad):
+                target = self.__block_of_label.get(last_quad.get_z())
+                if target is not None:  # jumps still waiting for backpatch() lead nowhere
+                    block.add_successor(target)
+            if following is not None and last_quad.get_op() not in ('jump', 'halt'):
+                block.add_successor(following)
+
+    def __add_block(self, quads):
+        block = BasicBlock(len(self.__blocks), quads)
+        self.__blocks.append(block)
+        for quad in quads:
+            self.__block_of_label[quad.get_label()] = block
+
+    def get_blocks(self):
+        return self.__blocks
+
+    def get_entry(self):
+        return self.__blocks[0]
+
+    def get_block_of_label(self, label):
+        return self.__block_of_label.get(label)
+
+    # Blocks reachable from the entry in reverse postorder.
+    def reverse_postorder(self):
+        order = list()
+        visited = {self.get_entry()}
+        stack = [(self.get_entry(), iter(self.get_entry().get_successors()))]
+        while stack:
+            block, successors = stack[-1]
+            for successor in successors:
+                if successor not in visited:
+                    visited.add(successor)
+                    stack.append((successor, iter(successor.get_successors())))
+                    break
+            else:
+                stack.pop()
+                order.append(block)
+        order.reverse()
+        return order
+
+    def reachable_blocks(self):
+        return set(self.reverse_postorder())
+
+    ##############################################################
+    #                         Dominators                         #
+    ##############################################################
+    # Cooper, Harvey and Kennedy iterative algorithm. Converges in a couple of passes on the reducible
+    # graphs the structured statements of minimal++ produce.
+    def __compute_dominators(self):
+        order = self.reverse_postorder()
+        position = {block: i for i, block in enumerate(order)}
+        entry = self.get_entry()
+        idom = {entry: entry}
+
+        def intersect(block_1, block_2):
+            while block_1 is not block_2:
+                while position[block_1] > position[block_2]:
+                    block_1 = idom[block_1]
+                while position[block_2] > position[block_1]:
+                    block_2 = idom[block_2]
+            return block_1
+
+        changed = True
+        while changed:
+            changed = False
+            for block in order[1:]:
+                new_idom = None
+                for predecessor in block.get_predecessors():
+                    if predecessor in idom:
+                        new_idom = predecessor if new_idom is None else intersect(predecessor, new_idom)
+                if idom.get(block) is not new_idom:
+                    idom[block] = new_idom
+                    changed = True
+        self.__immediate_dominators = idom
+
+    # Immediate dominator of block, None for the entry and for unreachable blocks.
+    def get_immediate_dominator(self, block):
+        if self.__immediate_dominators is None:
+            self.__compute_dominators()
+        if block is self.get_entry():
+            return None
+        return self.__immediate_dominators.get(block)
+
+    # True if every path from the entry to block_2 goes through block_1.
+    def dominates(self, block_1, block_2):
+        if self.__immediate_dominators is None:
+            self.__compute_dominators()
+        if block_2 not in self.__immediate_dominators:
+            return False
+        while block_2 is not block_1:
+            if block_2 is self.get_entry():
+                return False
+            block_2 = self.__immediate_dominators[block_2]
+        return True
+
+    ##############################################################
+    #                       Loop nesting                         #
+    ##############################################################
+    # Natural loops: an edge to a block dominating its source is a back edge, and the loop body is every
+    # block that reaches the back edge without passing through the header. Back edges sharing a header
+    # form one loop.
+    def __compute_loops(self):
+        bodies = dict()  # header -> set of blocks
+        for block in self.reverse_postorder():
+            for successor in block.get_successors():
+                if self.dominates(successor, block):
+                    body = bodies.setdefault(successor, {successor})
+                    stack = [block]
+                    while stack:
+                        member = stack.pop()
+                        if member not in body:
+                            body.add(member)
+                            stack.extend(member.get_predecessors())
+        loops = [Loop(header, body) for header, body in bodies.items()]
+        loops.sort(key=lambda loop: len(loop.get_blocks()))  # inner loops first
+        for i, loop in enumerate(loops):
+            for outer in loops[i + 1:]:
+                if loop.get_header() in outer.get_blocks():
+                    loop.set_parent(outer)
+                    break
+        self.__loops = loops
+
+    def get_loops(self):
+        if self.__loops is None:
+            self.__compute_loops()
+        return self.__loops
+
+    # Innermost loop containing block or None.
+    def get_innermost_loop(self, block):
+        for loop in self.get_loops():
+            if block in loop.get_blocks():
+                return loop
+        return None
+
+    # Number of loops block is nested in, 0 outside any loop.
+    def get_loop_depth(self, block):
+        loop = self.get_innermost_loop(block)
+        return 0 if loop is None else loop.get_depth()
+
+    def __str__(self):
+        return '\n'.join(str(block) for block in self.__blocks)
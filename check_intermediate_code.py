@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+# Round trip check of the intermediate code: .int text -> quads -> .intb -> quads -> .int text.
+#
+# Every tests/*.int file and two forcase programs compiled at -O 1 are parsed, packed and unpacked. The labels,
+# operators and the value and type of every operand must survive both steps, and writing the quads back must
+# give the original text byte for byte. The forcase programs are dispatched with a table quad, whose y and z are
+# integers; the second one has jump targets past 32767, so its .intb file must switch to 32 bit operands.
+#
+# Usage: check_intermediate_code.py [file.int ...]
+
+import contextlib
+import glob
+import io
+import os
+import sys
+
+from intermediate_code import parse_intermediate_code, intermediate_code_to_binary, binary_to_intermediate_code
+from mppc import Compiler
+from quad import Opcode
+
+FORCASE_ARMS = 8
+LONG_STATEMENTS = 17000  # statements before the forcase of the long program, two quads each
+WIDTH_OFFSET = 5  # offset of the operand width in the .intb header
+
+
+# A forcase of densely packed constants after statements assignments, read from the input so -O 1 keeps them.
+def forcase_program(statements):
+    when = ['        when (x = %d) : s := s + %d' % (i, i + 1) for i in range(FORCASE_ARMS)]
+    return '\n'.join(['program roundtrip', '{', '    declare x, s;', '    {', '        input(x);', '        s := 0;'] +
+                     ['        s := s + x;'] * statements +
+                     ['        forcase'] + when +
+                     ['        default: s := s + 0;', '        print(s)', '    }', '}']) + '\n'
+
+
+def compile_intermediate_code(source):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return Compiler(optimization_level=1).compile(source, 'roundtrip.min').get_intermediate_code()
+
+
+def fields(quad):
+    values = (quad.get_x(), quad.get_y(), quad.get_z())
+    return (quad.get_label(), quad.get_op()) + values + tuple(type(value) for value in values)
+
+
+# The problems found in the round trip of text, empty if there are none.
+def check(name, text, width=None):
+    problems = list()
+    quads = parse_intermediate_code(text, name)
+    if ''.join(quad.quad_to_file() for quad in quads) != text:
+        problems.append('%s: the parsed quads do not write back the same text' % name)
+    data = intermediate_code_to_binary(quads)
+    if width is not None and data[WIDTH_OFFSET] != width:
+        problems.append('%s: %d bit operands instead of %d' % (name, 8 * data[WIDTH_OFFSET], 8 * width))
+    unpacked = binary_to_intermediate_code(data, name)
+    if len(unpacked) != len(quads):
+        problems.append('%s: %d quads unpacked instead of %d' % (name, len(unpacked), len(quads)))
+    for quad, unpacked_quad in zip(quads, unpacked):
+        if fields(quad) != fields(unpacked_quad):
+            problems.append('%s: quad %s unpacked as %s' % (name, fields(quad), fields(unpacked_quad)))
+            break
+    if ''.join(quad.quad_to_file() for quad in unpacked) != text:
+        problems.append('%s: the unpacked quads do not write back the same text' % name)
+    return problems
+
+
+# The table quads of text must carry integer y and z, both parsed and unpacked.
+def check_tables(name, text):
+    quads = parse_intermediate_code(text, name)
+    for parsed in (quads, binary_to_intermediate_code(intermediate_code_to_binary(quads), name)):
+        tables = [quad for quad in parsed if quad.get_opcode() == Opcode.TABLE]
+        if not tables:
+            return ['%s: no table quad' % name]
+        if not all(isinstance(quad.get_y(), int) and isinstance(quad.get_z(), int) for quad in tables):
+            return ['%s: a table quad without integer y and z' % name]
+    return list()
+
+
+def main():
+    filepaths = sys.argv[1:] or sorted(glob.glob(os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                                              'tests', '*.int')))
+    problems = list()
+    for filepath in filepaths:
+        with open(filepath, 'r', encoding='utf-8', newline='') as infile:
+            problems.extend(check(filepath, infile.read()))
+    for name, statements, width in (('forcase', 0, 2), ('long forcase', LONG_STATEMENTS, 4)):
+        text = compile_intermediate_code(forcase_program(statements))
+        problems.extend(check(name, text, width) + check_tables(name, text))
+    print('%d .int files and 2 forcase programs checked' % len(filepaths))
+    if problems:
+        for problem in problems:
+            print('FAIL: %s' % problem)
+        sys.exit(1)
+    print('OK')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# Check of the optimizations: every program must print the same at -O 1 and -O 2 as at -O 0.
+#
+# Every tests/*.min file is compiled at the three levels in process and its quads are run with the quad
+# interpreter, as --run does, reading the same input. The interpreter runs the quads folded and cleaned up
+# at -O 1 against the frame layout of every level, whose temporaries share slots at -O 2. Register allocation
+# and the peephole rules only change the assembly, so with --mars (or MARS_JAR) the .asm code of every level
+# also runs in MARS and must print what the .asm code of -O 0 prints.
+#
+# Usage: check_optimization_levels.py [--mars Mars.jar] [file.min ...]
+
+import argparse
+import contextlib
+import glob
+import io
+import os
+import subprocess
+import sys
+import tempfile
+
+from errors import CompileError, ExecutionError
+from mppc import Compiler
+from quad_interpreter import Interpreter
+
+LEVELS = (0, 1, 2)
+INPUTS = (5, 3, 7, 2, 9, 1, 4, 6, 8, 10)  # read by the programs asking for input, in turn
+MAX_STEPS = 10 ** 7  # quads a program may run before it is taken as looping forever
+
+
+def compile_source(source, filename, level):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return Compiler(optimization_level=level).compile(source, filename)
+
+
+# What the quads of result print, and whether they stopped with an execution error.
+def run_quads(result):
+    output = list()
+    try:
+        Interpreter(result.get_quads(), result.get_frame_layout(), result.get_filename()).run(
+            INPUTS, output.append, MAX_STEPS)
+    except ExecutionError:
+        return ''.join(output), True
+    return ''.join(output), False
+
+
+# What the .asm code of result prints in MARS.
+def run_mars(mars, result):
+    with tempfile.TemporaryDirectory() as directory:
+        asm_filepath = os.path.join(directory, 'program.asm')
+        with open(asm_filepath, 'w', encoding='utf-8') as outfile:
+            outfile.write(result.get_asm_code())
+        return subprocess.run(['java', '-jar', mars, 'nc', asm_filepath], input=' '.join(map(str, INPUTS)) + '\n',
+                              stdout=subprocess.PIPE, universal_newlines=True, check=True).stdout
+
+
+# The problems found comparing the levels of the program in filepath, empty if there are none.
+def check(filepath, mars=None):
+    with open(filepath, 'r', encoding='utf-8') as infile:
+        source = infile.read()
+    problems = list()
+    outputs = dict()
+    for level in LEVELS:
+        try:
+            result = compile_source(source, filepath, level)
+        except CompileError as compile_error:
+            problems.append('%s: -O %d does not compile: %s' % (filepath, level, compile_error))
+            continue
+        outputs[level] = run_quads(result)
+        if mars is not None:
+            outputs[level] += (run_mars(mars, result),)
+    for level in LEVELS[1:]:
+        if level not in outputs or 0 not in outputs:
+            continue
+        if outputs[level][:2] != outputs[0][:2]:
+            problems.append('%s: the quads of -O %d print %r instead of %r'
+                            % (filepath, level, outputs[level][0], outputs[0][0]))
+        if mars is not None and outputs[level][2] != outputs[0][2]:
+            problems.append('%s: the .asm code of -O %d prints %r in MARS instead of %r'
+                            % (filepath, level, outputs[level][2], outputs[0][2]))
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Check that -O 1 and -O 2 programs print what -O 0 prints.')
+    parser.add_argument('infile', nargs='*', help='minimal++ source files (default: tests/*.min)')
+    parser.add_argument('--mars', default=os.environ.get('MARS_JAR'),
+                        help='MARS jar to also run the .asm code with (default: $MARS_JAR)')
+    args = parser.parse_args()
+    if args.mars is not None and not os.path.exists(args.mars):
+        parser.error('MARS jar \'%s\' not found' % args.mars)
+
+    filepaths = args.infile or sorted(glob.glob(os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                                             'tests', '*.min')))
+    problems = list()
+    for filepath in filepaths:
+        problems.extend(check(filepath, args.mars))
+    print('%d programs checked at -O %s%s' % (len(filepaths), ', '.join(map(str, LEVELS)),
+                                              ' with MARS' if args.mars is not None else ''))
+    if problems:
+        for problem in problems:
+            print('FAIL: %s' % problem)
+        sys.exit(1)
+    print('OK')
+
+
+if __name__ == '__main__':
+    main()
@@ -10,6 +10,8 @@ if [[  $input =~ ^[Y]$ ]]
 then
 # Do dangerous stuff
 find ./tests -name "*.int" -type f -delete
+find ./tests -name "*.intb" -type f -delete
+find ./tests -name "*.layout" -type f -delete
 find ./tests -name "*.c" -type f -delete
 find . -name "*.out" -type f -delete
 find ./tests -name "*.out" -type f -delete
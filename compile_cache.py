@@ -0,0 +1,96 @@
+# This file holds the on-disk cache of compilation results.
+# An entry is keyed by a hash of the source bytes, the compiler's own source files and the compiler options,
+# and holds every generated file and message of one compilation as JSON. Entries are evicted least recently
+# used first once the cache grows past its size limit, a hit refreshes the modification time of its entry.
+# The input path is left out of the key so copies of a source share an entry, the stored messages name the file
+# through a placeholder that is replaced with the path being compiled when a hit replays them.
+
+import hashlib
+import json
+import os
+
+default_cache_size = 256 * 2 ** 20  # bytes
+
+
+def default_cache_directory():
+    return os.path.join(os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache'), 'mppc')
+
+
+# Hash of the compiler's modules, so entries written by another version of the compiler are never used.
+def compiler_version():
+    directory = os.path.dirname(os.path.abspath(__file__))
+    digest = hashlib.sha256()
+    for filename in sorted(os.listdir(directory)):
+        if filename.endswith('.py'):
+            digest.update(filename.encode('utf-8'))
+            with open(os.path.join(directory, filename), 'rb') as module_file:
+                digest.update(module_file.read())
+    return digest.hexdigest()
+
+
+class CompileCache:
+    def __init__(self, directory, options, max_size=default_cache_size):
+        self.__directory = directory
+        self.__max_size = max_size  # bytes the entries may take before the least recently used are evicted
+        self.__size = None  # bytes taken by the entries, scanned on the first store and then kept up to date
+        # every key starts from the compiler version and the options of the compilations it caches
+        self.__key_prefix = (compiler_version() + json.dumps(options, sort_keys=True)).encode('utf-8')
+
+    def get_directory(self):
+        return self.__directory
+
+    def key(self, source):
+        return hashlib.sha256(self.__key_prefix + source).hexdigest()
+
+    def __entry_filepath(self, key):
+        return os.path.join(self.__directory, key[:2], key + '.json')
+
+    # The entry stored under key or None. Unreadable entries, eg. removed by another process, are misses.
+    def load(self, key):
+        filepath = self.__entry_filepath(key)
+        try:
+            with open(filepath, 'r', encoding='utf-8') as entry_file:
+                entry = json.load(entry_file)
+            os.utime(filepath)
+        except (OSError, ValueError):
+            return None
+        return entry
+
+    # write_file(filepath, contents) writes the entry, atomically so concurrent readers never see half of it.
+    def store(self, key, entry, write_file):
+        filepath = self.__entry_filepath(key)
+        contents = json.dumps(entry)
+        if self.__size is None:
+            self.__size = sum(size for mtime, size, entry_filepath in self.__entries())
+        os.makedirs(os.path.dirname(filepath), exist_ok=True)
+        write_file(filepath, contents)
+        self.__size += len(contents)
+        if self.__size > self.__max_size:
+            self.evict()
+
+    # (modification time, size, path) of every entry. Other processes may remove entries meanwhile.
+    def __entries(self):
+        entries = list()
+        for dirpath, dirnames, filenames in os.walk(self.__directory):
+            for filename in filenames:
+                if filename.endswith('.json'):
+                    filepath = os.path.join(dirpath, filename)
+                    try:
+                        status = os.stat(filepath)
+                    except OSError:
+                        continue
+                    entries.append((status.st_mtime, status.st_size, filepath))
+        return entries
+
+    # Remove the least recently used entries until the cache fits its size limit.
+    def evict(self):
+        entries = sorted(self.__entries())
+        self.__size = sum(size for mtime, size, filepath in entries)
+        for mtime, size, filepath in entries:
+            if self.__size <= self.__max_size:
+                break
+            try:
+                os.remove(filepath)
+            except OSError:
+                pass
+            self.__size -= size
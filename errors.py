@@ -0,0 +1,83 @@
+# This file holds the exceptions raised when a minimal++ program cannot be compiled or run.
+
+
+class CompileError(Exception):
+    def __init__(self, message, filename=None, lineno=None, charno=None, snippet=None):
+        super().__init__(message)
+        self.__message = message
+        self.__filename = filename  # input file name
+        self.__lineno = lineno  # None when the error is not bound to a source position
+        self.__charno = charno  # character number from the start of the line
+        self.__snippet = snippet  # source line the error was found in, without the trailing newline
+
+    def get_message(self):
+        return self.__message
+
+    def get_filename(self):
+        return self.__filename
+
+    def get_lineno(self):
+        return self.__lineno
+
+    def get_charno(self):
+        return self.__charno
+
+    def get_snippet(self):
+        return self.__snippet
+
+    def __str__(self):
+        if self.__lineno is None:
+            return self.__message
+        return '%s:%d:%d: %s' % (self.__filename, self.__lineno, self.__charno, self.__message)
+
+
+# Invalid characters, numbers or comments.
+class LexicalError(CompileError):
+    pass
+
+
+# The token stream does not follow the minimal++ grammar.
+class ParseError(CompileError):
+    pass
+
+
+# Undefined or redefined names, misplaced return statements and wrong subprogram calls.
+class SemanticError(CompileError):
+    pass
+
+
+# Every error found in one compilation with error recovery enabled.
+class MultipleCompileErrors(CompileError):
+    def __init__(self, errors):
+        super().__init__('%d errors' % len(errors), errors[0].get_filename())
+        self.__errors = list(errors)
+
+    def get_errors(self):
+        return self.__errors
+
+    def __str__(self):
+        return '\n'.join(str(error) for error in self.__errors)
+
+
+# A .int or .intb file that cannot be read back into quads.
+class IntermediateCodeError(CompileError):
+    pass
+
+
+# A program run by the quad interpreter that cannot go on, eg. after a division by zero.
+class ExecutionError(Exception):
+    def __init__(self, message, label=None):
+        super().__init__(message)
+        self.__message = message
+        self.__label = label  # label of the quad being executed, None before the program starts
+
+    def get_message(self):
+        return self.__message
+
+    def get_label(self):
+        return self.__label
+
+    def __str__(self):
+        if self.__label is None:
+            return self.__message
+        return 'quad %d: %s' % (self.__label, self.__message)
@@ -0,0 +1,113 @@
+# This file saves and loads the frame layout the backend needs to generate code from an intermediate code file.
+# The layout holds the entities of every scope as it was closed, before any optimization pass changed an offset,
+# and for every block the scopes it could see. Enclosing scopes only held the entities declared before the
+# block ended, so every block records how many entities of each enclosing scope were visible.
+# It also records the optimization level of the front end, whose quad passes the backend does not run again.
+# The same snapshots of the closed scopes back the --dump-symbols output.
+
+import json
+from errors import IntermediateCodeError
+from symbol_table import Scope, Argument, Variable, Function, Parameter, TemporaryVariable
+
+layout_version = 2
+
+
+def entity_to_dict(entity):
+    entity_type = entity.get_entityType()
+    if entity_type == 'Function':
+        return {'name': entity.get_name(), 'type': entity_type, 'start_quad': entity.get_startQuad(),
+                'arguments': [argument.get_parMode() for argument in entity.get_arguments_list()]}
+    if entity_type == 'Parameter':
+        return {'name': entity.get_name(), 'type': entity_type, 'mode': entity.get_parMode(),
+                'offset': entity.get_offset()}
+    return {'name': entity.get_name(), 'type': entity_type, 'offset': entity.get_offset()}
+
+
+def entity_from_dict(fields):
+    entity_type = fields['type']
+    if entity_type == 'Variable':
+        return Variable(fields['name'], fields['offset'])
+    if entity_type == 'Tempvar':
+        return TemporaryVariable(fields['name'], fields['offset'])
+    if entity_type == 'Parameter':
+        return Parameter(fields['name'], fields['mode'], fields['offset'])
+    if entity_type == 'Function':
+        function = Function(fields['name'], fields['start_quad'])
+        arguments = [Argument(mode) for mode in fields['arguments']]
+        for argument, next_argument in zip(arguments, arguments[1:]):
+            argument.set_nextArgument(next_argument)
+        for argument in arguments:
+            function.add_argument_in_list(argument)
+        return function
+    raise IntermediateCodeError('Unknown entity type \'%s\' in the frame layout.' % entity_type)
+
+
+# Rebuild the scope chain of every block, outermost scope first. Scopes are rebuilt per block but share
+# the entity objects, so a frame length set while generating one block is seen by the blocks calling it.
+def block_scopes(layout, filename='<string>'):
+    try:
+        entities = [[entity_from_dict(fields) for fields in scope['entities']] for scope in layout['scopes']]
+        chains = list()
+        for block in layout['blocks']:
+            scopes = list()
+            for scope_index, visible in block['scopes']:
+                scope = Scope(layout['scopes'][scope_index]['nesting_level'], scopes[-1] if scopes else None)
+                for entity in entities[scope_index][:visible]:
+                    scope.add_Entity(entity)
+                scopes.append(scope)
+            scopes[-1].set_current_offset(layout['scopes'][block['scopes'][-1][0]]['current_offset'])
+            chains.append((block['name'], scopes))
+        return chains
+    except (KeyError, IndexError, TypeError, ValueError):
+        raise IntermediateCodeError('Malformed frame layout.', filename)
+
+
+def layout_to_json(layout):
+    return json.dumps(layout, indent=1) + '\n'
+
+
+def load_layout(filepath):
+    with open(filepath, 'r', encoding='utf-8') as infile:
+        try:
+            layout = json.load(infile)
+        except ValueError:
+            raise IntermediateCodeError('The frame layout is not valid JSON.', filepath)
+    if not isinstance(layout, dict) or layout.get('version') != layout_version:
+        raise IntermediateCodeError('Not a frame layout of version %d.' % layout_version, filepath)
+    return layout
+
+
+# One snapshot of every scope as it was closed, in closing order: the block it belongs to, its nesting level and
+# frame length, the blocks enclosing it outermost first and its entities. Built from the layout on request only,
+# so compiling without a dump formats nothing.
+def symbol_snapshots(layout):
+    block_names = {block['scopes'][-1][0]: block['name'] for block in layout['blocks']}
+    snapshots = list()
+    for block in layout['blocks']:
+        scope = layout['scopes'][block['scopes'][-1][0]]
+        snapshots.append({'block': block['name'], 'nesting_level': scope['nesting_level'],
+                          'frame_length': scope['current_offset'],
+                          'enclosing': [block_names[scope_index] for scope_index, visible in block['scopes'][:-1]],
+                          'entities': scope['entities']})
+    return snapshots
+
+
+def symbols_to_json(layout):
+    return json.dumps(symbol_snapshots(layout), indent=1) + '\n'
+
+
+def symbols_to_text(layout):
+    lines = list()
+    for snapshot in symbol_snapshots(layout):
+        lines.append('Scope of \'%s\' (nesting level %d, frame length %d%s):'
+                     % (snapshot['block'], snapshot['nesting_level'], snapshot['frame_length'],
+                        ', enclosed by ' + ' > '.join(snapshot['enclosing']) if snapshot['enclosing'] else ''))
+        for entity in snapshot['entities']:
+            if entity['type'] == 'Function':
+                details = 'start quad %d, arguments (%s)' % (entity['start_quad'], ', '.join(entity['arguments']))
+            elif entity['type'] == 'Parameter':
+                details = '%s, offset %d' % (entity['mode'], entity['offset'])
+            else:
+                details = 'offset %d' % entity['offset']
+            lines.append('    %-10s %-16s %s' % (entity['type'], entity['name'], details))
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,116 @@
+# This file reads quads back from the intermediate code files and packs them into the binary .intb format.
+# An .intb file holds a header, a table of every distinct name and a fixed size record per quad:
+#
+#   header:   b'MINQ', version (u8), operand width (u8), number of names (u32), number of quads (u32)
+#   names:    length (u16) and utf-8 bytes of every name
+#   quads:    label (u32), opcode (u8), integer flags (u8) and the values of operands x, y and z
+#
+# Bit i of the flags is set if operand i is an integer kept as such, eg. a jump target, otherwise the value
+# is an index in the names table. The empty operand '_' is always the first name.
+# Values are 16 bit unless some value of the file does not fit, then all of them are 32 bit.
+
+import struct
+from errors import IntermediateCodeError
+from quad import Quad, Opcode, opcode_names, opcodes, is_constant
+
+intb_magic = b'MINQ'
+intb_version = 1
+intb_header = struct.Struct('<4sBBII')
+intb_name_length = struct.Struct('<H')
+intb_quads = {2: struct.Struct('<IBBhhh'), 4: struct.Struct('<IBBiii')}  # operand width -> quad record
+
+# Quads whose z field is the label jumped to
+jump_opcodes = (Opcode.JUMP, Opcode.EQUAL, Opcode.NOT_EQUAL, Opcode.LESS, Opcode.LESS_OR_EQUAL, Opcode.GREATER,
+                Opcode.GREATER_OR_EQUAL)
+
+
+# Quads of the text written by Quad.quad_to_file(), eg. '3: jump, _, _, 7'.
+def parse_intermediate_code(text, filename='<string>'):
+    quads = list()
+    for lineno, line in enumerate(text.splitlines(), 1):
+        if not line:
+            continue
+        label, separator, fields = line.partition(': ')
+        fields = fields.split(', ')
+        if not separator or len(fields) != 4 or fields[0] not in opcodes or not label.isdigit():
+            raise IntermediateCodeError('Malformed quad \'%s\'.' % line, filename, lineno, 1, line)
+        op, x, y, z = fields
+        if opcodes[op] in jump_opcodes and z.isdigit():
+            z = int(z)
+        elif opcodes[op] == Opcode.TABLE and is_constant(y) and z.isdigit():
+            y, z = int(y), int(z)
+        quads.append(Quad(int(label), op, x, y, z))
+    return quads
+
+
+def intermediate_code_to_binary(quads):
+    names = {'_': 0}  # name -> index in the names table
+
+    rows = list()
+    for quad in quads:
+        row = [quad.get_label(), quad.get_opcode(), 0]
+        for i, value in enumerate((quad.get_x(), quad.get_y(), quad.get_z())):
+            if isinstance(value, int):
+                row[2] |= 1 << i
+                row.append(value)
+            else:
+                row.append(names.setdefault(value, len(names)))
+        rows.append(row)
+    width = 2 if all(-32768 <= value <= 32767 for row in rows for value in row[3:]) else 4
+    encoded_names = [name.encode('utf-8') for name in names]
+    chunks = [intb_header.pack(intb_magic, intb_version, width, len(encoded_names), len(rows))]
+    for name in encoded_names:
+        chunks.append(intb_name_length.pack(len(name)))
+        chunks.append(name)
+    chunks.extend(intb_quads[width].pack(*row) for row in rows)
+    return b''.join(chunks)
+
+
+def binary_to_intermediate_code(data, filename='<bytes>'):
+    try:
+        magic, version, width, names_count, quads_count = intb_header.unpack_from(data)
+        if magic != intb_magic or version != intb_version or width not in intb_quads:
+            raise IntermediateCodeError('Not an .intb file of version %d.' % intb_version, filename)
+        offset = intb_header.size
+        names = list()
+        for _ in range(names_count):
+            length = intb_name_length.unpack_from(data, offset)[0]
+            offset += intb_name_length.size
+            names.append(data[offset:offset + length].decode('utf-8'))
+            offset += length
+        intb_quad = intb_quads[width]
+        if len(data) - offset != quads_count * intb_quad.size:
+            raise IntermediateCodeError('Truncated .intb file.', filename)
+        quads = list()
+        for label, opcode, integers, x, y, z in intb_quad.iter_unpack(memoryview(data)[offset:]):
+            if integers:
+                x = x if integers & 1 else names[x]
+                y = y if integers & 2 else names[y]
+                z = z if integers & 4 else names[z]
+            else:
+                x, y, z = names[x], names[y], names[z]
+            quads.append(Quad(label, opcode_names[opcode], x, y, z))
+    except (struct.error, IndexError, UnicodeDecodeError):
+        raise IntermediateCodeError('Corrupted .intb file.', filename)
+    return quads
+
+
+# Quads of an .int or .intb file, chosen by its extension.
+def load_intermediate_code(filepath):
+    if filepath.endswith('.intb'):
+        with open(filepath, 'rb') as infile:
+            return binary_to_intermediate_code(infile.read(), filepath)
+    with open(filepath, 'r', encoding='utf-8') as infile:
+        return parse_intermediate_code(infile.read(), filepath)
+
+
+# Split the quads of a whole program into the quads of every block, begin_block to end_block.
+def split_blocks(quads, filename='<string>'):
+    blocks = list()
+    for quad in quads:
+        if quad.get_opcode() == Opcode.BEGIN_BLOCK:
+            blocks.append(list())
+        if not blocks:
+            raise IntermediateCodeError('Quad %d is outside any block.' % quad.get_label(), filename)
+        blocks[-1].append(quad)
+    return blocks
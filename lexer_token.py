@@ -67,6 +67,8 @@ class TokenType:
 
 # Lexical analyzer return values to the syntax analyzer
 class Token:
+    __slots__ = ('__tk_type', '__tk_value', '__tk_lineno', '__tk_charno')
+
     def __init__(self, tk_type=None, tk_value=None, tk_lineno=None, tk_charno=None):
         self.__tk_type = tk_type  # token type
         self.__tk_value = tk_value  # token string value
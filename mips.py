@@ -0,0 +1,58 @@
+# This file holds the in-memory representation of the generated MIPS assembly.
+# The backend appends instructions and labels to a list that is optimized and then written at once.
+# Operands repeat a lot, eg. the same memory operand in every access of a variable, so they are interned.
+
+import sys
+
+
+class Instruction:
+    __slots__ = ('__op', '__args')
+
+    # eg. Instruction('lw', '$t1', '-12($sp)') => lw    $t1, -12($sp)
+    def __init__(self, op, *args):
+        self.__op = op
+        self.__args = tuple(sys.intern(str(arg)) for arg in args)  # registers, immediates, memory operands or labels
+
+    def get_op(self):
+        return self.__op
+
+    def set_op(self, op):
+        self.__op = op
+
+    def get_args(self):
+        return self.__args
+
+    def set_args(self, *args):
+        self.__args = tuple(sys.intern(str(arg)) for arg in args)
+
+    def to_text(self):
+        if not self.__args:
+            return '    ' + self.__op + '\n'
+        return '    ' + self.__op + '    ' + ', '.join(self.__args) + '\n'
+
+
+class Label:
+    __slots__ = ('__name',)
+
+    def __init__(self, name):
+        self.__name = name
+
+    def get_name(self):
+        return self.__name
+
+    def to_text(self):
+        return '\n' + self.__name + ':\n'
+
+
+class Comment:
+    __slots__ = ('__text',)
+
+    def __init__(self, text):
+        self.__text = text
+
+    def to_text(self):
+        return '# ' + self.__text + '\n\n'
+
+
+def asm_to_text(items):
+    return ''.join(item.to_text() for item in items)
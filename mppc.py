@@ -1,1356 +1,1901 @@
 #!/usr/bin/env python3
+import argparse
+import concurrent.futures
+import contextlib
+import io
 import os
 import sys
+import tempfile
+import time
+import traceback
 from symbol_table import *
-from quad import Quad
-from token import *
-from structures import tokens
+from quad import Quad, Opcode, is_constant
+from intermediate_code import intermediate_code_to_binary, load_intermediate_code, parse_intermediate_code, split_blocks
+from compile_cache import CompileCache, default_cache_directory, default_cache_size
+from frame_layout import layout_version, entity_to_dict, block_scopes, layout_to_json, load_layout, symbols_to_json, \
+    symbols_to_text
+from quad_interpreter import Interpreter
+from profiler import CompileProfile, profiles_to_json
+from cfg import jump_tables
+from optimizer import optimize_quads
+from register_allocator import allocate_registers, share_slots
+from mips import Instruction, Label, Comment, asm_to_text
+from peephole import peephole_rules as peephole_rule_names, optimize as peephole_optimize
+from lexer_token import *
+from structures import tokens, statement_keywords
+from errors import *
+
 
 ##############################################################
 #                                                            #
-#                     Global variables                       #
+#                    Compilation result                      #
 #                                                            #
 ##############################################################
-lineno = 1  # Current line number
-charno = 0  # Current Character number from the start of the line
-token = Token()  # Each token returned from the lexical analyzer will be stored here
-infile = ''  # input file pointer
-int_file = ''  # intermediate code file
-c_code_file = ''  # intermediate code to C equivalent file
-asm_code_file = ''  # assembly final code file
-main_program_name = ''  # main program name to generate halt quad
-main_program_start_label = ''  # used to generate the jump to main in the assembly file
-quads_list = list()  # Program equivalent in quadruples.
-actual_pars = list()  # subprogram parameters for error checking
-scopes = list()  # Program current scopes
-nextlabel = 0  # next quad label that is going to be created
-variables_to_declare = list()  # all variable names used c equivalent file to declare all the variables of the program.
-next_tmpvar = 1  # Temporary variables. eg. T_1 ... T_2 etc.
-halt_label = -1
-main_program_framelength = -1
-subprogram_exists = False  # flag to check if the equivalent C file can be generated
-inside_function = list()  # If last element is true then we are currently inside a function
-has_return_stat = list()  # and if last element is true then we have return stat
-procedure_id_list = list()  # holds all procedure id's to check for errors
-enteredMain = False
+class CompilationResult:
+    def __init__(self, filename, quads, intermediate_code, c_code, asm_code, main_program_framelength, frame_lengths,
+                 peephole_hits, frame_layout, profile=None):
+        self.__filename = filename
+        self.__quads = quads  # quads of the whole program in label order, None until read back from a cached result
+        # intermediate_code, asm_code and frame_layout are None for a streamed compilation, written as it went
+        self.__intermediate_code = intermediate_code
+        self.__c_code = c_code  # None when the program declares subprograms
+        self.__asm_code = asm_code
+        self.__main_program_framelength = main_program_framelength
+        self.__frame_lengths = frame_lengths  # (subprogram name, frame length before, after slot sharing)
+        self.__peephole_hits = peephole_hits  # peephole rule -> times it applied
+        self.__frame_layout = frame_layout  # what the backend needs to compile the intermediate code alone
+        self.__profile = profile  # CompileProfile of the compilation, None unless the compiler profiled it
 
+    def get_filename(self):
+        return self.__filename
 
-##############################################################
-#                                                            #
-#                   Error printing                           #
-#                                                            #
-##############################################################
-def error_line_message(lineno, charno, *args):
-    print('[' + ShellColors.RED + 'ERROR' + ShellColors.END + ']',
-          ShellColors.BOLD + '%s:%d:%d:' % (infile.name, lineno, charno) + ShellColors.END, *args)
-    # character pointer reset
-    infile.seek(0)
-    for i, line in enumerate(infile):
-        if i == lineno - 1:
-            print(line.replace('\t', ' ').replace('\n', ' '))  # \t and \n count as 1 character
-            print(ShellColors.GREEN + ' ' * (charno - 2) + '^' + ShellColors.END)
-    close_files()
-    sys.exit(1)
+    def get_quads(self):
+        if self.__quads is None and self.__intermediate_code is not None:
+            self.__quads = parse_intermediate_code(self.__intermediate_code, self.__filename)
+        return self.__quads
 
+    def get_intermediate_code(self):
+        return self.__intermediate_code
 
-def error_file_not_found(infile):
-    print(
-        '[' + ShellColors.RED + 'ERROR' + ShellColors.END + ']' + ' File:' + ShellColors.GREEN + ' ' + infile + ' ' + ShellColors.END + 'does not exist.')
-    sys.exit(1)
+    def get_intermediate_code_binary(self):
+        return intermediate_code_to_binary(self.get_quads())
 
+    def get_c_code(self):
+        return self.__c_code
 
-def error(*args):
-    print('[' + ShellColors.RED + 'ERROR' + ShellColors.END + ']', *args)
-    sys.exit(1)
+    def get_asm_code(self):
+        return self.__asm_code
 
+    def get_main_program_framelength(self):
+        return self.__main_program_framelength
 
-def warning(*args):
-    print(ShellColors.WARNING + '[' + 'Warning' + ']' + ShellColors.END,
-          ShellColors.UNDERLINED + infile.name + ShellColors.END + ': ' + str(*args))
-    print('\n')
+    def get_frame_lengths(self):
+        return self.__frame_lengths
 
+    def get_peephole_hits(self):
+        return self.__peephole_hits
 
-##############################################################
-#                                                            #
-#                        I/O files                           #
-#                                                            #
-##############################################################
-def open_files(input_filename, intermediate_code_filepath, c_equivalent_filepath, asm_code_filepath):
-    global infile, int_file, c_code_file, asm_code_file
-    infile = open(input_filename, 'r', encoding='utf-8')
-    int_file = open(intermediate_code_filepath, 'w', encoding='utf-8')
-    c_code_file = open(c_equivalent_filepath, 'w', encoding='utf-8')
-    asm_code_file = open(asm_code_filepath, 'w', encoding='utf8')
+    def get_frame_layout(self):
+        return self.__frame_layout
 
+    def get_profile(self):
+        return self.__profile
 
-def close_files():
-    infile.close()
-    int_file.close()
-    c_code_file.close()
+    # The result as a compile cache entry. console holds what the compilation printed.
+    def to_cache_entry(self, console):
+        return {'intermediate_code': self.__intermediate_code, 'c_code': self.__c_code, 'asm_code': self.__asm_code,
+                'main_program_framelength': self.__main_program_framelength, 'frame_lengths': self.__frame_lengths,
+                'peephole_hits': self.__peephole_hits, 'frame_layout': self.__frame_layout, 'console': console}
 
 
-##############################################################
-#                                                            #
-#                    Intermediate Code                       #
-#                                                            #
-##############################################################
-def generate_intermediate_code_file():
-    for quad in quads_list:
-        int_file.write(quad.quad_to_file())
-
-
-def generate_c_code_file():
-    c_code_file.write('#include <stdio.h>\n\n')
-    for quad in quads_list:
-        if quad.get_op() == 'begin_block':
-            if quad.get_x() == main_program_name:
-                if variables_to_declare:
-                    buffer = '\n\tint '
-                    for var in variables_to_declare:
-                        has_declares = True
-                        buffer += var + ', '
-                    buffer = buffer[:-2] + ';'
-                    c_code_file.write('int main(void)\n{' + buffer + '\n')
-                else:
-                    c_code_file.write('int main(void)\n{' + '\n')
-        elif quad.get_op() == 'end_block':
-            c_code_file.write('\tL_' + str(quad.get_label()) + ':{}\n}\n')
-        elif quad.get_op() == 'halt':
-            c_code_file.write('\tL_' + str(quad.get_label()) + ': ' + 'return 0;\n')
-        elif quad.get_op() in ('=', '>', '<', '>=', '<=', '<>'):
-            c_operator = quad.get_op()
-            if c_operator == '=':
-                c_operator = '=='
-            elif c_operator == '<>':
-                c_operator = '!='
-            c_code_file.write(
-                '\tL_' + str(quad.get_label()) + ': ' + 'if(' + str(quad.get_x()) + c_operator + ' ' + str(
-                    quad.get_y()) + ') goto L_' + str(quad.get_z()) + ';\n')
-        elif quad.get_op() in ('+', '-', '/', '*'):
-            c_code_file.write(
-                '\tL_' + str(quad.get_label()) + ': ' + str(quad.get_z()) + '=' + str(quad.get_x()) + ' ' + str(
-                    quad.get_op()) + ' ' + str(quad.get_y()) + ';\n')
-        elif quad.get_op() == ':=':
-            c_code_file.write(
-                '\tL_' + str(quad.get_label()) + ': ' + str(quad.get_z()) + '=' + str(quad.get_x()) + ';\n')
-        elif quad.get_op() == 'jump':
-            c_code_file.write('\tL_' + str(quad.get_label()) + ': ' + 'goto L_' + str(quad.get_z()) + ';\n')
-        elif quad.get_op() == 'out':
-            c_code_file.write('\tL_' + str(quad.get_label()) + ': ' + 'printf("%d\\n", ' + str(quad.get_x()) + ');\n')
-        elif quad.get_op() == 'inp':
-            c_code_file.write('\tL_' + str(quad.get_label()) + ': ' + 'scanf("%d", ' + '&' + str(quad.get_x()) + ');\n')
-        elif quad.get_op() == 'retv':
-            c_code_file.write('\tL_' + str(quad.get_label()) + ': ' + 'return (' + str(quad.get_x()) + ');\n')
+def result_from_cache_entry(entry, filename):
+    return CompilationResult(filename, None, entry['intermediate_code'], entry['c_code'], entry['asm_code'],
+                             entry['main_program_framelength'], entry['frame_lengths'], entry['peephole_hits'],
+                             entry['frame_layout'])
+
+
+relational_opcodes = (Opcode.EQUAL, Opcode.NOT_EQUAL, Opcode.LESS, Opcode.LESS_OR_EQUAL, Opcode.GREATER,
+                      Opcode.GREATER_OR_EQUAL)
+arithmetic_opcodes = (Opcode.ADD, Opcode.SUB, Opcode.MUL, Opcode.DIV)
+# MIPS instruction of every relational and arithmetic opcode
+asm_instructions = {Opcode.EQUAL: 'beq', Opcode.NOT_EQUAL: 'bne', Opcode.LESS: 'blt', Opcode.LESS_OR_EQUAL: 'ble',
+                    Opcode.GREATER: 'bgt', Opcode.GREATER_OR_EQUAL: 'bge',
+                    Opcode.ADD: 'add', Opcode.SUB: 'sub', Opcode.MUL: 'mul', Opcode.DIV: 'div'}
+# forcase arms comparing one variable with this many distinct constants are dispatched with -O 1 and up,
+# through a jump table if it needs at most max_table_spread entries per arm and a binary search otherwise
+min_dispatch_arms = 4
+max_table_spread = 2
+search_leaf_arms = 2  # arms compared one after the other at the leaves of the binary search
+c_operators = {Opcode.EQUAL: '==', Opcode.NOT_EQUAL: '!=', Opcode.LESS: '<', Opcode.LESS_OR_EQUAL: '<=',
+               Opcode.GREATER: '>', Opcode.GREATER_OR_EQUAL: '>='}
+
+
+# How messages name the file being compiled. Cached messages name cached_filename instead, and name the file
+# being compiled again when they are replayed, so a hit for a copy of a source names the copy.
+def file_reference(filename):
+    return ShellColors.UNDERLINED + filename + ShellColors.END
+
+
+cached_filename = '\0'  # no path holds a NUL character
+
+
+# Registers are passed around as the number of a $t register or as a register name, eg. '1' or '$s1'.
+def register_name(r):
+    return r if str(r).startswith('$') else '$t%s' % r
+
+
+# Map the label of every par quad to the name of the subprogram the following call quad calls.
+def calls_of_pars(quads):
+    callee_of_par = dict()
+    pars = list()
+    for quad in quads:
+        if quad.get_op() == 'par':
+            pars.append(quad.get_label())
+        elif quad.get_op() == 'call':
+            for label in pars:
+                callee_of_par[label] = quad.get_x()
+            pars = list()
+    return callee_of_par
 
 
 ##############################################################
 #                                                            #
-#                   Final code generation                    #
+#                         Compiler                           #
 #                                                            #
 ##############################################################
-# Load in register $t0 the address of a non-local variable 'v'.
-def gnvlcode(v):
-    entity_to_load = search_entity(v)
-    current_nesting_level = scopes[-1].get_nesting_level()
-    entity_nesting_level = get_entity_nesting_level(entity_to_load.get_name())
-    asm_code_file.write('    lw    $t0, -4($sp)\n')
-    access_link = current_nesting_level - entity_nesting_level - 1
-    while access_link > 0:
-        asm_code_file.write('    lw    $t0, -4($t0)\n')
-        access_link -= 1
-    asm_code_file.write('    addi    $t0, $t0, -%d\n' % entity_to_load.get_offset())
-
-
-# Load entity 'v' from memory to register $t(r) r refers to the number of the temporary register. 
-def loadvr(v, r):
-    if str(v).isdigit():  # constant
-        asm_code_file.write('    li    $t%s, %s\n' % (r, v))
-    else:  # data
-        entity_to_load = search_entity(v)
-        current_nesting_level = scopes[-1].get_nesting_level()
-        entity_nesting_level = get_entity_nesting_level(entity_to_load.get_name())
-        if entity_to_load.get_entityType() == 'Variable' and entity_nesting_level == 0:
-            asm_code_file.write('    lw    $t%s, -%d($s0)\n' % (r, entity_to_load.get_offset()))
-        elif (entity_to_load.get_entityType() == 'Variable' and entity_nesting_level == current_nesting_level) or \
-                (entity_to_load.get_entityType() == 'Parameter' and entity_nesting_level == current_nesting_level and entity_to_load.get_parMode() == 'in') or \
-                (entity_to_load.get_entityType() == 'Tempvar'):
-            asm_code_file.write('    lw    $t%s, -%d($sp)\n' % (r, entity_to_load.get_offset()))
-        elif entity_to_load.get_entityType() == 'Parameter' and \
-                entity_to_load.get_parMode() == 'inout' and \
-                entity_nesting_level == current_nesting_level:
-            asm_code_file.write('    lw    $t0, -%d($sp)\n' % entity_to_load.get_offset())
-            asm_code_file.write('    lw    $t%s, 0($t0)\n' % r)
-        elif (entity_to_load.get_entityType() == 'Variable' and entity_nesting_level < current_nesting_level) or \
-                (entity_to_load.get_entityType() == 'Parameter' and entity_to_load.get_parMode() == 'in' and entity_nesting_level < current_nesting_level):
-            gnvlcode(v)
-            asm_code_file.write('    lw    $t%s, 0($t0)\n' % r)
-        elif entity_to_load.get_entityType() == 'Parameter' and entity_to_load.get_parMode() == 'inout' \
-                and entity_nesting_level < current_nesting_level:
-            gnvlcode(v)
-            asm_code_file.write('    lw    $t0, 0($t0)\n')
-            asm_code_file.write('    lw    $t%s, 0($t0)\n' % r)
+# Every compile() call starts from a fresh state, so one Compiler can be reused for many programs.
+class Compiler:
+    def __init__(self, legacy_lexer=False, max_errors=1, optimization_level=0, peephole_rules=None, profile=False):
+        self.__legacy_lexer = legacy_lexer  # if true then tokens are read from infile one character at a time
+        self.__max_errors = max_errors  # errors reported before giving up, error recovery is enabled if more than 1
+        self.__optimization_level = optimization_level  # 0 disables the optimization passes
+        if peephole_rules is None:  # all of them from level 2
+            peephole_rules = peephole_rule_names if optimization_level >= 2 else ()
+        self.__peephole_rules = tuple(peephole_rules)
+        self.__profile_enabled = profile  # if true then every compilation keeps a CompileProfile
+        # opcode -> method generating the code of a quad, one table per backend
+        self.__asm_emitters = {Opcode.JUMP: self.asm_jump, Opcode.ASSIGN: self.asm_assign, Opcode.HALT: self.asm_halt,
+                               Opcode.OUT: self.asm_out, Opcode.INP: self.asm_inp, Opcode.RETV: self.asm_retv,
+                               Opcode.PAR: self.asm_par, Opcode.CALL: self.asm_call,
+                               Opcode.BEGIN_BLOCK: self.asm_begin_block, Opcode.END_BLOCK: self.asm_end_block,
+                               Opcode.TABLE: self.asm_table}
+        self.__c_emitters = {Opcode.JUMP: self.c_jump, Opcode.ASSIGN: self.c_assign, Opcode.HALT: self.c_halt,
+                             Opcode.OUT: self.c_out, Opcode.INP: self.c_inp, Opcode.RETV: self.c_retv,
+                             Opcode.BEGIN_BLOCK: self.c_begin_block, Opcode.END_BLOCK: self.c_end_block,
+                             Opcode.TABLE: self.c_table}
+        for opcode in relational_opcodes:
+            self.__asm_emitters[opcode] = self.asm_relational
+            self.__c_emitters[opcode] = self.c_relational
+        for opcode in arithmetic_opcodes:
+            self.__asm_emitters[opcode] = self.asm_arithmetic
+            self.__c_emitters[opcode] = self.c_arithmetic
+        self.reset('')
+
+    def reset(self, source, filename='<string>', infile=None):
+        self.__filename = filename  # input file name used in messages
+        self.__lineno = 1  # Current line number
+        self.__charno = 0  # Current Character number from the start of the line
+        self.__token = Token()  # Each token returned from the lexical analyzer will be stored here
+        self.__infile = infile  # input file pointer, only read by the legacy lexer
+        self.__source = source  # whole input file contents scanned by the buffered lexer
+        self.__cursor = 0  # index of the next character of source to be scanned
+        self.__line_starts = [0]  # source index of the first character of every line the lexer reached
+        self.__diagnostics = list()  # errors recorded by error recovery
+        self.__asm_code = list()  # assembly final code of every finished block
+        self.__asm_items = list()  # instructions and labels of the block being generated
+        self.__peephole_hits = {rule: 0 for rule in peephole_rule_names}  # times every peephole rule applied
+        self.__registers = dict()  # variable name -> register holding it in the block being generated
+        self.__callee_of_par = dict()  # par quad label -> name of the subprogram called with it
+        self.__jump_tables = dict()  # table quad label -> the quads following it, see cfg.jump_tables()
+        self.__frame_lengths = list()  # (subprogram name, frame length before and after temporary slot sharing)
+        self.__main_program_name = ''  # main program name to generate halt quad
+        self.__main_program_start_label = ''  # used to generate the jump to main in the assembly file
+        self.__quads_list = list()  # quadruples of the blocks still being parsed
+        self.__quads_list_start = 0  # label of the first quad in quads_list
+        self.__program_quads = list()  # Program equivalent in quadruples, filled as blocks are finished.
+        self.__actual_pars = list()  # subprogram parameters for error checking
+        self.__scopes = list()  # Program current scopes
+        self.__nextlabel = 0  # next quad label that is going to be created
+        self.__variables_to_declare = list()  # all variable names used c equivalent file to declare all the variables of the program.
+        self.__next_tmpvar = 1  # Temporary variables. eg. T_1 ... T_2 etc.
+        self.__halt_label = -1
+        self.__main_program_framelength = -1
+        self.__subprogram_exists = False  # flag to check if the equivalent C file can be generated
+        self.__inside_function = list()  # If last element is true then we are currently inside a function
+        self.__has_return_stat = list()  # and if last element is true then we have return stat
+        self.__procedure_id_list = list()  # holds all procedure id's to check for errors
+        self.__enteredMain = False
+        self.__closed_scopes = dict()  # scope -> its entities when it was closed, in closing order
+        self.__block_layouts = list()  # (block name, (scope, visible entities) of every scope the block could see)
+        self.__profile = CompileProfile(filename) if self.__profile_enabled else None
+        self.__stream_files = None  # (intermediate code file, assembly file) the blocks are written to when streaming
+        self.__quads_optimized = False  # true if the quads were already folded and cleaned up, by the front end
+
+    # Compile a whole minimal++ program held in the string source.
+    def compile(self, source, filename='<string>'):
+        if self.__legacy_lexer:
+            self.reset('', filename, io.StringIO(source))
         else:
-            error('loadvr is not used correctly.')
-
-
-# Transfer contents of register $t{r} to memory for variable v.
-def storerv(r, v):
-    entity_to_store = search_entity(v)
-    current_nesting_level = scopes[-1].get_nesting_level()
-    entity_nesting_level = get_entity_nesting_level(entity_to_store.get_name())
-    if entity_to_store.get_entityType() == 'Variable' and entity_nesting_level == 0:
-        asm_code_file.write('    sw    $t%s, -%d($s0)\n' % (r, entity_to_store.get_offset()))
-    elif (entity_to_store.get_entityType() == 'Variable' and entity_nesting_level == current_nesting_level) or \
-            (entity_to_store.get_entityType() == 'Parameter' and entity_to_store.get_parMode() == 'in' and entity_nesting_level == current_nesting_level) or \
-            (entity_to_store.get_entityType() == 'Tempvar'):
-        asm_code_file.write('    sw    $t%s, -%d($sp)\n' % (r, entity_to_store.get_offset()))
-    elif entity_to_store.get_entityType() == 'Parameter' and entity_to_store.get_parMode() == 'inout' and entity_nesting_level == current_nesting_level:
-        asm_code_file.write('    lw    $t0, -%d($sp)\n' % entity_to_store.get_offset())
-        asm_code_file.write('    sw    $t%s, 0($t0)\n' % r)
-    elif (entity_to_store.get_entityType() == 'Variable' and entity_nesting_level < current_nesting_level) or \
-            (entity_to_store.get_entityType() == 'Parameter' and entity_to_store.get_parMode() == 'in' and entity_nesting_level < current_nesting_level):
-        gnvlcode(v)
-        asm_code_file.write('    sw    $t%s, 0($t0)\n' % r)
-    elif entity_to_store.get_entityType() == 'Parameter' and entity_to_store.get_parMode() == 'inout' and entity_nesting_level < current_nesting_level:
-        gnvlcode(v)
-        asm_code_file.write('    lw    $t0, 0($t0)\n')
-        asm_code_file.write('    sw    $t%s, 0($t0)\n' % r)
-    else:
-        error('storerv is not used correctly.')
-
-
-# Generate a file containing the final code in assembly targeting the MIPS32 architecture
-def generate_asm_code_file(quad, name):
-    global enteredMain
-    if str(quad.get_label()) == '0':
-        asm_code_file.write('# This file was automatically generated by: Minimal++ Compiler\n\n')
-        asm_code_file.write('    j    Lmain\n')
-    relational_operators = ['=', '<>', '<', '<=', '>', '>=']
-    asm_relational_operators_instructions = ['beq', 'bne', 'blt', 'ble', 'bgt', 'bge']
-    arithmetic_operators = ['+', '-', '/', '*']
-    asm_arithmetic_operators_instructions = ['add', 'sub', 'div', 'mul']
-    if name == main_program_name and not enteredMain:
-        # Write Lmain once and mark the start of the main block
-        asm_code_file.write('\nLmain:\n')
-        enteredMain = True
-    else:
-        asm_code_file.write('\nL_' + str(quad.get_label()) + ':\n')
-    if quad.get_op() == 'jump':
-        asm_code_file.write('    j    L_%d\n' % quad.get_z())
-    elif quad.get_op() in relational_operators:
-        loadvr(quad.get_x(), '1')
-        loadvr(quad.get_y(), '2')
-        asm_code_file.write('   %s    $t1, $t2, L_%s\n'
-                            % (asm_relational_operators_instructions[relational_operators.index(quad.get_op())],
-                               quad.get_z()))
-    elif quad.get_op() in arithmetic_operators:
-        loadvr(quad.get_x(), '1')
-        loadvr(quad.get_y(), '2')
-        asm_code_file.write('   %s    $t1, $t1, $t2\n'
-                            % (asm_arithmetic_operators_instructions[arithmetic_operators.index(quad.get_op())]))
-        storerv('1', quad.get_z())
-    elif quad.get_op() == ':=':
-        loadvr(quad.get_x(), '1')
-        storerv('1', quad.get_z())
-    elif quad.get_op() == 'halt':
-        asm_code_file.write('    li    $v0, 10\n')
-        asm_code_file.write('    syscall\n')
-    elif quad.get_op() == 'out':
-        loadvr(quad.get_x(), '9')
-        asm_code_file.write('    li    $v0, 1\n')
-        asm_code_file.write('    move  $a0, $t9\n')
-        asm_code_file.write('    syscall\n')
+            self.reset(source, filename)
+        return self.__compile()
+
+    def compile_file(self, input_filename):
+        with open(input_filename, 'r', encoding='utf-8') as infile:
+            if self.__legacy_lexer:
+                self.reset('', input_filename, infile)
+            else:
+                self.reset(infile.read(), input_filename)
+            return self.__compile()
+
+    # Compile input_filename writing the intermediate code and the assembly of every block to intermediate_file
+    # and asm_file as soon as the block ends. The quads and the scope of a finished block are released, so memory
+    # grows with the largest block instead of the whole program. The result holds no code but the C code and
+    # no frame layout, as the scopes it is built from are gone.
+    def compile_file_streaming(self, input_filename, intermediate_file, asm_file):
+        with open(input_filename, 'r', encoding='utf-8') as infile:
+            if self.__legacy_lexer:
+                self.reset('', input_filename, infile)
+            else:
+                self.reset(infile.read(), input_filename)
+            self.__stream_files = (intermediate_file, asm_file)
+            return self.__compile()
+
+    def __compile(self):
+        # Begin syntax analysis
+        try:
+            self.__token = self.lex()
+            self.program()
+            if self.__token.get_tk_type() is not TokenType.EOF_TK:
+                self.error_line_message(self.__token.get_tk_lineno(), self.__token.get_tk_charno(),
+                                        'Expected \'EOF\' but found \'%s\' instead.' % self.__token.get_tk_value())
+        except MultipleCompileErrors:
+            raise
+        except CompileError as compile_error:
+            if not self.__diagnostics:
+                raise
+            self.__diagnostics.append(compile_error)
+        if len(self.__diagnostics) == 1:
+            raise self.__diagnostics[0]
+        if self.__diagnostics:
+            raise MultipleCompileErrors(self.__diagnostics)
+        return self.__result(self.frame_layout() if self.__stream_files is None else None)
+
+    # Generate the code of quads read back from an intermediate code file without the front end, using the
+    # frame layout saved with them. The passes of this compiler's optimization level run again on every block.
+    def compile_intermediate(self, quads, layout, filename='<string>'):
+        self.reset('', filename)
+        blocks = split_blocks(quads, filename)
+        chains = block_scopes(layout, filename)
+        if len(chains) != len(blocks):
+            raise IntermediateCodeError('The frame layout describes %d blocks but the intermediate code holds %d.'
+                                        % (len(chains), len(blocks)), filename)
+        self.__main_program_name = layout['program']
+        self.__halt_label = layout['halt_label']
+        self.__subprogram_exists = layout['subprograms']
+        self.__variables_to_declare = list(layout['variables'])
+        # the front end wrote the quads after its own passes, running them again could change the code
+        self.__quads_optimized = layout['optimization_level'] >= 1
+        for i, ((name, scopes), block_quads) in enumerate(zip(chains, blocks)):
+            if block_quads[0].get_x() != name:
+                raise IntermediateCodeError('Block \'%s\' found where the frame layout expects \'%s\'.'
+                                            % (block_quads[0].get_x(), name), filename)
+            if i == len(blocks) - 1:
+                name = self.__main_program_name  # update_function_framelength() tells the main block by identity
+            self.__scopes = scopes
+            self.update_function_framelength(name, scopes[-1].get_current_offset())
+            if self.__profile is not None:
+                self.__profile.enter_block(name)
+            self.__program_quads.extend(self.generate_block_code(name, block_quads))
+            if self.__profile is not None:
+                self.__profile.exit_block()
+        self.__scopes = list()
+        return self.__result(layout)
+
+    def __result(self, frame_layout):
+        start = time.perf_counter()
+        c_code = None
+        if not self.__subprogram_exists:
+            c_code = self.generate_c_code()
+        else:
+            self.warning("Subprogram declared. Intermediate code to C equivalent file generation aborted.")
+        if self.__stream_files is None:
+            quads, intermediate_code = self.__program_quads, self.generate_intermediate_code()
+            asm_code = ''.join(self.__asm_code)
+        else:
+            quads = intermediate_code = asm_code = None
+        result = CompilationResult(self.__filename, quads, intermediate_code, c_code, asm_code,
+                                   self.__main_program_framelength,
+                                   self.__frame_lengths, dict(self.__peephole_hits), frame_layout, self.__profile)
+        if self.__profile is not None:
+            self.__profile.add_time('final_code', time.perf_counter() - start)
+            self.__profile.stop()
+        return result
+
+    # Yield every token of source up to and including the EOF token.
+    def tokenize(self, source, filename='<string>'):
+        if self.__legacy_lexer:
+            self.reset('', filename, io.StringIO(source))
+        else:
+            self.reset(source, filename)
+        while True:
+            tk = self.lex()
+            yield tk
+            if tk.get_tk_type() is TokenType.EOF_TK:
+                return
+
+    ##############################################################
+    #                                                            #
+    #                   Error reporting                          #
+    #                                                            #
+    ##############################################################
+    def error_line_message(self, lineno, charno, *args, error_type=ParseError):
+        raise self.line_error(lineno, charno, *args, error_type=error_type)
+
+    def line_error(self, lineno, charno, *args, error_type=ParseError):
+        return error_type(' '.join(str(arg) for arg in args), self.__filename, lineno, charno,
+                          self.source_line(lineno))
+
+    def error(self, *args, error_type=SemanticError):
+        raise error_type(' '.join(str(arg) for arg in args), self.__filename)
+
+    # Text of line lineno without its newline, or None if the line does not exist.
+    def source_line(self, lineno):
+        if self.__legacy_lexer:
+            # the legacy lexer does not keep the source around
+            self.__infile.seek(0)
+            for i, line in enumerate(self.__infile):
+                if i == lineno - 1:
+                    return line.rstrip('\n')
+            return None
+        if lineno < 1 or lineno > len(self.__line_starts) or self.__line_starts[lineno - 1] >= len(self.__source):
+            return None
+        start = self.__line_starts[lineno - 1]
+        end = self.__source.find('\n', start)
+        return self.__source[start:] if end == -1 else self.__source[start:end]
+
+    def warning(self, *args):
+        print(ShellColors.WARNING + '[' + 'Warning' + ']' + ShellColors.END,
+              file_reference(self.__filename) + ': ' + str(*args))
+        print('\n')
+
+    ##############################################################
+    #                                                            #
+    #                     Error recovery                         #
+    #                                                            #
+    ##############################################################
+    # Record an error found with error recovery enabled. Compilation stops once max_errors are recorded.
+    def report_error(self, compile_error):
+        for reported in self.__diagnostics:
+            if reported.get_lineno() == compile_error.get_lineno() and \
+                    reported.get_charno() == compile_error.get_charno():
+                return  # one error per source position is enough
+        self.__diagnostics.append(compile_error)
+        if len(self.__diagnostics) >= self.__max_errors:
+            raise MultipleCompileErrors(self.__diagnostics)
+
+    # Panic mode: skip tokens up to a ';', a '}' closing the current block or a statement keyword.
+    def synchronize(self):
+        depth = 0
+        while True:
+            tk_type = self.__token.get_tk_type()
+            if tk_type is TokenType.EOF_TK:
+                return
+            if depth == 0 and (tk_type is TokenType.SEMICOLON_TK or tk_type is TokenType.RIGHT_BRACE_TK
+                               or tk_type in statement_keywords):
+                return
+            if tk_type is TokenType.LEFT_BRACE_TK:
+                depth += 1
+            elif tk_type is TokenType.RIGHT_BRACE_TK:
+                depth -= 1
+            self.__token = self.lex()
+
+    ##############################################################
+    #                                                            #
+    #                    Intermediate Code                       #
+    #                                                            #
+    ##############################################################
+    def generate_intermediate_code(self):
+        return ''.join(quad.quad_to_file() for quad in self.__program_quads)
+
+    # par and call quads have no C equivalent, the file is only generated for programs without subprograms.
+    def generate_c_code(self):
+        lines = ['#include <stdio.h>\n\n']
+        self.__jump_tables = jump_tables(self.__program_quads)
+        for quad in self.__program_quads:
+            emitter = self.__c_emitters.get(quad.get_opcode())
+            if emitter is not None:
+                lines.append(emitter(quad))
+        return ''.join(lines)
+
+    def c_begin_block(self, quad):
+        if quad.get_x() != self.__main_program_name:
+            return ''
+        if self.__variables_to_declare:
+            return 'int main(void)\n{\n\tint %s;\n' % ', '.join(self.__variables_to_declare)
+        return 'int main(void)\n{\n'
+
+    def c_end_block(self, quad):
+        return '\tL_%s:{}\n}\n' % quad.get_label()
+
+    def c_halt(self, quad):
+        return '\tL_%s: return 0;\n' % quad.get_label()
+
+    def c_relational(self, quad):
+        return '\tL_%s: if(%s%s %s) goto L_%s;\n' % (quad.get_label(), quad.get_x(), c_operators[quad.get_opcode()],
+                                                     quad.get_y(), quad.get_z())
+
+    def c_arithmetic(self, quad):
+        return '\tL_%s: %s=%s %s %s;\n' % (quad.get_label(), quad.get_z(), quad.get_x(), quad.get_op(), quad.get_y())
+
+    def c_assign(self, quad):
+        return '\tL_%s: %s=%s;\n' % (quad.get_label(), quad.get_z(), quad.get_x())
+
+    def c_jump(self, quad):
+        return '\tL_%s: goto L_%s;\n' % (quad.get_label(), quad.get_z())
+
+    def c_table(self, quad):
+        following = self.__jump_tables[quad.get_label()]
+        cases = ''.join(' case %d: goto L_%s;' % (int(quad.get_y()) + i, entry.get_z())
+                        for i, entry in enumerate(following[:-1]))
+        return '\tL_%s: switch(%s) {%s default: goto L_%s; }\n' % (quad.get_label(), quad.get_x(), cases,
+                                                                   following[-1].get_label())
+
+    def c_out(self, quad):
+        return '\tL_%s: printf("%%d\\n", %s);\n' % (quad.get_label(), quad.get_x())
+
+    def c_inp(self, quad):
+        return '\tL_%s: scanf("%%d", &%s);\n' % (quad.get_label(), quad.get_x())
+
+    def c_retv(self, quad):
+        return '\tL_%s: return (%s);\n' % (quad.get_label(), quad.get_x())
+
+    ##############################################################
+    #                                                            #
+    #                   Final code generation                    #
+    #                                                            #
+    ##############################################################
+    def emit(self, op, *args):
+        self.__asm_items.append(Instruction(op, *args))
+
+    # Write the instructions of the finished block, after the peephole optimizer went over them.
+    def flush_asm_code(self):
+        if self.__peephole_rules:
+            self.__asm_items = peephole_optimize(self.__asm_items, self.__peephole_rules, self.__peephole_hits)
+        if self.__profile is not None:
+            self.__profile.count('instructions', sum(isinstance(item, Instruction) for item in self.__asm_items))
+        self.__asm_code.append(asm_to_text(self.__asm_items))
+        self.__asm_items = list()
+
+    # Load in register $t0 the address of a non-local entity declared at entity_nesting_level.
+    def gnvlcode(self, entity, entity_nesting_level):
+        current_nesting_level = self.__scopes[-1].get_nesting_level()
+        self.emit('lw', '$t0', '-4($sp)')
+        access_link = current_nesting_level - entity_nesting_level - 1
+        while access_link > 0:
+            self.emit('lw', '$t0', '-4($t0)')
+            access_link -= 1
+        self.emit('addi', '$t0', '$t0', '-%d' % entity.get_offset())
+
+    # Load entity 'v' from memory to register $t(r) r refers to the number of the temporary register.
+    # r may also be a register name, eg. '$s1'.
+    def loadvr(self, v, r):
+        register = register_name(r)
+        if v in self.__registers:  # allocated by the register allocator
+            if self.__registers[v] != register:
+                self.emit('move', register, self.__registers[v])
+        elif is_constant(v):
+            self.emit('li', register, v)
+        else:  # data
+            entity_to_load, entity_nesting_level = self.search_entity_and_nesting_level(v)
+            current_nesting_level = self.__scopes[-1].get_nesting_level()
+            entity_type = entity_to_load.get_entityType()
+            if entity_type == 'Variable' and entity_nesting_level == 0:
+                self.emit('lw', register, '-%d($s0)' % entity_to_load.get_offset())
+            elif (entity_type == 'Variable' and entity_nesting_level == current_nesting_level) or \
+                    (entity_type == 'Parameter' and entity_nesting_level == current_nesting_level and entity_to_load.get_parMode() == 'in') or \
+                    (entity_type == 'Tempvar'):
+                self.emit('lw', register, '-%d($sp)' % entity_to_load.get_offset())
+            elif entity_type == 'Parameter' and \
+                    entity_to_load.get_parMode() == 'inout' and \
+                    entity_nesting_level == current_nesting_level:
+                self.emit('lw', '$t0', '-%d($sp)' % entity_to_load.get_offset())
+                self.emit('lw', register, '0($t0)')
+            elif (entity_type == 'Variable' and entity_nesting_level < current_nesting_level) or \
+                    (entity_type == 'Parameter' and entity_to_load.get_parMode() == 'in' and entity_nesting_level < current_nesting_level):
+                self.gnvlcode(entity_to_load, entity_nesting_level)
+                self.emit('lw', register, '0($t0)')
+            elif entity_type == 'Parameter' and entity_to_load.get_parMode() == 'inout' \
+                    and entity_nesting_level < current_nesting_level:
+                self.gnvlcode(entity_to_load, entity_nesting_level)
+                self.emit('lw', '$t0', '0($t0)')
+                self.emit('lw', register, '0($t0)')
+            else:
+                self.error('loadvr is not used correctly.', error_type=CompileError)
+
+    # Transfer contents of register $t{r} to memory for variable v.
+    def storerv(self, r, v):
+        register = register_name(r)
+        if v in self.__registers:
+            if self.__registers[v] != register:
+                self.emit('move', self.__registers[v], register)
+            return
+        entity_to_store, entity_nesting_level = self.search_entity_and_nesting_level(v)
+        current_nesting_level = self.__scopes[-1].get_nesting_level()
+        entity_type = entity_to_store.get_entityType()
+        if entity_type == 'Variable' and entity_nesting_level == 0:
+            self.emit('sw', register, '-%d($s0)' % entity_to_store.get_offset())
+        elif (entity_type == 'Variable' and entity_nesting_level == current_nesting_level) or \
+                (entity_type == 'Parameter' and entity_to_store.get_parMode() == 'in' and entity_nesting_level == current_nesting_level) or \
+                (entity_type == 'Tempvar'):
+            self.emit('sw', register, '-%d($sp)' % entity_to_store.get_offset())
+        elif entity_type == 'Parameter' and entity_to_store.get_parMode() == 'inout' and entity_nesting_level == current_nesting_level:
+            self.emit('lw', '$t0', '-%d($sp)' % entity_to_store.get_offset())
+            self.emit('sw', register, '0($t0)')
+        elif (entity_type == 'Variable' and entity_nesting_level < current_nesting_level) or \
+                (entity_type == 'Parameter' and entity_to_store.get_parMode() == 'in' and entity_nesting_level < current_nesting_level):
+            self.gnvlcode(entity_to_store, entity_nesting_level)
+            self.emit('sw', register, '0($t0)')
+        elif entity_type == 'Parameter' and entity_to_store.get_parMode() == 'inout' and entity_nesting_level < current_nesting_level:
+            self.gnvlcode(entity_to_store, entity_nesting_level)
+            self.emit('lw', '$t0', '0($t0)')
+            self.emit('sw', register, '0($t0)')
+        else:
+            self.error('storerv is not used correctly.', error_type=CompileError)
+
+    # Temporary variables not live at the same time share a stack slot, so the frame of subprogram name
+    # only grows with the peak number of live temporaries. Those kept in registers need no slot.
+    def share_temporary_slots(self, name, block_quads):
+        temporaries = [entity for entity in self.__scopes[-1].get_entities_list() if entity.get_entityType() == 'Tempvar']
+        framelength = self.__scopes[-1].get_current_offset()
+        if temporaries:
+            first_offset = temporaries[0].get_offset()
+            slots = share_slots(block_quads, {temporary.get_name() for temporary in temporaries} - set(self.__registers))
+            for temporary in temporaries:
+                if temporary.get_name() in slots:
+                    temporary.set_offset(first_offset + 4 * slots[temporary.get_name()])
+            shared_framelength = first_offset + 4 * (max(slots.values()) + 1 if slots else 0)
+            self.update_function_framelength(name, shared_framelength)
+            self.__frame_lengths.append((name, framelength, shared_framelength))
+        else:
+            self.__frame_lengths.append((name, framelength, framelength))
+
+    # Register holding v. v is loaded in $t(r) unless the register allocator keeps it in a register.
+    def operand_register(self, v, r):
+        if v in self.__registers:
+            return self.__registers[v]
+        self.loadvr(v, r)
+        return register_name(r)
+
+    # Generate a file containing the final code in assembly targeting the MIPS32 architecture
+    def generate_asm_code_file(self, quad, name):
+        if quad.get_label() == 0:
+            self.__asm_items.append(Comment('This file was automatically generated by: Minimal++ Compiler'))
+            self.emit('j', 'Lmain')
+        if name == self.__main_program_name and not self.__enteredMain:
+            # Write Lmain once and mark the start of the main block
+            self.__asm_items.append(Label('Lmain'))
+            self.__enteredMain = True
+        else:
+            self.__asm_items.append(Label('L_' + str(quad.get_label())))
+        self.__asm_emitters[quad.get_opcode()](quad, name)
+
+    def asm_jump(self, quad, name):
+        self.emit('j', 'L_%d' % quad.get_z())
+
+    # The value minus the lowest one indexes a table of the addresses the entries jump to, kept in the data
+    # segment. Out of range values continue at the quad after the entries.
+    def asm_table(self, quad, name):
+        following = self.__jump_tables[quad.get_label()]
+        table_label = 'L_%d_table' % quad.get_label()
+        out_of_range_label = 'L_%d' % following[-1].get_label()
+        x_register = self.operand_register(quad.get_x(), '1')
+        self.emit('addi', '$t1', x_register, -int(quad.get_y()))
+        self.emit('blt', '$t1', '$0', out_of_range_label)
+        self.emit('li', '$t2', quad.get_z())
+        self.emit('bge', '$t1', '$t2', out_of_range_label)
+        self.emit('la', '$t2', table_label)
+        self.emit('sll', '$t1', '$t1', '2')
+        self.emit('add', '$t1', '$t1', '$t2')
+        self.emit('lw', '$t1', '0($t1)')
+        self.emit('jr', '$t1')
+        self.emit('.data')
+        self.__asm_items.append(Label(table_label))
+        self.emit('.word', *('L_%d' % entry.get_z() for entry in following[:-1]))
+        self.emit('.text')
+
+    def asm_relational(self, quad, name):
+        x_register = self.operand_register(quad.get_x(), '1')
+        y_register = self.operand_register(quad.get_y(), '2')
+        self.emit(asm_instructions[quad.get_opcode()], x_register, y_register, 'L_%s' % quad.get_z())
+
+    def asm_arithmetic(self, quad, name):
+        x_register = self.operand_register(quad.get_x(), '1')
+        y_register = self.operand_register(quad.get_y(), '2')
+        z_register = self.__registers.get(quad.get_z(), '$t1')
+        self.emit(asm_instructions[quad.get_opcode()], z_register, x_register, y_register)
+        self.storerv(z_register, quad.get_z())
+
+    def asm_assign(self, quad, name):
+        if quad.get_z() in self.__registers:
+            self.loadvr(quad.get_x(), self.__registers[quad.get_z()])
+        else:
+            self.storerv(self.operand_register(quad.get_x(), '1'), quad.get_z())
+
+    def asm_halt(self, quad, name):
+        self.emit('li', '$v0', '10')
+        self.emit('syscall')
+
+    def asm_out(self, quad, name):
+        x_register = self.operand_register(quad.get_x(), '9')
+        self.emit('li', '$v0', '1')
+        self.emit('move', '$a0', x_register)
+        self.emit('syscall')
         # print new line after integer out
-        asm_code_file.write('    addi    $a0, $0, 0xA\n')  # ascii code for LF
-        asm_code_file.write(
-            '    addi    $v0, $0, 0xB\n')  # syscall 11 prints the lower 8 bits of $a0 as an ascii character
-        asm_code_file.write('    syscall\n')
-    elif quad.get_op() == 'inp':
-        asm_code_file.write('    li    $v0, 5\n')
-        asm_code_file.write('    syscall\n')
-        asm_code_file.write('    move $t0, $v0\n')
+        self.emit('addi', '$a0', '$0', '0xA')  # ascii code for LF
+        self.emit('addi', '$v0', '$0', '0xB')  # syscall 11 prints the lower 8 bits of $a0 as an ascii character
+        self.emit('syscall')
+
+    def asm_inp(self, quad, name):
+        self.emit('li', '$v0', '5')
+        self.emit('syscall')
+        self.emit('move', '$t0', '$v0')
         # print new line after integer out
-        asm_code_file.write('    addi    $a0, $0, 0xA\n')  # ascii code for LF
-        asm_code_file.write(
-            '    addi    $v0, $0, 0xB\n')  # syscall 11 prints the lower 8 bits of $a0 as an ascii character
-        asm_code_file.write('    syscall\n')
-        storerv('0', quad.get_x())
-    elif quad.get_op() == 'retv':
-        loadvr(quad.get_x(), '1')
-        asm_code_file.write('    lw    $t0, -8($sp)\n')
-        asm_code_file.write('    sw    $t1, 0($t0)\n')
-    elif quad.get_op() == 'par':
-        if name != main_program_name:
-            caller, caller_nesting_level = search_entity_by_type(name, 'Function')
-            framelength = caller.get_framelength()
+        self.emit('addi', '$a0', '$0', '0xA')  # ascii code for LF
+        self.emit('addi', '$v0', '$0', '0xB')  # syscall 11 prints the lower 8 bits of $a0 as an ascii character
+        self.emit('syscall')
+        self.storerv('0', quad.get_x())
+
+    def asm_retv(self, quad, name):
+        x_register = self.operand_register(quad.get_x(), '1')
+        self.emit('lw', '$t0', '-8($sp)')
+        self.emit('sw', x_register, '0($t0)')
+
+    def asm_par(self, quad, name):
+        if name != self.__main_program_name:
+            caller, caller_nesting_level = self.search_entity_by_type(name, 'Function')
         else:
             caller_nesting_level = 0
-            framelength = main_program_framelength
-        if not actual_pars:
-            asm_code_file.write('    addi    $fp, $sp, %d\n' % framelength)
-        actual_pars.append(quad)
-        parameter_offset = 12 + 4 * actual_pars.index(quad)
+        if not self.__actual_pars:
+            # the frame of the called subprogram is placed right above the caller's frame
+            to_call = self.search_entity_by_type(self.__callee_of_par[quad.get_label()], 'Function')[0]
+            self.emit('addi', '$fp', '$sp', self.callee_framelength(to_call))
+        self.__actual_pars.append(quad)
+        parameter_offset = 12 + 4 * self.__actual_pars.index(quad)
         if quad.get_y() == 'CV':
-            loadvr(quad.get_x(), '0')
-            asm_code_file.write('    sw    $t0, -%d($fp)\n' % parameter_offset)
+            x_register = self.operand_register(quad.get_x(), '0')
+            self.emit('sw', x_register, '-%d($fp)' % parameter_offset)
         elif quad.get_y() == 'REF':
-            variable = search_entity(quad.get_x())
-            variable_nesting_level = get_entity_nesting_level(quad.get_x())
+            variable, variable_nesting_level = self.search_entity_and_nesting_level(quad.get_x())
             if caller_nesting_level == variable_nesting_level:
                 if variable.get_entityType() == 'Variable' or \
                         (variable.get_entityType() == 'Parameter' and variable.get_parMode() == 'in'):
-                    asm_code_file.write('    addi    $t0, $sp, -%d\n' % variable.get_offset())
-                    asm_code_file.write('    sw    $t0, -%d($fp)\n' % parameter_offset)
+                    self.emit('addi', '$t0', '$sp', '-%d' % variable.get_offset())
+                    self.emit('sw', '$t0', '-%d($fp)' % parameter_offset)
                 elif variable.get_entityType() == 'Parameter' and variable.get_parMode() == 'inout':
-                    asm_code_file.write('    lw    $t0, -%d($sp)\n' % variable.get_offset())
-                    asm_code_file.write('    sw    $t0, -%d($fp)\n' % parameter_offset)
+                    self.emit('lw', '$t0', '-%d($sp)' % variable.get_offset())
+                    self.emit('sw', '$t0', '-%d($fp)' % parameter_offset)
             else:
                 if variable.get_entityType() == 'Variable' or \
                         (variable.get_entityType() == 'Parameter' and variable.get_parMode() == 'in'):
-                    gnvlcode(quad.get_x())
-                    asm_code_file.write('    sw    $t0, -%d($fp)\n' % parameter_offset)
+                    self.gnvlcode(variable, variable_nesting_level)
+                    self.emit('sw', '$t0', '-%d($fp)' % parameter_offset)
                 elif variable.get_entityType() == 'Parameter' and variable.get_parMode() == 'inout':
-                    gnvlcode(quad.get_x())
-                    asm_code_file.write('    lw    $t0, 0($t0)\n')
-                    asm_code_file.write('    sw    $t0, -%d($fp)\n' % parameter_offset)
+                    self.gnvlcode(variable, variable_nesting_level)
+                    self.emit('lw', '$t0', '0($t0)')
+                    self.emit('sw', '$t0', '-%d($fp)' % parameter_offset)
         elif quad.get_y() == 'RET':
-            variable = search_entity(quad.get_x())
-            variable_nesting_level = get_entity_nesting_level(quad.get_x())
-            asm_code_file.write('    addi    $t0, $sp, -%d\n' % variable.get_offset())
-            asm_code_file.write('    sw    $t0, -8($fp)\n')
-    elif quad.get_op() == 'call':
-        if name != main_program_name:
-            caller = search_entity(name)
-            caller_nesting_level = get_entity_nesting_level(name)
-            framelength = caller.get_framelength()
+            variable = self.search_entity(quad.get_x())
+            self.emit('addi', '$t0', '$sp', '-%d' % variable.get_offset())
+            self.emit('sw', '$t0', '-8($fp)')
+
+    def asm_call(self, quad, name):
+        if name != self.__main_program_name:
+            caller, caller_nesting_level = self.search_entity_and_nesting_level(name)
         else:
             caller_nesting_level = 0
-            framelength = main_program_framelength
-        to_call = search_entity(quad.get_x())
-        to_call_nesting_level = get_entity_nesting_level(quad.get_x())
-        if actual_pars:
-            if actual_pars[-1].get_y() == 'RET':
-                actual_pars.pop()
+        to_call, to_call_nesting_level = self.search_entity_and_nesting_level(quad.get_x())
+        framelength = self.callee_framelength(to_call)
+        if self.__actual_pars:
+            if self.__actual_pars[-1].get_y() == 'RET':
+                self.__actual_pars.pop()
         else:
-            asm_code_file.write('    addi    $fp, $sp, %d\n' % framelength)
-        if len(to_call.get_arguments_list()) != len(actual_pars):
+            self.emit('addi', '$fp', '$sp', framelength)
+        if len(to_call.get_arguments_list()) != len(self.__actual_pars):
             # print(len(to_call.get_arguments_list()), len(actual_pars))
-            error('Subprogram \'%s\' parameters number is not matching definition' % to_call.get_name())
+            self.error('Subprogram \'%s\' parameters number is not matching definition' % to_call.get_name())
         for argument in to_call.get_arguments_list():
-            quad = actual_pars.pop(0)
+            quad = self.__actual_pars.pop(0)
             if argument.get_parMode() != quad.get_y():
                 expected_mode = 'inout' if quad.get_x() == 'CV' else 'in'
-                error('Subprogram: \'%s\'. Expected parameter \'%s\' mode to be \'%s\''
-                      % (to_call.get_name(), quad.get_x(), expected_mode))
+                self.error('Subprogram: \'%s\'. Expected parameter \'%s\' mode to be \'%s\''
+                           % (to_call.get_name(), quad.get_x(), expected_mode))
         if caller_nesting_level == to_call_nesting_level:
-            asm_code_file.write('    lw    $t0, -4($sp)\n')
-            asm_code_file.write('    sw    $t0, -4($fp)\n')
+            self.emit('lw', '$t0', '-4($sp)')
+            self.emit('sw', '$t0', '-4($fp)')
         else:
-            asm_code_file.write('    sw    $sp, -4($fp)\n')
-        asm_code_file.write('    addi    $sp, $sp, %d\n' % framelength)
-        asm_code_file.write('    jal     L_%d\n' % to_call.get_startQuad())
-        asm_code_file.write('    addi    $sp, $sp, -%d\n' % framelength)
-    elif quad.get_op() == 'begin_block':
-        if name != main_program_name:
-            asm_code_file.write('    sw    $ra, 0($sp)\n')
-        if name == main_program_name:
-            asm_code_file.write('    addi  $sp, $sp, %d\n' % main_program_framelength)
-            asm_code_file.write('    move  $s0, $sp\n')
-    elif quad.get_op() == 'end_block':
-        if name == main_program_name:
-            asm_code_file.write('    j    L_%d\n' % halt_label)
+            self.emit('sw', '$sp', '-4($fp)')
+        self.emit('addi', '$sp', '$sp', framelength)
+        self.emit('jal', 'L_%d' % to_call.get_startQuad())
+        self.emit('addi', '$sp', '$sp', '%d' % -framelength)
+
+    # The frame of the called subprogram is placed right above the caller's frame, so the call needs the frame
+    # length of the callee. It is only known once the callee's block is closed, which is not the case yet when a
+    # subprogram calls one of the subprograms enclosing it.
+    def callee_framelength(self, to_call):
+        if to_call.get_framelength() < 0:
+            self.error('Subprogram \'%s\' is called from a subprogram nested in it before its own block is '
+                       'compiled. Calls of an enclosing subprogram are not supported.' % to_call.get_name())
+        return to_call.get_framelength()
+
+    def asm_begin_block(self, quad, name):
+        if name != self.__main_program_name:
+            self.emit('sw', '$ra', '0($sp)')
+        if name == self.__main_program_name:
+            self.emit('addi', '$sp', '$sp', self.__main_program_framelength)
+            self.emit('move', '$s0', '$sp')
+
+    def asm_end_block(self, quad, name):
+        if name == self.__main_program_name:
+            self.emit('j', 'L_%d' % self.__halt_label)
         else:
-            asm_code_file.write('    lw    $ra, 0($sp)\n')
-            asm_code_file.write('    jr    $ra\n')
-
-
-##############################################################
-#                                                            #
-#                   Lexical analyzer                         #
-#                                                            #
-##############################################################
-def lex():
-    global lineno, charno, infile
-    while True:
-        character = infile.read(1)
-        charno += 1
-        # File is allowed to have empty lines tabs and spaces at the start
-        while character == ' ' or character == "\n" or character == "\t":
-            if character == "\n":
-                lineno += 1
-                charno = 0
-            character = infile.read(1)
-            charno += 1
-        buffer = character
-        # print(buffer)
-        if character.isalpha():
-            character = infile.read(1)
-            charno += 1
-            while character.isalpha() or character.isdigit():
-                buffer += character
-                character = infile.read(1)
-                charno += 1
-            if buffer in tokens.keys():
-                retval = Token(tokens[buffer], buffer, lineno, charno)
+            self.emit('lw', '$ra', '0($sp)')
+            self.emit('jr', '$ra')
+
+    ##############################################################
+    #                                                            #
+    #                   Lexical analyzer                         #
+    #                                                            #
+    ##############################################################
+    def lex(self):
+        if self.__profile is None:
+            return self.scan_token()
+        start = time.perf_counter()
+        token = self.scan_token()
+        self.__profile.add_time('lex', time.perf_counter() - start)
+        self.__profile.count('tokens')
+        return token
+
+    def scan_token(self):
+        while True:
+            try:
+                if self.__legacy_lexer:
+                    return self.lex_legacy()
+                return self.lex_buffered()
+            except LexicalError as lexical_error:
+                if self.__max_errors == 1:
+                    raise
+                # keep scanning after the offending input
+                self.report_error(lexical_error)
+
+    # Scan the next token from the in-memory source buffer. Line and character numbers are
+    # kept exactly as lex_legacy() reports them so that both token streams can be compared.
+    def lex_buffered(self):
+        length = len(self.__source)
+        while True:
+            character = self.__source[self.__cursor] if self.__cursor < length else ''
+            self.__cursor += 1
+            self.__charno += 1
+            # File is allowed to have empty lines tabs and spaces at the start
+            while character == ' ' or character == "\n" or character == "\t":
+                if character == "\n":
+                    self.__lineno += 1
+                    self.__line_starts.append(self.__cursor)
+                    self.__charno = 0
+                character = self.__source[self.__cursor] if self.__cursor < length else ''
+                self.__cursor += 1
+                self.__charno += 1
+            start = self.__cursor - 1
+            if character.isalpha():
+                while self.__cursor < length and (self.__source[self.__cursor].isalpha() or self.__source[self.__cursor].isdigit()):
+                    self.__cursor += 1
+                buffer = self.__source[start:self.__cursor]
+                self.__charno += self.__cursor - start
+                if buffer in tokens:
+                    retval = Token(tokens[buffer], buffer, self.__lineno, self.__charno)
+                else:
+                    retval = Token(TokenType.ID_TK, buffer, self.__lineno, self.__charno)
+                self.__charno -= 1
+                return retval
+            elif character.isnumeric():
+                while self.__cursor < length and self.__source[self.__cursor].isnumeric():
+                    self.__cursor += 1
+                self.__charno += self.__cursor - start
+                if self.__cursor < length and self.__source[self.__cursor].isalpha():
+                    self.error_line_message(self.__lineno, self.__charno - 1, 'Variable names should begin with alphabetic character.', error_type=LexicalError)
+                buffer = self.__source[start:self.__cursor]
+                if int(buffer) > 32767 or int(buffer) < -32767:
+                    self.error_line_message(self.__lineno, self.__charno, 'Integer value should be between [-32767,32767].', error_type=LexicalError)
+                self.__charno -= 1
+                return Token(TokenType.NUMBER_TK, buffer, self.__lineno, self.__charno)
+            elif character == '*':
+                if self.__source.startswith('/', self.__cursor):
+                    self.error_line_message(self.__lineno, self.__charno + 1, 'Expected "/*" to open comments before "*/" .', error_type=LexicalError)
+                return Token(TokenType.TIMES_TK, character, self.__lineno, self.__charno)
+            elif character == '/':
+                if self.__source.startswith('*', self.__cursor):
+                    comments_charno = self.__charno
+                    comments_line = self.__lineno
+                    self.__charno += 1
+                    self.__cursor += 1
+                    while True:
+                        if self.__cursor >= length:
+                            self.error_line_message(comments_line, comments_charno,
+                                                    'Comments opened. Expected  "*/"  but EOF reached.', error_type=LexicalError)
+                        character = self.__source[self.__cursor]
+                        self.__cursor += 1
+                        if character == '*':
+                            # the character after '*' is consumed even if it is not '/'
+                            character = self.__source[self.__cursor] if self.__cursor < length else ''
+                            self.__cursor += 1
+                            if character == '/':
+                                break
+                        elif character == '\n':
+                            self.__lineno += 1
+                            self.__line_starts.append(self.__cursor)
+                            self.__charno = 0
+                elif self.__source.startswith('/', self.__cursor):
+                    newline = self.__source.find('\n', self.__cursor)
+                    self.__cursor = length if newline == -1 else newline + 1
+                    self.__lineno += 1
+                    self.__line_starts.append(self.__cursor)
+                    self.__charno = 0
+                else:
+                    return Token(TokenType.SLASH_TK, character, self.__lineno, self.__charno)
+            elif character in '<>:' and self.__source.startswith('=', self.__cursor) or self.__source.startswith('<>', start):
+                self.__cursor += 1
+                buffer = self.__source[start:self.__cursor]
+                return Token(tokens[buffer], buffer, self.__lineno, self.__charno)
+            elif character == '':
+                self.__cursor = length
+                return Token(TokenType.EOF_TK, 'EOF', self.__lineno, 0)
+            elif character in tokens:
+                return Token(tokens[character], character, self.__lineno, self.__charno)
             else:
-                retval = Token(TokenType.ID_TK, buffer, lineno, charno)
-            infile.seek(infile.tell() - 1)
-            charno -= 1
-            return retval
-        elif character.isnumeric():
-            while character.isnumeric():
-                character = infile.read(1)
-                charno += 1
-                if character.isnumeric():
+                self.error_line_message(self.__lineno, self.__charno, 'Invalid character.', error_type=LexicalError)
+
+    # Original lexer reading the input file one character at a time.
+    def lex_legacy(self):
+        while True:
+            character = self.__infile.read(1)
+            self.__charno += 1
+            # File is allowed to have empty lines tabs and spaces at the start
+            while character == ' ' or character == "\n" or character == "\t":
+                if character == "\n":
+                    self.__lineno += 1
+                    self.__charno = 0
+                character = self.__infile.read(1)
+                self.__charno += 1
+            buffer = character
+            # print(buffer)
+            if character.isalpha():
+                character = self.__infile.read(1)
+                self.__charno += 1
+                while character.isalpha() or character.isdigit():
                     buffer += character
+                    character = self.__infile.read(1)
+                    self.__charno += 1
+                if buffer in tokens.keys():
+                    retval = Token(tokens[buffer], buffer, self.__lineno, self.__charno)
                 else:
-                    if character.isalpha():
-                        error_line_message(lineno, charno - 1, 'Variable names should begin with alphabetic character.')
-            if int(buffer) > 32767 or int(buffer) < -32767:
-                error_line_message(lineno, charno, 'Integer value should be between [-32767,32767].')
-            infile.seek(infile.tell() - 1)
-            charno -= 1
-            return Token(TokenType.NUMBER_TK, buffer, lineno, charno)
-        elif character == '+':
-            return Token(TokenType.PLUS_TK, buffer, lineno, charno)
-        elif character == '-':
-            return Token(TokenType.MINUS_TK, buffer, lineno, charno)
-        elif character == '*':
-            character = infile.read(1)
-            charno += 1
-            if character == '/':
-                error_line_message(lineno, charno, 'Expected "/*" to open comments before "*/" .')
-            else:
-                infile.seek(infile.tell() - 1)
-                charno -= 1
-                return Token(TokenType.TIMES_TK, buffer, lineno, charno)
-        elif character == '/':
-            character = infile.read(1)
-            comments_charno = charno
-            comments_line = lineno
-            charno += 1
-            if character == '*':
-                while (True):
-                    character = infile.read(1)
-                    if not character:
-                        error_line_message(comments_line, comments_charno,
-                                           'Comments opened. Expected  "*/"  but EOF reached.')
-                    if character == '*':
-                        character = infile.read(1)
-                        if character == '/':
-                            break
-                    elif character == '\n':
-                        lineno += 1
-                        charno = 0
+                    retval = Token(TokenType.ID_TK, buffer, self.__lineno, self.__charno)
+                self.__infile.seek(self.__infile.tell() - 1)
+                self.__charno -= 1
+                return retval
+            elif character.isnumeric():
+                while character.isnumeric():
+                    character = self.__infile.read(1)
+                    self.__charno += 1
+                    if character.isnumeric():
+                        buffer += character
+                    else:
+                        if character.isalpha():
+                            self.error_line_message(self.__lineno, self.__charno - 1, 'Variable names should begin with alphabetic character.', error_type=LexicalError)
+                if int(buffer) > 32767 or int(buffer) < -32767:
+                    self.error_line_message(self.__lineno, self.__charno, 'Integer value should be between [-32767,32767].', error_type=LexicalError)
+                self.__infile.seek(self.__infile.tell() - 1)
+                self.__charno -= 1
+                return Token(TokenType.NUMBER_TK, buffer, self.__lineno, self.__charno)
+            elif character == '+':
+                return Token(TokenType.PLUS_TK, buffer, self.__lineno, self.__charno)
+            elif character == '-':
+                return Token(TokenType.MINUS_TK, buffer, self.__lineno, self.__charno)
+            elif character == '*':
+                character = self.__infile.read(1)
+                self.__charno += 1
+                if character == '/':
+                    self.error_line_message(self.__lineno, self.__charno, 'Expected "/*" to open comments before "*/" .', error_type=LexicalError)
+                else:
+                    self.__infile.seek(self.__infile.tell() - 1)
+                    self.__charno -= 1
+                    return Token(TokenType.TIMES_TK, buffer, self.__lineno, self.__charno)
             elif character == '/':
-                while (character != '\n'):
-                    character = infile.read(1)
-                lineno += 1
-                charno = 0
-            else:
-                infile.seek(infile.tell() - 1)
-                charno -= 1
-                return Token(TokenType.SLASH_TK, buffer, lineno, charno)
-        elif character == '(':
-            return Token(TokenType.LEFT_PARENTHESIS_TK, buffer, lineno, charno)
-        elif character == ')':
-            return Token(TokenType.RIGHT_PARENTHESIS_TK, buffer, lineno, charno)
-        elif character == '[':
-            return Token(TokenType.LEFT_BRACKET_TK, buffer, lineno, charno)
-        elif character == ']':
-            return Token(TokenType.RIGHT_BRACKET_TK, buffer, lineno, charno)
-        elif character == '{':
-            return Token(TokenType.LEFT_BRACE_TK, buffer, lineno, charno)
-        elif character == '}':
-            return Token(TokenType.RIGHT_BRACE_TK, buffer, lineno, charno)
-        elif character == '<':
-            character = infile.read(1)
-            if character == '=':
-                buffer += character
-                return Token(TokenType.LESS_THAN_OR_EQUAL_TK, buffer, lineno, charno)
+                character = self.__infile.read(1)
+                comments_charno = self.__charno
+                comments_line = self.__lineno
+                self.__charno += 1
+                if character == '*':
+                    while (True):
+                        character = self.__infile.read(1)
+                        if not character:
+                            self.error_line_message(comments_line, comments_charno,
+                                                    'Comments opened. Expected  "*/"  but EOF reached.', error_type=LexicalError)
+                        if character == '*':
+                            character = self.__infile.read(1)
+                            if character == '/':
+                                break
+                        elif character == '\n':
+                            self.__lineno += 1
+                            self.__charno = 0
+                elif character == '/':
+                    while (character != '\n'):
+                        character = self.__infile.read(1)
+                    self.__lineno += 1
+                    self.__charno = 0
+                else:
+                    self.__infile.seek(self.__infile.tell() - 1)
+                    self.__charno -= 1
+                    return Token(TokenType.SLASH_TK, buffer, self.__lineno, self.__charno)
+            elif character == '(':
+                return Token(TokenType.LEFT_PARENTHESIS_TK, buffer, self.__lineno, self.__charno)
+            elif character == ')':
+                return Token(TokenType.RIGHT_PARENTHESIS_TK, buffer, self.__lineno, self.__charno)
+            elif character == '[':
+                return Token(TokenType.LEFT_BRACKET_TK, buffer, self.__lineno, self.__charno)
+            elif character == ']':
+                return Token(TokenType.RIGHT_BRACKET_TK, buffer, self.__lineno, self.__charno)
+            elif character == '{':
+                return Token(TokenType.LEFT_BRACE_TK, buffer, self.__lineno, self.__charno)
+            elif character == '}':
+                return Token(TokenType.RIGHT_BRACE_TK, buffer, self.__lineno, self.__charno)
+            elif character == '<':
+                character = self.__infile.read(1)
+                if character == '=':
+                    buffer += character
+                    return Token(TokenType.LESS_THAN_OR_EQUAL_TK, buffer, self.__lineno, self.__charno)
+                elif character == '>':
+                    buffer += character
+                    return Token(TokenType.NOT_EQUAL_TK, buffer, self.__lineno, self.__charno)
+                else:
+                    self.__infile.seek(self.__infile.tell() - 1)
+                    return Token(TokenType.LESS_TK, buffer, self.__lineno, self.__charno)
             elif character == '>':
-                buffer += character
-                return Token(TokenType.NOT_EQUAL_TK, buffer, lineno, charno)
-            else:
-                infile.seek(infile.tell() - 1)
-                return Token(TokenType.LESS_TK, buffer, lineno, charno)
-        elif character == '>':
-            character = infile.read(1)
-            if character == '=':
-                buffer += character
-                return Token(TokenType.GREATER_THAN_OR_EQUAL_TK, buffer, lineno, charno)
-            else:
-                infile.seek(infile.tell() - 1)
-                return Token(TokenType.GREATER_TK, buffer, lineno, charno)
-        elif character == '=':
-            return Token(TokenType.EQUAL_TK, buffer, lineno, charno)
-        elif character == ',':
-            return Token(TokenType.COMMA_TK, buffer, lineno, charno)
-        elif character == ';':
-            return Token(TokenType.SEMICOLON_TK, buffer, lineno, charno)
-        elif character == ':':
-            character = infile.read(1)
-            if character == '=':
-                buffer += character
-                return Token(TokenType.ASSIGN_TK, buffer, lineno, charno)
+                character = self.__infile.read(1)
+                if character == '=':
+                    buffer += character
+                    return Token(TokenType.GREATER_THAN_OR_EQUAL_TK, buffer, self.__lineno, self.__charno)
+                else:
+                    self.__infile.seek(self.__infile.tell() - 1)
+                    return Token(TokenType.GREATER_TK, buffer, self.__lineno, self.__charno)
+            elif character == '=':
+                return Token(TokenType.EQUAL_TK, buffer, self.__lineno, self.__charno)
+            elif character == ',':
+                return Token(TokenType.COMMA_TK, buffer, self.__lineno, self.__charno)
+            elif character == ';':
+                return Token(TokenType.SEMICOLON_TK, buffer, self.__lineno, self.__charno)
+            elif character == ':':
+                character = self.__infile.read(1)
+                if character == '=':
+                    buffer += character
+                    return Token(TokenType.ASSIGN_TK, buffer, self.__lineno, self.__charno)
+                else:
+                    self.__infile.seek(self.__infile.tell() - 1)
+                    return Token(TokenType.COLON_TK, buffer, self.__lineno, self.__charno)
+            elif character == '':
+                return Token(TokenType.EOF_TK, 'EOF', self.__lineno, 0)
             else:
-                infile.seek(infile.tell() - 1)
-                return Token(TokenType.COLON_TK, buffer, lineno, charno)
-        elif character == '':
-            return Token(TokenType.EOF_TK, 'EOF', lineno, 0)
-        else:
-            error_line_message(lineno, charno, 'Invalid character.')
-
-
-##############################################################
-#                                                            #
-#               Intermediate code functions                  #
-#                                                            #
-##############################################################
-def nextquad():
-    return nextlabel
-
-
-def genquad(op=None, x='_', y='_', z='_'):
-    global nextlabel
-    label = nextlabel
-    nextlabel += 1
-    newquad = Quad(label, op, x, y, z)
-    quads_list.append(newquad)
-
-
-def newtemp():
-    global variables_to_declare, next_tmpvar
-    tempvar = 'T_' + str(next_tmpvar)
-    variables_to_declare.append(tempvar)
-    offset = scopes[-1].get_current_offset_and_advance()
-    scopes[-1].add_Entity(TemporaryVariable(tempvar, offset))
-    next_tmpvar += 1
-    return tempvar
-
-
-def emptylist():
-    return list()
-
-
-def makelist(label):
-    new_list = list()
-    new_list.append(label)
-    return new_list
-
-
-def merge(list1, list2):
-    return list1 + list2
-
-
-def backpatch(label_list, z):
-    global quads_list
-    for quad in quads_list:
-        if quad.get_label() in label_list:
-            quad.set_z(z)
-
-
-##############################################################
-#                                                            #
-#                   Symbol table functions                   #
-#                                                            #
-##############################################################
-def is_declared(name, entity_type, nesting_level):
-    scope = scopes[nesting_level]
-    for i in range(len(scope.get_entities_list())):
-        entity1 = scope.get_entities_list()[i]
-        if entity1.get_name() == name and entity1.get_entityType() == entity_type:
+                self.error_line_message(self.__lineno, self.__charno, 'Invalid character.', error_type=LexicalError)
+
+    ##############################################################
+    #                                                            #
+    #               Intermediate code functions                  #
+    #                                                            #
+    ##############################################################
+    def nextquad(self):
+        return self.__nextlabel
+
+    def genquad(self, op=None, x='_', y='_', z='_'):
+        label = self.__nextlabel
+        self.__nextlabel += 1
+        newquad = Quad(label, op, x, y, z)
+        self.__quads_list.append(newquad)
+        if self.__profile is not None:
+            self.__profile.count('quads')
+
+    def newtemp(self):
+        tempvar = 'T_' + str(self.__next_tmpvar)
+        self.__variables_to_declare.append(tempvar)
+        offset = self.__scopes[-1].get_current_offset_and_advance()
+        self.__scopes[-1].add_Entity(TemporaryVariable(tempvar, offset))
+        self.__next_tmpvar += 1
+        if self.__profile is not None:
+            self.__profile.count('temporaries')
+        return tempvar
+
+    def emptylist(self):
+        return list()
+
+    def makelist(self, label):
+        new_list = list()
+        new_list.append(label)
+        return new_list
+
+    def merge(self, list1, list2):
+        return list1 + list2
+
+    # Labels are handed out densely by genquad() and quads_list only holds quads of unfinished blocks,
+    # so a label minus the label of the first quad in quads_list is the index of its quad.
+    def backpatch(self, label_list, z):
+        start = time.perf_counter() if self.__profile is not None else 0.0
+        for label in label_list:
+            self.__quads_list[label - self.__quads_list_start].set_z(z)
+        if self.__profile is not None:
+            self.__profile.add_time('backpatch', time.perf_counter() - start)
+
+    ##############################################################
+    #                                                            #
+    #                   Symbol table functions                   #
+    #                                                            #
+    ##############################################################
+    def is_declared(self, name, entity_type, nesting_level):
+        return self.__scopes[nesting_level].get_entity_by_type(name, entity_type) is not None
+
+    def variable_is_parameter(self, name, nesting_level):
+        return self.__scopes[nesting_level].get_entity_by_type(name, "Parameter") is not None
+
+    def search_entity(self, entity_name):
+        return self.search_entity_and_nesting_level(entity_name)[0]
+
+    # Single lookup returning both the entity and the nesting level of the scope it was declared in.
+    def search_entity_and_nesting_level(self, entity_name):
+        if not self.__scopes:
+            return None, None
+        entity, nesting_level = self.__scopes[-1].lookup(entity_name)
+        if self.__profile is not None:
+            self.count_lookup(nesting_level)
+        return entity, nesting_level
+
+    # True for temporary variables, local variables and 'in' parameters of the current block.
+    # No other block can write these without a call.
+    def is_local_value(self, entity_name):
+        entity, entity_nesting_level = self.search_entity_and_nesting_level(entity_name)
+        if entity is None:
+            return False
+        entity_type = entity.get_entityType()
+        if entity_type == 'Tempvar':
             return True
-    return False
-
+        if entity_nesting_level != self.__scopes[-1].get_nesting_level():
+            return False
+        return entity_type == 'Variable' or (entity_type == 'Parameter' and entity.get_parMode() == 'in')
 
-def variable_is_parameter(name, nesting_level):
-    for i in range(len(scopes[nesting_level].get_entities_list())):
-        if scopes[nesting_level].get_entities_list()[i].get_entityType() == "Parameter" and \
-                scopes[nesting_level].get_entities_list()[i].get_name() == name:
+    # Temporary variables, and local variables no nested subprogram can reach, may be kept in registers.
+    def is_register_candidate(self, entity_name):
+        entity, entity_nesting_level = self.search_entity_and_nesting_level(entity_name)
+        if entity is None:
+            return False
+        if entity.get_entityType() == 'Tempvar':
             return True
-    return False
-
-
-def search_entity(entity_name):
-    if not scopes:
-        return
-    current_scope = scopes[-1]
-    while current_scope is not None:  # search until global scope
-        for entity in current_scope.get_entities_list():
-            if entity.get_name() == entity_name:
-                return entity
-        current_scope = current_scope.get_enclosing_scope()
-
-
-def get_entity_nesting_level(entity_name):
-    if not scopes:
-        return
-    current_scope = scopes[-1]
-    while current_scope is not None:  # search until global scope
-        for entity in current_scope.get_entities_list():
-            if entity.get_name() == entity_name:
-                return current_scope.get_nesting_level()
-        current_scope = current_scope.get_enclosing_scope()
-
-
-def search_entity_by_type(entity_name, entity_type):
-    if not scopes:
-        return
-    current_scope = scopes[-1]
-    while current_scope is not None:  # search until global scope
-        for entity in current_scope.get_entities_list():
-            if entity.get_name() == entity_name and entity.get_entityType() == entity_type:
-                return entity, current_scope.get_nesting_level()
-        current_scope = current_scope.get_enclosing_scope()
-
-
-def add_new_scope():
-    if not scopes:  # if scopes list is empty then add the main scope
-        current_scope = Scope()
-        scopes.append(current_scope)
-        return
-    enclosing_scope = scopes[-1]
-    current_scope = Scope(enclosing_scope.get_nesting_level() + 1, enclosing_scope)
-    scopes.append(current_scope)
-
-
-def add_function_entity(name):
-    nesting_level = scopes[-1].get_enclosing_scope().get_nesting_level()
-    if is_declared(name, "Function", nesting_level):
-        error_line_message(token.get_tk_lineno(), token.get_tk_charno(),
-                           'Redefinition of \'%s\' inside the same scope. Minimal++ does not support function overloading.' % name)
-    scopes[-2].add_Entity(Function(name))
-
-
-def update_function_startQuad(name):
-    global main_program_name, main_program_start_label
-    startQuad = nextquad()
-    if name == main_program_name:
-        main_program_start_label = startQuad
+        return entity.get_entityType() == 'Variable' and \
+            entity_nesting_level == self.__scopes[-1].get_nesting_level() and \
+            not self.__scopes[-1].has_entity_type('Function')
+
+    def search_entity_by_type(self, entity_name, entity_type):
+        if not self.__scopes:
+            return
+        entity, nesting_level = self.__scopes[-1].lookup_by_type(entity_name, entity_type)
+        if self.__profile is not None:
+            self.count_lookup(nesting_level)
+        if entity is not None:
+            return entity, nesting_level
+
+    # Count a lookup in the profile with the number of scopes it searched, all of them if nothing was found.
+    def count_lookup(self, nesting_level):
+        current_nesting_level = self.__scopes[-1].get_nesting_level()
+        self.__profile.count('lookups')
+        self.__profile.count('lookup_depth', current_nesting_level + 1 - (nesting_level or 0))
+
+    def add_new_scope(self):
+        if not self.__scopes:  # if scopes list is empty then add the main scope
+            current_scope = Scope()
+            self.__scopes.append(current_scope)
+            return
+        enclosing_scope = self.__scopes[-1]
+        current_scope = Scope(enclosing_scope.get_nesting_level() + 1, enclosing_scope)
+        self.__scopes.append(current_scope)
+
+    def add_function_entity(self, name):
+        nesting_level = self.__scopes[-1].get_enclosing_scope().get_nesting_level()
+        if self.is_declared(name, "Function", nesting_level):
+            self.error_line_message(self.__token.get_tk_lineno(), self.__token.get_tk_charno(),
+                                    'Redefinition of \'%s\' inside the same scope. Minimal++ does not support function overloading.' % name, error_type=SemanticError)
+        self.__scopes[-2].add_Entity(Function(name))
+
+    def update_function_startQuad(self, name):
+        startQuad = self.nextquad()
+        if name == self.__main_program_name:
+            self.__main_program_start_label = startQuad
+            return startQuad
+        self.__scopes[-2].get_entities_list()[-1].set_start_quad(startQuad)
         return startQuad
-    scopes[-2].get_entities_list()[-1].set_start_quad(startQuad)
-    return startQuad
-
-
-def update_function_framelength(name, framelength):
-    global main_program_framelength, main_program_name
-    if name is main_program_name:
-        main_program_framelength = framelength
-        return
-    scopes[-2].get_entities_list()[-1].set_framelength(framelength)
-
-
-def add_parameter_entity(name, parMode):
-    nesting_level = scopes[-1].get_nesting_level()
-    parameter_offset = scopes[-1].get_current_offset_and_advance()
-    if is_declared(name, "Parameter", nesting_level):
-        error_line_message(token.get_tk_lineno(), token.get_tk_charno(), 'Redefinition of \'%s\'.' % name)
-    scopes[-1].add_Entity(Parameter(name, parMode, parameter_offset))
-
-
-def add_function_argument(parMode):
-    if parMode == 'in':
-        new_argument = Argument('CV')
-    else:
-        new_argument = Argument('REF')
-    scopes[-2].get_entities_list()[-1].add_argument_in_list(new_argument)
-    if len(scopes[-2].get_entities_list()[-1].get_arguments_list()) >= 2:
-        scopes[-2].get_entities_list()[-1].get_arguments_list()[-2].set_nextArgument(new_argument)
-
-
-def add_variable_entity(name):
-    nesting_level = scopes[-1].get_nesting_level()
-    variable_offset = scopes[-1].get_current_offset_and_advance()
-    if is_declared(name, "Variable", nesting_level):
-        error_line_message(token.get_tk_lineno(), token.get_tk_charno(), 'Redeclaration of \'%s\'.' % name)
-    if variable_is_parameter(name, nesting_level):
-        error_line_message(token.get_tk_lineno(), token.get_tk_charno(),
-                           'Variable \'%s\' is a subprogram parameter therefore it cannot be redeclared.' % name)
-    scopes[-1].add_Entity(Variable(name, variable_offset))
-
-
-# Print current scope and its enclosing ones.
-def print_scopes():
-    print(ShellColors.BOLD + ShellColors.UNDERLINED + 'main scope' + ShellColors.END)
-    for scope in scopes:
-        level = scope.get_nesting_level() + 1
-        print('     ' * level + str(scope))
-        for entity in scope.get_entities_list():
-            print('     ' * level + str(entity))
-            if isinstance(entity, Function):
-                for argument in entity.get_arguments_list():
-                    print('     ' * level + '      ' + str(argument))
-    print('-' * 100 + '\n')
-
 
-##############################################################
-#                                                            #
-#                  Syntax analyzer functions                 #
-#                                                            #
-##############################################################
-def program():
-    global token, lineno, charno, main_program_name
-    if token.get_tk_type() is TokenType.PROGRAM_TK:
-        token = lex()
-        if token.get_tk_type() is TokenType.ID_TK:
-            main_program_name = name = token.get_tk_value()
-            token = lex()
-            if token.get_tk_type() is TokenType.LEFT_BRACE_TK:
-                add_new_scope()
-                token = lex()
-                block(name)
-                if token.get_tk_type() is not TokenType.RIGHT_BRACE_TK:
-                    error_line_message(token.get_tk_lineno(), token.get_tk_charno(),
-                                       'Expected block end (\'}\') but found \'%s\' instead.' % token.get_tk_value())
-                token = lex()
+    def update_function_framelength(self, name, framelength):
+        if name is self.__main_program_name:
+            self.__main_program_framelength = framelength
+            return
+        self.__scopes[-2].get_entities_list()[-1].set_framelength(framelength)
+
+    def add_parameter_entity(self, name, parMode):
+        nesting_level = self.__scopes[-1].get_nesting_level()
+        parameter_offset = self.__scopes[-1].get_current_offset_and_advance()
+        if self.is_declared(name, "Parameter", nesting_level):
+            self.error_line_message(self.__token.get_tk_lineno(), self.__token.get_tk_charno(), 'Redefinition of \'%s\'.' % name, error_type=SemanticError)
+        self.__scopes[-1].add_Entity(Parameter(name, parMode, parameter_offset))
+
+    def add_function_argument(self, parMode):
+        if parMode == 'in':
+            new_argument = Argument('CV')
+        else:
+            new_argument = Argument('REF')
+        self.__scopes[-2].get_entities_list()[-1].add_argument_in_list(new_argument)
+        if len(self.__scopes[-2].get_entities_list()[-1].get_arguments_list()) >= 2:
+            self.__scopes[-2].get_entities_list()[-1].get_arguments_list()[-2].set_nextArgument(new_argument)
+
+    def add_variable_entity(self, name):
+        nesting_level = self.__scopes[-1].get_nesting_level()
+        variable_offset = self.__scopes[-1].get_current_offset_and_advance()
+        if self.is_declared(name, "Variable", nesting_level):
+            self.error_line_message(self.__token.get_tk_lineno(), self.__token.get_tk_charno(), 'Redeclaration of \'%s\'.' % name, error_type=SemanticError)
+        if self.variable_is_parameter(name, nesting_level):
+            self.error_line_message(self.__token.get_tk_lineno(), self.__token.get_tk_charno(),
+                                    'Variable \'%s\' is a subprogram parameter therefore it cannot be redeclared.' % name, error_type=SemanticError)
+        self.__scopes[-1].add_Entity(Variable(name, variable_offset))
+
+    ##############################################################
+    #                                                            #
+    #                  Syntax analyzer functions                 #
+    #                                                            #
+    ##############################################################
+    def program(self):
+        if self.__token.get_tk_type() is TokenType.PROGRAM_TK:
+            self.__token = self.lex()
+            if self.__token.get_tk_type() is TokenType.ID_TK:
+                self.__main_program_name = name = self.__token.get_tk_value()
+                self.__token = self.lex()
+                if self.__token.get_tk_type() is TokenType.LEFT_BRACE_TK:
+                    self.add_new_scope()
+                    self.__token = self.lex()
+                    self.block(name)
+                    if self.__token.get_tk_type() is not TokenType.RIGHT_BRACE_TK:
+                        self.error_line_message(self.__token.get_tk_lineno(), self.__token.get_tk_charno(),
+                                                'Expected block end (\'}\') but found \'%s\' instead.' % self.__token.get_tk_value())
+                    self.__token = self.lex()
+                else:
+                    self.error_line_message(self.__token.get_tk_lineno(), self.__token.get_tk_charno(),
+                                            'Expected block start (\'{\') but found \'%s\' instead.' % self.__token.get_tk_value())
             else:
-                error_line_message(token.get_tk_lineno(), token.get_tk_charno(),
-                                   'Expected block start (\'{\') but found \'%s\' instead.' % token.get_tk_value())
+                self.error_line_message(self.__token.get_tk_lineno(), self.__token.get_tk_charno(),
+                                        'Expected program name but found \'%s\' instead.' % self.__token.get_tk_value())
         else:
-            error_line_message(token.get_tk_lineno(), token.get_tk_charno(),
-                               'Expected program name but found \'%s\' instead.' % token.get_tk_value())
-    else:
-        error_line_message(token.get_tk_lineno(), token.get_tk_charno(),
-                           'Expected \'program\' keyword but found \'%s\' instead.' % token.get_tk_value())
-
-
-##############################################################
-######################## Main block ##########################
-##############################################################
-def block(name):
-    global scopes, main_program_name, halt_label
-    # print_scopes()
-    declarations()
-    subprograms()
-    startQuad = update_function_startQuad(name)
-    genquad('begin_block', name)
-    statements()
-    if name == main_program_name:
-        halt_label = nextquad()
-        genquad('halt')
-    genquad('end_block', name)
-    update_function_framelength(name, scopes[-1].get_current_offset())
-    print_scopes()
-    for quad in quads_list[startQuad:]:
-        generate_asm_code_file(quad, name)
-    scopes.pop()
-
-
-##############################################################
-##############################################################
-##############################################################
-
-def declarations():
-    global token
-    while token.get_tk_type() is TokenType.DECLARE_TK:
-        token = lex()
-        varlist()
-        if token.get_tk_type() is not TokenType.SEMICOLON_TK:
-            error_line_message(token.get_tk_lineno(), token.get_tk_charno(),
-                               'Expected \';\' but found \'%s\' instead.' % token.get_tk_value())
-        token = lex()
-
-
-def varlist():
-    global token
-    if token.get_tk_type() is TokenType.ID_TK:
-        add_variable_entity(token.get_tk_value())
-        variables_to_declare.append(token.get_tk_value())
-        token = lex()
-        while token.get_tk_type() is TokenType.COMMA_TK:
-            token = lex()
-            if token.get_tk_type() is not TokenType.ID_TK:
-                error_line_message(token.get_tk_lineno(), token.get_tk_charno(),
-                                   'Expected variable declaration but found \'%s\' instead.' % token.get_tk_value())
-            add_variable_entity(token.get_tk_value())
-            variables_to_declare.append(token.get_tk_value())
-            token = lex()
-
-
-def subprograms():
-    global token, subprogram_exists, inside_function, has_return_stat
-    while token.get_tk_type() is TokenType.FUNCTION_TK or token.get_tk_type() is TokenType.PROCEDURE_TK:
-        subprogram_exists = True
-        is_procedure = False
-        if token.get_tk_type() is TokenType.PROCEDURE_TK:
-            is_procedure = True
-        if token.get_tk_type() is TokenType.FUNCTION_TK:
-            inside_function.append(True)
+            self.error_line_message(self.__token.get_tk_lineno(), self.__token.get_tk_charno(),
+                                    'Expected \'program\' keyword but found \'%s\' instead.' % self.__token.get_tk_value())
+
+    ##############################################################
+    ######################## Main block ##########################
+    ##############################################################
+    def block(self, name):
+        if self.__profile is not None:
+            self.__profile.enter_block(name)
+        self.declarations()
+        self.subprograms()
+        self.update_function_startQuad(name)
+        self.genquad('begin_block', name)
+        self.statements()
+        if name == self.__main_program_name:
+            self.__halt_label = self.nextquad()
+            self.genquad('halt')
+        self.genquad('end_block', name)
+        self.update_function_framelength(name, self.__scopes[-1].get_current_offset())
+        # The quads of the nested subprograms have already been moved out so quads_list holds this block only.
+        block_quads = self.__quads_list
+        if not self.__diagnostics:  # quads of a program with errors can be incomplete
+            if self.__stream_files is None:
+                self.record_block_layout(name)
+            block_quads = self.generate_block_code(name, block_quads)
+        if self.__stream_files is None:
+            self.__program_quads.extend(block_quads)
         else:
-            inside_function.append(False)
-        has_return_stat.append(False)
-        token = lex()
-        add_new_scope()
-        if token.get_tk_type() is TokenType.ID_TK:
-            if is_procedure:
-                procedure_id_list.append(token.get_tk_value())
-            name = token.get_tk_value()
-            token = lex()
-            add_function_entity(name)
-            funcbody(name)
+            self.stream_block(block_quads)
+        self.__quads_list = list()
+        self.__quads_list_start = self.nextquad()
+        self.__scopes.pop()
+        if self.__profile is not None:
+            self.__profile.exit_block()
+
+    # Run the optimization passes of the compiler's level over the quads of block name, whose scope is the
+    # last one of scopes, and generate its assembly. Returns the optimized quads.
+    def generate_block_code(self, name, block_quads):
+        start = time.perf_counter()
+        if self.__optimization_level >= 1 and not self.__quads_optimized:
+            block_quads = optimize_quads(block_quads, self.is_local_value)
+        if self.__optimization_level >= 2:
+            self.__registers = allocate_registers(block_quads, self.is_register_candidate)
+        if self.__optimization_level >= 1:
+            self.share_temporary_slots(name, block_quads)
+        optimized = time.perf_counter()
+        self.__callee_of_par = calls_of_pars(block_quads)
+        self.__jump_tables = jump_tables(block_quads)
+        for quad in block_quads:
+            self.generate_asm_code_file(quad, name)
+        self.flush_asm_code()
+        self.__registers = dict()
+        if self.__profile is not None:
+            self.__profile.add_time('optimize', optimized - start)
+            self.__profile.add_time('final_code', time.perf_counter() - optimized)
+        return block_quads
+
+    # Write the intermediate code and the assembly of a finished block and let them go. Only the quads of the last
+    # block are kept: without subprograms that is the main program, the one the C code is generated from.
+    def stream_block(self, block_quads):
+        intermediate_file, asm_file = self.__stream_files
+        intermediate_file.write(''.join(quad.quad_to_file() for quad in block_quads))
+        asm_file.write(''.join(self.__asm_code))
+        self.__asm_code = list()
+        self.__program_quads = block_quads
+        if self.__subprogram_exists:  # no C code, the names of its declarations are not needed
+            self.__variables_to_declare = list()
+
+    # Save the entities of the scope of block name before any pass changes them, and how many entities of
+    # every enclosing scope the block could see. frame_layout() puts them together once the program ends.
+    def record_block_layout(self, name):
+        scope = self.__scopes[-1]
+        self.__closed_scopes[scope] = {'nesting_level': scope.get_nesting_level(),
+                                       'current_offset': scope.get_current_offset(),
+                                       'entities': [entity_to_dict(entity) for entity in scope.get_entities_list()]}
+        self.__block_layouts.append((name, [(enclosing, len(enclosing.get_entities_list())) for enclosing in self.__scopes]))
+
+    def frame_layout(self):
+        scope_index = {scope: i for i, scope in enumerate(self.__closed_scopes)}
+        return {'version': layout_version, 'program': self.__main_program_name, 'halt_label': self.__halt_label,
+                'optimization_level': self.__optimization_level,
+                'subprograms': self.__subprogram_exists, 'variables': self.__variables_to_declare,
+                'scopes': list(self.__closed_scopes.values()),
+                'blocks': [{'name': name, 'scopes': [[scope_index[scope], visible] for scope, visible in scopes]}
+                           for name, scopes in self.__block_layouts]}
+
+    ##############################################################
+    ##############################################################
+    ##############################################################
+
+    def declarations(self):
+        while self.__token.get_tk_type() is TokenType.DECLARE_TK:
+            self.__token = self.lex()
+            self.varlist()
+            if self.__token.get_tk_type() is not TokenType.SEMICOLON_TK:
+                self.error_line_message(self.__token.get_tk_lineno(), self.__token.get_tk_charno(),
+                                        'Expected \';\' but found \'%s\' instead.' % self.__token.get_tk_value())
+            self.__token = self.lex()
+
+    def varlist(self):
+        if self.__token.get_tk_type() is TokenType.ID_TK:
+            self.add_variable_entity(self.__token.get_tk_value())
+            self.__variables_to_declare.append(self.__token.get_tk_value())
+            self.__token = self.lex()
+            while self.__token.get_tk_type() is TokenType.COMMA_TK:
+                self.__token = self.lex()
+                if self.__token.get_tk_type() is not TokenType.ID_TK:
+                    self.error_line_message(self.__token.get_tk_lineno(), self.__token.get_tk_charno(),
+                                            'Expected variable declaration but found \'%s\' instead.' % self.__token.get_tk_value())
+                self.add_variable_entity(self.__token.get_tk_value())
+                self.__variables_to_declare.append(self.__token.get_tk_value())
+                self.__token = self.lex()
+
+    def subprograms(self):
+        while self.__token.get_tk_type() is TokenType.FUNCTION_TK or self.__token.get_tk_type() is TokenType.PROCEDURE_TK:
+            self.__subprogram_exists = True
+            is_procedure = False
+            if self.__token.get_tk_type() is TokenType.PROCEDURE_TK:
+                is_procedure = True
+            if self.__token.get_tk_type() is TokenType.FUNCTION_TK:
+                self.__inside_function.append(True)
+            else:
+                self.__inside_function.append(False)
+            self.__has_return_stat.append(False)
+            self.__token = self.lex()
+            self.add_new_scope()
+            if self.__token.get_tk_type() is TokenType.ID_TK:
+                if is_procedure:
+                    self.__procedure_id_list.append(self.__token.get_tk_value())
+                name = self.__token.get_tk_value()
+                self.__token = self.lex()
+                self.add_function_entity(name)
+                self.funcbody(name)
+            else:
+                self.error_line_message(self.__token.get_tk_lineno(), self.__token.get_tk_charno(),
+                                        'Expected subprogram name but found \'%s\' instead.' % self.__token.get_tk_value())
+            if self.__inside_function.pop():
+                if not self.__has_return_stat.pop():
+                    self.error_line_message(self.__token.get_tk_lineno(), self.__token.get_tk_charno(),
+                                            'Expected return statement in function body but found \'%s\' instead.' % self.__token.get_tk_value(), error_type=SemanticError)
+            else:
+                self.__has_return_stat.pop()
+
+    def funcbody(self, name):
+        self.formalpars(name)
+        if self.__token.get_tk_type() is TokenType.LEFT_BRACE_TK:
+            self.__token = self.lex()
+            self.block(name)
+            if self.__token.get_tk_type() is not TokenType.RIGHT_BRACE_TK:
+                self.error_line_message(self.__token.get_tk_lineno(), self.__token.get_tk_charno(),
+                                        'Expected block end (\'}\') but found \'%s\' instead.' % self.__token.get_tk_value())
+            self.__token = self.lex()
         else:
-            error_line_message(token.get_tk_lineno(), token.get_tk_charno(),
-                               'Expected subprogram name but found \'%s\' instead.' % token.get_tk_value())
-        if inside_function.pop():
-            if not has_return_stat.pop():
-                error_line_message(token.get_tk_lineno(), token.get_tk_charno(),
-                                   'Expected return statement in function body but found \'%s\' instead.' % token.get_tk_value())
+            self.error_line_message(self.__token.get_tk_lineno(), self.__token.get_tk_charno(),
+                                    'Expected subprogram block start (\'{\') but found \'%s\' instead.' % self.__token.get_tk_value())
+
+    def formalpars(self, func_name):
+        if self.__token.get_tk_type() is TokenType.LEFT_PARENTHESIS_TK:
+            self.__token = self.lex()
+            self.formalparlist(func_name)
+            if self.__token.get_tk_type() is not TokenType.RIGHT_PARENTHESIS_TK:
+                self.error_line_message(self.__token.get_tk_lineno(), self.__token.get_tk_charno(),
+                                        'Expected \')\' but found \'%s\' instead.' % self.__token.get_tk_value())
+            self.__token = self.lex()
         else:
-            has_return_stat.pop()
-
-
-def funcbody(name):
-    global token
-    formalpars(name)
-    if token.get_tk_type() is TokenType.LEFT_BRACE_TK:
-        token = lex()
-        block(name)
-        if token.get_tk_type() is not TokenType.RIGHT_BRACE_TK:
-            error_line_message(token.get_tk_lineno(), token.get_tk_charno(),
-                               'Expected block end (\'}\') but found \'%s\' instead.' % token.get_tk_value())
-        token = lex()
-    else:
-        error_line_message(token.get_tk_lineno(), token.get_tk_charno(),
-                           'Expected subprogram block start (\'{\') but found \'%s\' instead.' % token.get_tk_value())
-
-
-def formalpars(func_name):
-    global token
-    if token.get_tk_type() is TokenType.LEFT_PARENTHESIS_TK:
-        token = lex()
-        formalparlist(func_name)
-        if token.get_tk_type() is not TokenType.RIGHT_PARENTHESIS_TK:
-            error_line_message(token.get_tk_lineno(), token.get_tk_charno(),
-                               'Expected \')\' but found \'%s\' instead.' % token.get_tk_value())
-        token = lex()
-    else:
-        error_line_message(token.get_tk_lineno(), token.get_tk_charno(),
-                           'Expected \'(\' but found \'%s\' instead.' % token.get_tk_value())
-
-
-def formalparlist(func_name):
-    global token
-    formalparitem(func_name)
-    while token.get_tk_type() is TokenType.COMMA_TK:
-        token = lex()
-        if token.get_tk_type() is not TokenType.IN_TK and token.get_tk_type() is not TokenType.INOUT_TK:
-            error_line_message(token.get_tk_lineno(), token.get_tk_charno(),
-                               'Expected formal parameter declaration but found \'%s\' instead.' % token.get_tk_value())
-        formalparitem(func_name)
-
-
-def formalparitem(func_name):
-    global token
-    if token.get_tk_type() is TokenType.IN_TK or token.get_tk_type() is TokenType.INOUT_TK:
-        parMode = token.get_tk_value()
-        token = lex()
-        if token.get_tk_type() is not TokenType.ID_TK:
-            error_line_message(token.get_tk_lineno(), token.get_tk_charno(),
-                               'Expected formal parameter name but found \'%s\' instead.' % token.get_tk_value())
-        parameter_name = token.get_tk_value()
-        add_function_argument(parMode)
-        add_parameter_entity(parameter_name, parMode)
-        token = lex()
-
-
-def statements():
-    global token
-    if token.get_tk_type() is TokenType.LEFT_BRACE_TK:
-        token = lex()
-        statement()
-        while token.get_tk_type() is TokenType.SEMICOLON_TK:
-            token = lex()
-            statement()
-        if token.get_tk_type() is not TokenType.RIGHT_BRACE_TK:
-            error_line_message(token.get_tk_lineno(), token.get_tk_charno(),
-                               'Expected statements end (\'}\') but found \'%s\' instead.' % token.get_tk_value())
-        token = lex()
-    else:
-        statement()
-
-
-def statement():
-    global token
-    if token.get_tk_type() is TokenType.ID_TK:
-        target = token.get_tk_value()
-        if search_entity(target) is None:
-            error_line_message(token.get_tk_lineno(), token.get_tk_charno(), 'Undefined variable id \'%s\'.' % target)
-        token = lex()
-        value = assignment_stat()
-        genquad(':=', value, '_', target)
-    elif token.get_tk_type() is TokenType.IF_TK:
-        token = lex()
-        if_stat()
-    elif token.get_tk_type() is TokenType.WHILE_TK:
-        token = lex()
-        while_stat()
-    elif token.get_tk_type() is TokenType.DOUBLEWHILE_TK:
-        token = lex()
-        doublewhile_stat()
-    elif token.get_tk_type() is TokenType.LOOP_TK:
-        token = lex()
-        loop_stat()
-    elif token.get_tk_type() is TokenType.EXIT_TK:
-        exit_list = makelist(nextquad())
-        genquad('jump')
-        token = lex()
-        # exit_stat() ???
-    elif token.get_tk_type() is TokenType.FORCASE_TK:
-        token = lex()
-        forcase_stat()
-    elif token.get_tk_type() is TokenType.INCASE_TK:
-        token = lex()
-        incase_stat()
-    elif token.get_tk_type() is TokenType.RETURN_TK:
-        global inside_function, has_return_stat
-        if not inside_function or not inside_function[-1]:
-            error_line_message(token.get_tk_lineno(), token.get_tk_charno(),
-                               'Encountered \'return\' statement outside of function body')
+            self.error_line_message(self.__token.get_tk_lineno(), self.__token.get_tk_charno(),
+                                    'Expected \'(\' but found \'%s\' instead.' % self.__token.get_tk_value())
+
+    def formalparlist(self, func_name):
+        self.formalparitem(func_name)
+        while self.__token.get_tk_type() is TokenType.COMMA_TK:
+            self.__token = self.lex()
+            if self.__token.get_tk_type() is not TokenType.IN_TK and self.__token.get_tk_type() is not TokenType.INOUT_TK:
+                self.error_line_message(self.__token.get_tk_lineno(), self.__token.get_tk_charno(),
+                                        'Expected formal parameter declaration but found \'%s\' instead.' % self.__token.get_tk_value())
+            self.formalparitem(func_name)
+
+    def formalparitem(self, func_name):
+        if self.__token.get_tk_type() is TokenType.IN_TK or self.__token.get_tk_type() is TokenType.INOUT_TK:
+            parMode = self.__token.get_tk_value()
+            self.__token = self.lex()
+            if self.__token.get_tk_type() is not TokenType.ID_TK:
+                self.error_line_message(self.__token.get_tk_lineno(), self.__token.get_tk_charno(),
+                                        'Expected formal parameter name but found \'%s\' instead.' % self.__token.get_tk_value())
+            parameter_name = self.__token.get_tk_value()
+            self.add_function_argument(parMode)
+            self.add_parameter_entity(parameter_name, parMode)
+            self.__token = self.lex()
+
+    def statements(self):
+        if self.__token.get_tk_type() is TokenType.LEFT_BRACE_TK:
+            self.__token = self.lex()
+            self.recovering_statement()
+            while True:
+                if self.__token.get_tk_type() is TokenType.SEMICOLON_TK:
+                    self.__token = self.lex()
+                    self.recovering_statement()
+                elif self.__max_errors == 1 or self.__token.get_tk_type() is TokenType.RIGHT_BRACE_TK or \
+                        self.__token.get_tk_type() is TokenType.EOF_TK:
+                    break
+                else:
+                    self.report_error(self.line_error(self.__token.get_tk_lineno(), self.__token.get_tk_charno(),
+                                                      'Expected \';\' or statements end (\'}\') but found \'%s\' instead.'
+                                                      % self.__token.get_tk_value()))
+                    self.synchronize()
+                    if self.__token.get_tk_type() in statement_keywords:
+                        self.recovering_statement()
+            if self.__token.get_tk_type() is not TokenType.RIGHT_BRACE_TK:
+                self.error_line_message(self.__token.get_tk_lineno(), self.__token.get_tk_charno(),
+                                        'Expected statements end (\'}\') but found \'%s\' instead.' % self.__token.get_tk_value())
+            self.__token = self.lex()
         else:
-            has_return_stat[-1] = True
-        token = lex()
-        return_stat()
-    elif token.get_tk_type() is TokenType.CALL_TK:
-        token = lex()
-        call_stat()
-    elif token.get_tk_type() is TokenType.PRINT_TK:
-        token = lex()
-        print_stat()
-    elif token.get_tk_type() is TokenType.INPUT_TK:
-        token = lex()
-        input_stat()
-    else:
-        error_line_message(token.get_tk_lineno(), token.get_tk_charno(),
-                           'Expected statement but found \'%s\' instead.' % token.get_tk_value())
-
+            self.recovering_statement()
+
+    # Parse a statement. With error recovery enabled a compile error inside the statement is
+    # recorded and parsing resumes at the next ';', '}' or statement keyword.
+    def recovering_statement(self):
+        if self.__max_errors == 1:
+            self.statement()
+            return
+        try:
+            self.statement()
+        except MultipleCompileErrors:
+            raise
+        except CompileError as compile_error:
+            self.report_error(compile_error)
+            self.synchronize()
+
+    def statement(self):
+        if self.__token.get_tk_type() is TokenType.ID_TK:
+            target = self.__token.get_tk_value()
+            if self.search_entity(target) is None:
+                self.error_line_message(self.__token.get_tk_lineno(), self.__token.get_tk_charno(), 'Undefined variable id \'%s\'.' % target, error_type=SemanticError)
+            self.__token = self.lex()
+            value = self.assignment_stat()
+            self.genquad(':=', value, '_', target)
+        elif self.__token.get_tk_type() is TokenType.IF_TK:
+            self.__token = self.lex()
+            self.if_stat()
+        elif self.__token.get_tk_type() is TokenType.WHILE_TK:
+            self.__token = self.lex()
+            self.while_stat()
+        elif self.__token.get_tk_type() is TokenType.DOUBLEWHILE_TK:
+            self.__token = self.lex()
+            self.doublewhile_stat()
+        elif self.__token.get_tk_type() is TokenType.LOOP_TK:
+            self.__token = self.lex()
+            self.loop_stat()
+        elif self.__token.get_tk_type() is TokenType.EXIT_TK:
+            exit_list = self.makelist(self.nextquad())
+            self.genquad('jump')
+            self.__token = self.lex()
+            # exit_stat() ???
+        elif self.__token.get_tk_type() is TokenType.FORCASE_TK:
+            self.__token = self.lex()
+            self.forcase_stat()
+        elif self.__token.get_tk_type() is TokenType.INCASE_TK:
+            self.__token = self.lex()
+            self.incase_stat()
+        elif self.__token.get_tk_type() is TokenType.RETURN_TK:
+            if not self.__inside_function or not self.__inside_function[-1]:
+                self.error_line_message(self.__token.get_tk_lineno(), self.__token.get_tk_charno(),
+                                        'Encountered \'return\' statement outside of function body', error_type=SemanticError)
+            else:
+                self.__has_return_stat[-1] = True
+            self.__token = self.lex()
+            self.return_stat()
+        elif self.__token.get_tk_type() is TokenType.CALL_TK:
+            self.__token = self.lex()
+            self.call_stat()
+        elif self.__token.get_tk_type() is TokenType.PRINT_TK:
+            self.__token = self.lex()
+            self.print_stat()
+        elif self.__token.get_tk_type() is TokenType.INPUT_TK:
+            self.__token = self.lex()
+            self.input_stat()
+        else:
+            self.error_line_message(self.__token.get_tk_lineno(), self.__token.get_tk_charno(),
+                                    'Expected statement but found \'%s\' instead.' % self.__token.get_tk_value())
 
-def assignment_stat():
-    global token
-    if token.get_tk_type() is TokenType.ASSIGN_TK:
-        token = lex()
-        return expression()
-    else:
-        error_line_message(token.get_tk_lineno(), token.get_tk_charno(),
-                           'Expected \':=\' but found \'%s\' instead.' % token.get_tk_value())
-
-
-def if_stat():
-    global token
-    if token.get_tk_type() is TokenType.LEFT_PARENTHESIS_TK:
-        token = lex()
-        (b_true, b_false) = condition()
-        if token.get_tk_type() is not TokenType.RIGHT_PARENTHESIS_TK:
-            error_line_message(token.get_tk_lineno(), token.get_tk_charno(),
-                               'Expected \')\' after if condition but found \'%s\' instead.' % token.get_tk_value())
-        token = lex()
-        if token.get_tk_type() is TokenType.THEN_TK:
-            token = lex()
-            backpatch(b_true, nextquad())
-            statements()
-            if_list = makelist(nextquad())
-            genquad('jump')
-            backpatch(b_false, nextquad())
-            elsepart()
-            backpatch(if_list, nextquad())
+    def assignment_stat(self):
+        if self.__token.get_tk_type() is TokenType.ASSIGN_TK:
+            self.__token = self.lex()
+            return self.expression()
         else:
-            error_line_message(token.get_tk_lineno(), token.get_tk_charno(),
-                               'Expected \'then\' after if condition but found \'%s\' instead.' % token.get_tk_value())
-    else:
-        error_line_message(token.get_tk_lineno(), token.get_tk_charno(),
-                           'Expected \'(\' after if token but found \'%s\' instead.' % token.get_tk_value())
-
-
-def elsepart():
-    global token
-    if token.get_tk_type() is TokenType.ELSE_TK:
-        token = lex()
-        statements()
-
-
-def while_stat():
-    global token
-    b_quad = nextquad()
-    if token.get_tk_type() is TokenType.LEFT_PARENTHESIS_TK:
-        token = lex()
-        (b_true, b_false) = condition()
-        if token.get_tk_type() is not TokenType.RIGHT_PARENTHESIS_TK:
-            error_line_message(token.get_tk_lineno(), token.get_tk_charno(),
-                               'Expected \')\' but found \'%s\' instead.' % token.get_tk_type())
-        token = lex()
-        backpatch(b_true, nextquad())
-        statements()
-        genquad('jump', '_', '_', b_quad)
-        backpatch(b_false, nextquad())
-    else:
-        error_line_message(token.get_tk_lineno(), token.get_tk_charno(),
-                           'Expected \'(\' after \'while\' but found \'%s\' instead.' % token.get_tk_value())
-
-
-def doublewhile_stat():
-    global token
-    if token.get_tk_type() is TokenType.LEFT_PARENTHESIS_TK:
-        token = lex()
-        condition()
-        if token.get_tk_type() is not TokenType.RIGHT_PARENTHESIS_TK:
-            error_line_message(token.get_tk_lineno(), token.get_tk_charno(),
-                               'Expected \')\' but found \'%s\' instead.' % token.get_tk_type())
-        token = lex()
-        statements()
-        if token.get_tk_type() is not TokenType.ELSE_TK:
-            error_line_message(token.get_tk_lineno(), token.get_tk_charno(),
-                               'Expected \'else\' inside doublewhile but found \'%s\' instead.' % token.get_tk_type())
-        token = lex()
-        statements()
-    else:
-        error_line_message(token.get_tk_lineno(), token.get_tk_charno(),
-                           'Expected \'(\' after \'doublewhile\' but found \'%s\' instead' % token.get_tk_value())
-
-
-def loop_stat():
-    statements()
-
-
-def forcase_stat():
-    global token
-    s_quad = nextquad()
-    # exit_list = emptylist()
-    while token.get_tk_type() is TokenType.WHEN_TK:
-        token = lex()
-        if token.get_tk_type() is TokenType.LEFT_PARENTHESIS_TK:
-            token = lex()
-            (b_true, b_false) = condition()
-            if token.get_tk_type() is TokenType.RIGHT_PARENTHESIS_TK:
-                token = lex()
-                if token.get_tk_type() is TokenType.COLON_TK:
-                    token = lex()
-                    backpatch(b_true, nextquad())
-                    statements()
-                    # tmp_list = makelist(nextquad())
-                    genquad('jump', '_', '_', s_quad)
-                    # exit_list =merge(exit_list,tmp_list)
-                    backpatch(b_false, nextquad())
-                else:
-                    error_line_message(token.get_tk_lineno(), token.get_tk_charno(),
-                                       'Expected \':\' but found \'%s\' instead.' % token.get_tk_value())
+            self.error_line_message(self.__token.get_tk_lineno(), self.__token.get_tk_charno(),
+                                    'Expected \':=\' but found \'%s\' instead.' % self.__token.get_tk_value())
+
+    def if_stat(self):
+        if self.__token.get_tk_type() is TokenType.LEFT_PARENTHESIS_TK:
+            self.__token = self.lex()
+            (b_true, b_false) = self.condition()
+            if self.__token.get_tk_type() is not TokenType.RIGHT_PARENTHESIS_TK:
+                self.error_line_message(self.__token.get_tk_lineno(), self.__token.get_tk_charno(),
+                                        'Expected \')\' after if condition but found \'%s\' instead.' % self.__token.get_tk_value())
+            self.__token = self.lex()
+            if self.__token.get_tk_type() is TokenType.THEN_TK:
+                self.__token = self.lex()
+                self.backpatch(b_true, self.nextquad())
+                self.statements()
+                if_list = self.makelist(self.nextquad())
+                self.genquad('jump')
+                self.backpatch(b_false, self.nextquad())
+                self.elsepart()
+                self.backpatch(if_list, self.nextquad())
             else:
-                error_line_message(token.get_tk_lineno(), token.get_tk_charno(),
-                                   'Expected \')\' but found \'%s\' instead.' % token.get_tk_value())
+                self.error_line_message(self.__token.get_tk_lineno(), self.__token.get_tk_charno(),
+                                        'Expected \'then\' after if condition but found \'%s\' instead.' % self.__token.get_tk_value())
         else:
-            error_line_message(token.get_tk_lineno(), token.get_tk_charno(),
-                               'Expected \'(\' but found \'%s\' instead.' % token.get_tk_value())
-    if token.get_tk_type() is TokenType.DEFAULT_TK:
-        token = lex()
-        if token.get_tk_type() is TokenType.COLON_TK:
-            token = lex()
-            statements()
-            # backpatch(exit_list, nextquad())
+            self.error_line_message(self.__token.get_tk_lineno(), self.__token.get_tk_charno(),
+                                    'Expected \'(\' after if token but found \'%s\' instead.' % self.__token.get_tk_value())
+
+    def elsepart(self):
+        if self.__token.get_tk_type() is TokenType.ELSE_TK:
+            self.__token = self.lex()
+            self.statements()
+
+    def while_stat(self):
+        b_quad = self.nextquad()
+        if self.__token.get_tk_type() is TokenType.LEFT_PARENTHESIS_TK:
+            self.__token = self.lex()
+            (b_true, b_false) = self.condition()
+            if self.__token.get_tk_type() is not TokenType.RIGHT_PARENTHESIS_TK:
+                self.error_line_message(self.__token.get_tk_lineno(), self.__token.get_tk_charno(),
+                                        'Expected \')\' but found \'%s\' instead.' % self.__token.get_tk_type())
+            self.__token = self.lex()
+            self.backpatch(b_true, self.nextquad())
+            self.statements()
+            self.genquad('jump', '_', '_', b_quad)
+            self.backpatch(b_false, self.nextquad())
         else:
-            error_line_message(token.get_tk_lineno(), token.get_tk_charno(),
-                               'Expected \':\' after \'default\' but found \'%s\' instead.' % token.get_tk_value())
+            self.error_line_message(self.__token.get_tk_lineno(), self.__token.get_tk_charno(),
+                                    'Expected \'(\' after \'while\' but found \'%s\' instead.' % self.__token.get_tk_value())
+
+    def doublewhile_stat(self):
+        if self.__token.get_tk_type() is TokenType.LEFT_PARENTHESIS_TK:
+            self.__token = self.lex()
+            self.condition()
+            if self.__token.get_tk_type() is not TokenType.RIGHT_PARENTHESIS_TK:
+                self.error_line_message(self.__token.get_tk_lineno(), self.__token.get_tk_charno(),
+                                        'Expected \')\' but found \'%s\' instead.' % self.__token.get_tk_type())
+            self.__token = self.lex()
+            self.statements()
+            if self.__token.get_tk_type() is not TokenType.ELSE_TK:
+                self.error_line_message(self.__token.get_tk_lineno(), self.__token.get_tk_charno(),
+                                        'Expected \'else\' inside doublewhile but found \'%s\' instead.' % self.__token.get_tk_type())
+            self.__token = self.lex()
+            self.statements()
+        else:
+            self.error_line_message(self.__token.get_tk_lineno(), self.__token.get_tk_charno(),
+                                    'Expected \'(\' after \'doublewhile\' but found \'%s\' instead' % self.__token.get_tk_value())
+
+    def loop_stat(self):
+        self.statements()
+
+    def forcase_stat(self):
+        s_quad = self.nextquad()
+        arms = list()  # (variable, constant, body label) of every arm comparing a variable with a constant, or None
+        loop_jumps = list()  # labels of the jumps back to s_quad
+        # exit_list = emptylist()
+        while self.__token.get_tk_type() is TokenType.WHEN_TK:
+            self.__token = self.lex()
+            if self.__token.get_tk_type() is TokenType.LEFT_PARENTHESIS_TK:
+                self.__token = self.lex()
+                condition_quad = self.nextquad()
+                (b_true, b_false) = self.condition()
+                if self.__token.get_tk_type() is TokenType.RIGHT_PARENTHESIS_TK:
+                    self.__token = self.lex()
+                    if self.__token.get_tk_type() is TokenType.COLON_TK:
+                        self.__token = self.lex()
+                        self.backpatch(b_true, self.nextquad())
+                        arms.append(self.comparison_arm(condition_quad, b_true, b_false))
+                        self.statements()
+                        # tmp_list = makelist(nextquad())
+                        loop_jumps.append(self.nextquad())
+                        self.genquad('jump', '_', '_', s_quad)
+                        # exit_list =merge(exit_list,tmp_list)
+                        self.backpatch(b_false, self.nextquad())
+                    else:
+                        self.error_line_message(self.__token.get_tk_lineno(), self.__token.get_tk_charno(),
+                                                'Expected \':\' but found \'%s\' instead.' % self.__token.get_tk_value())
+                else:
+                    self.error_line_message(self.__token.get_tk_lineno(), self.__token.get_tk_charno(),
+                                            'Expected \')\' but found \'%s\' instead.' % self.__token.get_tk_value())
+            else:
+                self.error_line_message(self.__token.get_tk_lineno(), self.__token.get_tk_charno(),
+                                        'Expected \'(\' but found \'%s\' instead.' % self.__token.get_tk_value())
+        if self.__token.get_tk_type() is TokenType.DEFAULT_TK:
+            self.__token = self.lex()
+            if self.__token.get_tk_type() is TokenType.COLON_TK:
+                self.__token = self.lex()
+                self.dispatch_forcase(s_quad, arms, loop_jumps)
+                self.statements()
+                # backpatch(exit_list, nextquad())
+            else:
+                self.error_line_message(self.__token.get_tk_lineno(), self.__token.get_tk_charno(),
+                                        'Expected \':\' after \'default\' but found \'%s\' instead.' % self.__token.get_tk_value())
 
-    else:
-        error_line_message(token.get_tk_lineno(), token.get_tk_charno(),
-                           'Expected \'default:\' declaration but found \'%s\' instead.' % token.get_tk_value())
-
-
-def incase_stat():
-    global token
-    while token.get_tk_type() is TokenType.WHEN_TK:
-        token = lex()
-        if token.get_tk_type() is TokenType.LEFT_PARENTHESIS_TK:
-            token = lex()
-            condition()
-            if token.get_tk_type() is TokenType.RIGHT_PARENTHESIS_TK:
-                token = lex()
-                if token.get_tk_type() is TokenType.COLON_TK:
-                    token = lex()
-                    statements()
+        else:
+            self.error_line_message(self.__token.get_tk_lineno(), self.__token.get_tk_charno(),
+                                    'Expected \'default:\' declaration but found \'%s\' instead.' % self.__token.get_tk_value())
+
+    # The arm whose condition starts at condition_quad as (variable, constant, body label) if the condition is
+    # just 'variable = constant' or 'constant = variable', None otherwise.
+    def comparison_arm(self, condition_quad, b_true, b_false):
+        if b_true != [condition_quad] or b_false != [condition_quad + 1] or self.nextquad() != condition_quad + 2:
+            return None
+        quad = self.__quads_list[condition_quad - self.__quads_list_start]
+        if quad.get_op() != '=' or is_constant(quad.get_x()) == is_constant(quad.get_y()):
+            return None
+        if is_constant(quad.get_x()):
+            return quad.get_y(), int(quad.get_x()), quad.get_z()
+        return quad.get_x(), int(quad.get_y()), quad.get_z()
+
+    # With -O 1 and up, a forcase whose arms compare one variable with distinct constants tests them all at
+    # once: at most one of them can hold, so the first one holding is the one the value selects. The dispatch
+    # goes where the last condition jumps when no arm holds, right before the default statements, and the
+    # forcase and every arm go back to it instead of s_quad. The conditions of the arms become unreachable
+    # and eliminate_dead_code() removes them, s_quad stays as a jump since code before the forcase leads there.
+    def dispatch_forcase(self, s_quad, arms, loop_jumps):
+        if self.__optimization_level < 1 or len(arms) < min_dispatch_arms or None in arms:
+            return
+        constants = [constant for variable, constant, body in arms]
+        if len({variable for variable, constant, body in arms}) != 1 or len(set(constants)) != len(constants):
+            return
+        dispatch = self.nextquad()
+        first_condition = self.__quads_list[s_quad - self.__quads_list_start]
+        first_condition.set_op('jump')
+        first_condition.set_x('_')
+        first_condition.set_y('_')
+        first_condition.set_z(dispatch)
+        for label in loop_jumps:
+            self.__quads_list[label - self.__quads_list_start].set_z(dispatch)
+        variable = arms[0][0]
+        low, high = min(constants), max(constants)
+        if high - low + 1 <= max_table_spread * len(arms):
+            bodies = {constant: body for variable, constant, body in arms}
+            default = dispatch + 1 + high - low + 1
+            self.genquad('table', variable, low, high - low + 1)
+            for value in range(low, high + 1):
+                self.genquad('jump', '_', '_', bodies.get(value, default))
+        else:
+            self.backpatch(self.search_dispatch(variable, sorted((constant, body) for variable, constant, body in arms)),
+                           self.nextquad())
+
+    # Binary search for variable among the (constant, body label) arms sorted by constant. Returns the labels
+    # of the jumps taken when no constant matches.
+    def search_dispatch(self, variable, arms):
+        if len(arms) <= search_leaf_arms:
+            for constant, body in arms:
+                self.genquad('=', variable, str(constant), body)
+            not_found = self.makelist(self.nextquad())
+            self.genquad('jump')
+            return not_found
+        middle = len(arms) // 2
+        lower = self.makelist(self.nextquad())
+        self.genquad('<', variable, str(arms[middle][0]))
+        not_found = self.search_dispatch(variable, arms[middle:])
+        self.backpatch(lower, self.nextquad())
+        return self.merge(not_found, self.search_dispatch(variable, arms[:middle]))
+
+    def incase_stat(self):
+        while self.__token.get_tk_type() is TokenType.WHEN_TK:
+            self.__token = self.lex()
+            if self.__token.get_tk_type() is TokenType.LEFT_PARENTHESIS_TK:
+                self.__token = self.lex()
+                self.condition()
+                if self.__token.get_tk_type() is TokenType.RIGHT_PARENTHESIS_TK:
+                    self.__token = self.lex()
+                    if self.__token.get_tk_type() is TokenType.COLON_TK:
+                        self.__token = self.lex()
+                        self.statements()
+                    else:
+                        self.error_line_message(self.__token.get_tk_lineno(), self.__token.get_tk_charno(),
+                                                'Expected \':\' but found \'%s\' instead.' % self.__token.get_tk_value())
                 else:
-                    error_line_message(token.get_tk_lineno(), token.get_tk_charno(),
-                                       'Expected \':\' but found \'%s\' instead.' % token.get_tk_value())
+                    self.error_line_message(self.__token.get_tk_lineno(), self.__token.get_tk_charno(),
+                                            'Expected \')\' but found \'%s\' instead.' % self.__token.get_tk_value())
             else:
-                error_line_message(token.get_tk_lineno(), token.get_tk_charno(),
-                                   'Expected \')\' but found \'%s\' instead.' % token.get_tk_value())
+                self.error_line_message(self.__token.get_tk_lineno(), self.__token.get_tk_charno(),
+                                        'Expected \'(\' but found \'%s\' instead.' % self.__token.get_tk_value())
+
+    def return_stat(self):
+        exp = self.expression()
+        self.genquad('retv', exp)
+
+    def call_stat(self):
+        if self.__token.get_tk_type() is TokenType.ID_TK:
+            procedure_id = self.__token.get_tk_value()
+            if procedure_id not in self.__procedure_id_list:
+                self.error_line_message(self.__token.get_tk_lineno(), self.__token.get_tk_charno(),
+                                        'Calling undefined procedure \'%s\'.' % procedure_id, error_type=SemanticError)
+            if self.search_entity(procedure_id) is None:
+                self.error_line_message(self.__token.get_tk_lineno(), self.__token.get_tk_charno(),
+                                        'Undefined procedure \'%s\'.' % procedure_id, error_type=SemanticError)
+            self.__token = self.lex()
+            self.actualpars()
+            self.genquad('call', procedure_id)
         else:
-            error_line_message(token.get_tk_lineno(), token.get_tk_charno(),
-                               'Expected \'(\' but found \'%s\' instead.' % token.get_tk_value())
-
-
-def return_stat():
-    global token
-    exp = expression()
-    genquad('retv', exp)
-
-
-def call_stat():
-    global token
-    if token.get_tk_type() is TokenType.ID_TK:
-        procedure_id = token.get_tk_value()
-        if procedure_id not in procedure_id_list:
-            error_line_message(token.get_tk_lineno(), token.get_tk_charno(),
-                               'Calling undefined procedure \'%s\'.' % procedure_id)
-        if search_entity(procedure_id) is None:
-            error_line_message(token.get_tk_lineno(), token.get_tk_charno(),
-                               'Undefined procedure \'%s\'.' % procedure_id)
-        token = lex()
-        actualpars()
-        genquad('call', procedure_id)
-    else:
-        error_line_message(token.get_tk_lineno(), token.get_tk_charno(),
-                           'Expected function or procedure id but found \'%s\' instead.' % token.get_tk_value())
-
-
-def print_stat():
-    global token
-    if token.get_tk_type() is TokenType.LEFT_PARENTHESIS_TK:
-        token = lex()
-        exp = expression()
-        genquad('out', exp)
-        if token.get_tk_type() is not TokenType.RIGHT_PARENTHESIS_TK:
-            error_line_message(token.get_tk_lineno(), token.get_tk_charno(),
-                               'Expected \')\' but found \'%s\' instead.' % token.get_tk_value())
-        token = lex()
-    else:
-        error_line_message(token.get_tk_lineno(), token.get_tk_charno(),
-                           'Expected \'(\' but found \'%s\' instead.' % token.get_tk_value())
-
-
-def input_stat():
-    global token
-    if token.get_tk_type() is TokenType.LEFT_PARENTHESIS_TK:
-        token = lex()
-        if token.get_tk_type() is not TokenType.ID_TK:
-            error_line_message(token.get_tk_lineno(), token.get_tk_charno(),
-                               'Expected variable id but found \'%s\' instead.' % token.get_tk_value())
-        id_name = token.get_tk_value()
-        if search_entity(id_name) is None:
-            error_line_message(token.get_tk_lineno(), token.get_tk_charno(), 'Undefined variable id \'%s\'.' % id_name)
-        genquad('inp', id_name)
-        token = lex()
-        if token.get_tk_type() is not TokenType.RIGHT_PARENTHESIS_TK:
-            error_line_message(token.get_tk_lineno(), token.get_tk_charno(),
-                               'Expected \')\' but found \'%s\' instead.' % token.get_tk_value())
-        token = lex()
-    else:
-        error_line_message(token.get_tk_lineno(), token.get_tk_charno(),
-                           'Expected \'(\' but found \'%s\' instead' % token.get_tk_value())
-
-
-def condition():
-    global token
-    (b_true, b_false) = boolterm()
-    while token.get_tk_type() is TokenType.OR_TK:
-        backpatch(b_false, nextquad())
-        token = lex()
-        (b2_true, b2_false) = boolterm()
-        b_true = merge(b_true, b2_true)
-        b_false = b2_false
-    return (b_true, b_false)
-
-
-def boolterm():
-    global token
-    (q_true, q_false) = boolfactor()
-    while token.get_tk_type() is TokenType.AND_TK:
-        backpatch(q_true, nextquad())
-        token = lex()
-        (r2_true, r2_false) = boolfactor()
-        q_false = merge(q_false, r2_false)
-        q_true = r2_true
-    return (q_true, q_false)
-
-
-def boolfactor():
-    global token
-    if token.get_tk_type() is TokenType.NOT_TK:
-        token = lex()
-        if token.get_tk_type() is TokenType.LEFT_BRACKET_TK:
-            token = lex()
-            ret = condition()
-            ret = ret[::-1]
-            if token.get_tk_type() is not TokenType.RIGHT_BRACKET_TK:
-                error_line_message(token.get_tk_lineno(), token.get_tk_charno(),
-                                   'Expected \']\' but found \'%s\' instead.' % token.get_tk_value())
-            token = lex()
+            self.error_line_message(self.__token.get_tk_lineno(), self.__token.get_tk_charno(),
+                                    'Expected function or procedure id but found \'%s\' instead.' % self.__token.get_tk_value())
+
+    def print_stat(self):
+        if self.__token.get_tk_type() is TokenType.LEFT_PARENTHESIS_TK:
+            self.__token = self.lex()
+            exp = self.expression()
+            self.genquad('out', exp)
+            if self.__token.get_tk_type() is not TokenType.RIGHT_PARENTHESIS_TK:
+                self.error_line_message(self.__token.get_tk_lineno(), self.__token.get_tk_charno(),
+                                        'Expected \')\' but found \'%s\' instead.' % self.__token.get_tk_value())
+            self.__token = self.lex()
         else:
-            error_line_message(token.get_tk_lineno(), token.get_tk_charno(),
-                               'Expected \'[\' after \'not\' but found \'%s\' instead.' % token.get_tk_value())
-    elif token.get_tk_type() is TokenType.LEFT_BRACKET_TK:
-        token = lex()
-        ret = condition()
-        if token.get_tk_type() is not TokenType.RIGHT_BRACKET_TK:
-            error_line_message(token.get_tk_lineno(), token.get_tk_charno(),
-                               'Expected \']\' but found \'%s\' instead.' % token.get_tk_value())
-        token = lex()
-    else:
-        exp1 = expression()
-        op = relational_oper()
-        exp2 = expression()
-        r_true = makelist(nextquad())
-        genquad(op, exp1, exp2)
-        r_false = makelist(nextquad())
-        genquad('jump')
-        ret = (r_true, r_false)
-    return ret
-
-
-def relational_oper():
-    global token
-    op = token.get_tk_value()
-    if token.get_tk_type() is not TokenType.EQUAL_TK and \
-            token.get_tk_type() is not TokenType.LESS_THAN_OR_EQUAL_TK and \
-            token.get_tk_type() is not TokenType.LESS_TK and \
-            token.get_tk_type() is not TokenType.GREATER_THAN_OR_EQUAL_TK and \
-            token.get_tk_type() is not TokenType.GREATER_TK and \
-            token.get_tk_type() is not TokenType.LESS_THAN_OR_EQUAL_TK and \
-            token.get_tk_type() is not TokenType.NOT_EQUAL_TK:
-        error_line_message(token.get_tk_lineno(), token.get_tk_charno(),
-                           'Expected relational operator but found \'%s\' instead.' % token.get_tk_value())
-    token = lex()
-    return op
-
-
-def expression():
-    global token
-    op_sign = optional_sign()
-    term_1 = term()
-    if op_sign != None:
-        signtmp = newtemp()
-        genquad('-', 0, term_1, signtmp)
-        term_1 = signtmp
-    while token.get_tk_type() is TokenType.PLUS_TK or token.get_tk_type() is TokenType.MINUS_TK:
-        oper = add_oper()
-        term_2 = term()
-        tmpvar = newtemp()
-        genquad(oper, term_1, term_2, tmpvar)
-        term_1 = tmpvar
-    return term_1
-
-
-def optional_sign():
-    global token
-    if token.get_tk_type() is TokenType.PLUS_TK or token.get_tk_type() is TokenType.MINUS_TK:
-        return add_oper()
-
-
-def term():
-    global token
-    factor_1 = factor()
-    while token.get_tk_type() is TokenType.SLASH_TK or token.get_tk_type() is TokenType.TIMES_TK:
-        m_oper = mul_oper()
-        factor_2 = factor()
-        tmpvar = newtemp()
-        genquad(m_oper, factor_1, factor_2, tmpvar)
-        factor_1 = tmpvar
-    return factor_1
-
-
-def factor():
-    global token
-    if token.get_tk_type() is TokenType.NUMBER_TK:
-        ret = token.get_tk_value()
-        token = lex()
-    elif token.get_tk_type() is TokenType.LEFT_PARENTHESIS_TK:
-        token = lex()
-        ret = expression()
-        if token.get_tk_type() is not TokenType.RIGHT_PARENTHESIS_TK:
-            error_line_message(token.get_tk_lineno(), token.get_tk_charno(),
-                               'Expected \')\' but found \'%s\' instead.' % token.get_tk_value())
-        token = lex()
-    elif token.get_tk_type() is TokenType.ID_TK:
-        ret = token.get_tk_value()
-        ret_charno = token.get_tk_charno()
-        ret_lineno = token.get_tk_lineno()
-        entity = search_entity(ret)
-        if entity is None:
-            error_line_message(token.get_tk_lineno(), token.get_tk_charno(), 'Undefined id \'%s\'.' % ret)
-        token = lex()
-        tail = idtail()
-        if tail is not None:
-            if ret in procedure_id_list:
-                error_line_message(ret_lineno, ret_charno,
-                                   'Calling procedure \'%s\' with assignment. Procedures do not have \'return\' statement.' % ret)
-            function_return = newtemp()
-            genquad('par', function_return, 'RET')
-            genquad('call', ret)
-            ret = function_return
-    else:
-        error_line_message(token.get_tk_lineno(), token.get_tk_charno(),
-                           'Expected factor but found \'%s\' instead.' % token.get_tk_value())
-    return ret
-
-
-def idtail():
-    global token
-    if token.get_tk_type() is TokenType.LEFT_PARENTHESIS_TK:
-        return actualpars()
-
-
-def add_oper():
-    global token
-    op = token.get_tk_value()
-    if token.get_tk_type() is not TokenType.PLUS_TK and token.get_tk_type() is not TokenType.MINUS_TK:
-        error_line_message(token.get_tk_lineno(), token.get_tk_charno(),
-                           'Expected \'+\' or \'-\' but found \'%s\' instead.' % token.get_tk_value())
-    token = lex()
-    return op
-
-
-def mul_oper():
-    global token
-    op = token.get_tk_value()
-    if token.get_tk_type() is not TokenType.TIMES_TK and token.get_tk_type() is not TokenType.SLASH_TK:
-        error_line_message(token.get_tk_lineno(), token.get_tk_charno(),
-                           'Expected \'*\' or \'/\' but found \'%s\' instead.' % token.get_tk_value())
-    token = lex()
-    return op
-
-
-def actualpars():
-    global token
-    if token.get_tk_type() is TokenType.LEFT_PARENTHESIS_TK:
-        token = lex()
-        actualparlist()
-        if token.get_tk_type() is not TokenType.RIGHT_PARENTHESIS_TK:
-            error_line_message(token.get_tk_lineno(), token.get_tk_charno(),
-                               'Expected \')\' but found \'%s\' instead.' % token.get_tk_value())
-        token = lex()
-        return True
-    else:
-        error_line_message(token.get_tk_lineno(), token.get_tk_charno(),
-                           'Expected \'(\' after procedure or function call  but found \'%s\' instead.' % token.get_tk_value())
-
-
-def actualparlist():
-    global token
-    if token.get_tk_type() is TokenType.IN_TK or token.get_tk_type() is TokenType.INOUT_TK:
-        actualparitem()
-        while token.get_tk_type() is TokenType.COMMA_TK:
-            token = lex()
-            actualparitem()
-
-
-def actualparitem():
-    global token
-    if token.get_tk_type() is TokenType.IN_TK:
-        token = lex()
-        exp = expression()
-        genquad('par', exp, 'CV')
-    elif token.get_tk_type() is TokenType.INOUT_TK:
-        token = lex()
-        parameter_id = token.get_tk_value()
-        if token.get_tk_type() is not TokenType.ID_TK:
-            error_line_message(token.get_tk_lineno(), token.get_tk_charno(),
-                               'Expected variable id but found \'%s\' instead.' % token.get_tk_value())
-        if search_entity(parameter_id) is None:
-            error_line_message(token.get_tk_lineno(), token.get_tk_charno(),
-                               'Undefined actual parameter entity \'%s\'.' % parameter_id)
-        token = lex()
-        genquad('par', parameter_id, 'REF')
-    else:
-        error_line_message(token.get_tk_lineno(), token.get_tk_charno(),
-                           'Expected parameter type in or inout but found \'%s\' instead.' % token.get_tk_value())
+            self.error_line_message(self.__token.get_tk_lineno(), self.__token.get_tk_charno(),
+                                    'Expected \'(\' but found \'%s\' instead.' % self.__token.get_tk_value())
+
+    def input_stat(self):
+        if self.__token.get_tk_type() is TokenType.LEFT_PARENTHESIS_TK:
+            self.__token = self.lex()
+            if self.__token.get_tk_type() is not TokenType.ID_TK:
+                self.error_line_message(self.__token.get_tk_lineno(), self.__token.get_tk_charno(),
+                                        'Expected variable id but found \'%s\' instead.' % self.__token.get_tk_value())
+            id_name = self.__token.get_tk_value()
+            if self.search_entity(id_name) is None:
+                self.error_line_message(self.__token.get_tk_lineno(), self.__token.get_tk_charno(), 'Undefined variable id \'%s\'.' % id_name, error_type=SemanticError)
+            self.genquad('inp', id_name)
+            self.__token = self.lex()
+            if self.__token.get_tk_type() is not TokenType.RIGHT_PARENTHESIS_TK:
+                self.error_line_message(self.__token.get_tk_lineno(), self.__token.get_tk_charno(),
+                                        'Expected \')\' but found \'%s\' instead.' % self.__token.get_tk_value())
+            self.__token = self.lex()
+        else:
+            self.error_line_message(self.__token.get_tk_lineno(), self.__token.get_tk_charno(),
+                                    'Expected \'(\' but found \'%s\' instead' % self.__token.get_tk_value())
+
+    def condition(self):
+        (b_true, b_false) = self.boolterm()
+        while self.__token.get_tk_type() is TokenType.OR_TK:
+            self.backpatch(b_false, self.nextquad())
+            self.__token = self.lex()
+            (b2_true, b2_false) = self.boolterm()
+            b_true = self.merge(b_true, b2_true)
+            b_false = b2_false
+        return (b_true, b_false)
+
+    def boolterm(self):
+        (q_true, q_false) = self.boolfactor()
+        while self.__token.get_tk_type() is TokenType.AND_TK:
+            self.backpatch(q_true, self.nextquad())
+            self.__token = self.lex()
+            (r2_true, r2_false) = self.boolfactor()
+            q_false = self.merge(q_false, r2_false)
+            q_true = r2_true
+        return (q_true, q_false)
+
+    def boolfactor(self):
+        if self.__token.get_tk_type() is TokenType.NOT_TK:
+            self.__token = self.lex()
+            if self.__token.get_tk_type() is TokenType.LEFT_BRACKET_TK:
+                self.__token = self.lex()
+                ret = self.condition()
+                ret = ret[::-1]
+                if self.__token.get_tk_type() is not TokenType.RIGHT_BRACKET_TK:
+                    self.error_line_message(self.__token.get_tk_lineno(), self.__token.get_tk_charno(),
+                                            'Expected \']\' but found \'%s\' instead.' % self.__token.get_tk_value())
+                self.__token = self.lex()
+            else:
+                self.error_line_message(self.__token.get_tk_lineno(), self.__token.get_tk_charno(),
+                                        'Expected \'[\' after \'not\' but found \'%s\' instead.' % self.__token.get_tk_value())
+        elif self.__token.get_tk_type() is TokenType.LEFT_BRACKET_TK:
+            self.__token = self.lex()
+            ret = self.condition()
+            if self.__token.get_tk_type() is not TokenType.RIGHT_BRACKET_TK:
+                self.error_line_message(self.__token.get_tk_lineno(), self.__token.get_tk_charno(),
+                                        'Expected \']\' but found \'%s\' instead.' % self.__token.get_tk_value())
+            self.__token = self.lex()
+        else:
+            exp1 = self.expression()
+            op = self.relational_oper()
+            exp2 = self.expression()
+            r_true = self.makelist(self.nextquad())
+            self.genquad(op, exp1, exp2)
+            r_false = self.makelist(self.nextquad())
+            self.genquad('jump')
+            ret = (r_true, r_false)
+        return ret
+
+    def relational_oper(self):
+        op = self.__token.get_tk_value()
+        if self.__token.get_tk_type() is not TokenType.EQUAL_TK and \
+                self.__token.get_tk_type() is not TokenType.LESS_THAN_OR_EQUAL_TK and \
+                self.__token.get_tk_type() is not TokenType.LESS_TK and \
+                self.__token.get_tk_type() is not TokenType.GREATER_THAN_OR_EQUAL_TK and \
+                self.__token.get_tk_type() is not TokenType.GREATER_TK and \
+                self.__token.get_tk_type() is not TokenType.LESS_THAN_OR_EQUAL_TK and \
+                self.__token.get_tk_type() is not TokenType.NOT_EQUAL_TK:
+            self.error_line_message(self.__token.get_tk_lineno(), self.__token.get_tk_charno(),
+                                    'Expected relational operator but found \'%s\' instead.' % self.__token.get_tk_value())
+        self.__token = self.lex()
+        return op
+
+    def expression(self):
+        op_sign = self.optional_sign()
+        term_1 = self.term()
+        if op_sign != None:
+            signtmp = self.newtemp()
+            self.genquad('-', 0, term_1, signtmp)
+            term_1 = signtmp
+        while self.__token.get_tk_type() is TokenType.PLUS_TK or self.__token.get_tk_type() is TokenType.MINUS_TK:
+            oper = self.add_oper()
+            term_2 = self.term()
+            tmpvar = self.newtemp()
+            self.genquad(oper, term_1, term_2, tmpvar)
+            term_1 = tmpvar
+        return term_1
+
+    def optional_sign(self):
+        if self.__token.get_tk_type() is TokenType.PLUS_TK or self.__token.get_tk_type() is TokenType.MINUS_TK:
+            return self.add_oper()
+
+    def term(self):
+        factor_1 = self.factor()
+        while self.__token.get_tk_type() is TokenType.SLASH_TK or self.__token.get_tk_type() is TokenType.TIMES_TK:
+            m_oper = self.mul_oper()
+            factor_2 = self.factor()
+            tmpvar = self.newtemp()
+            self.genquad(m_oper, factor_1, factor_2, tmpvar)
+            factor_1 = tmpvar
+        return factor_1
+
+    def factor(self):
+        if self.__token.get_tk_type() is TokenType.NUMBER_TK:
+            ret = self.__token.get_tk_value()
+            self.__token = self.lex()
+        elif self.__token.get_tk_type() is TokenType.LEFT_PARENTHESIS_TK:
+            self.__token = self.lex()
+            ret = self.expression()
+            if self.__token.get_tk_type() is not TokenType.RIGHT_PARENTHESIS_TK:
+                self.error_line_message(self.__token.get_tk_lineno(), self.__token.get_tk_charno(),
+                                        'Expected \')\' but found \'%s\' instead.' % self.__token.get_tk_value())
+            self.__token = self.lex()
+        elif self.__token.get_tk_type() is TokenType.ID_TK:
+            ret = self.__token.get_tk_value()
+            ret_charno = self.__token.get_tk_charno()
+            ret_lineno = self.__token.get_tk_lineno()
+            entity = self.search_entity(ret)
+            if entity is None:
+                self.error_line_message(self.__token.get_tk_lineno(), self.__token.get_tk_charno(), 'Undefined id \'%s\'.' % ret, error_type=SemanticError)
+            self.__token = self.lex()
+            tail = self.idtail()
+            if tail is not None:
+                if ret in self.__procedure_id_list:
+                    self.error_line_message(ret_lineno, ret_charno,
+                                            'Calling procedure \'%s\' with assignment. Procedures do not have \'return\' statement.' % ret, error_type=SemanticError)
+                function_return = self.newtemp()
+                self.genquad('par', function_return, 'RET')
+                self.genquad('call', ret)
+                ret = function_return
+        else:
+            self.error_line_message(self.__token.get_tk_lineno(), self.__token.get_tk_charno(),
+                                    'Expected factor but found \'%s\' instead.' % self.__token.get_tk_value())
+        return ret
+
+    def idtail(self):
+        if self.__token.get_tk_type() is TokenType.LEFT_PARENTHESIS_TK:
+            return self.actualpars()
+
+    def add_oper(self):
+        op = self.__token.get_tk_value()
+        if self.__token.get_tk_type() is not TokenType.PLUS_TK and self.__token.get_tk_type() is not TokenType.MINUS_TK:
+            self.error_line_message(self.__token.get_tk_lineno(), self.__token.get_tk_charno(),
+                                    'Expected \'+\' or \'-\' but found \'%s\' instead.' % self.__token.get_tk_value())
+        self.__token = self.lex()
+        return op
+
+    def mul_oper(self):
+        op = self.__token.get_tk_value()
+        if self.__token.get_tk_type() is not TokenType.TIMES_TK and self.__token.get_tk_type() is not TokenType.SLASH_TK:
+            self.error_line_message(self.__token.get_tk_lineno(), self.__token.get_tk_charno(),
+                                    'Expected \'*\' or \'/\' but found \'%s\' instead.' % self.__token.get_tk_value())
+        self.__token = self.lex()
+        return op
+
+    def actualpars(self):
+        if self.__token.get_tk_type() is TokenType.LEFT_PARENTHESIS_TK:
+            self.__token = self.lex()
+            self.actualparlist()
+            if self.__token.get_tk_type() is not TokenType.RIGHT_PARENTHESIS_TK:
+                self.error_line_message(self.__token.get_tk_lineno(), self.__token.get_tk_charno(),
+                                        'Expected \')\' but found \'%s\' instead.' % self.__token.get_tk_value())
+            self.__token = self.lex()
+            return True
+        else:
+            self.error_line_message(self.__token.get_tk_lineno(), self.__token.get_tk_charno(),
+                                    'Expected \'(\' after procedure or function call  but found \'%s\' instead.' % self.__token.get_tk_value())
+
+    def actualparlist(self):
+        if self.__token.get_tk_type() is TokenType.IN_TK or self.__token.get_tk_type() is TokenType.INOUT_TK:
+            self.actualparitem()
+            while self.__token.get_tk_type() is TokenType.COMMA_TK:
+                self.__token = self.lex()
+                self.actualparitem()
+
+    def actualparitem(self):
+        if self.__token.get_tk_type() is TokenType.IN_TK:
+            self.__token = self.lex()
+            exp = self.expression()
+            self.genquad('par', exp, 'CV')
+        elif self.__token.get_tk_type() is TokenType.INOUT_TK:
+            self.__token = self.lex()
+            parameter_id = self.__token.get_tk_value()
+            if self.__token.get_tk_type() is not TokenType.ID_TK:
+                self.error_line_message(self.__token.get_tk_lineno(), self.__token.get_tk_charno(),
+                                        'Expected variable id but found \'%s\' instead.' % self.__token.get_tk_value())
+            if self.search_entity(parameter_id) is None:
+                self.error_line_message(self.__token.get_tk_lineno(), self.__token.get_tk_charno(),
+                                        'Undefined actual parameter entity \'%s\'.' % parameter_id, error_type=SemanticError)
+            self.__token = self.lex()
+            self.genquad('par', parameter_id, 'REF')
+        else:
+            self.error_line_message(self.__token.get_tk_lineno(), self.__token.get_tk_charno(),
+                                    'Expected parameter type in or inout but found \'%s\' instead.' % self.__token.get_tk_value())
 
 
 ##############################################################
@@ -1358,48 +1903,429 @@ def actualparitem():
 #                   main driver program                      #
 #                                                            #
 ##############################################################
-def main(input_filename):
-    intermediate_code_filepath = input_filename[:-4] + '.int'
-    c_equivalent_filepath = input_filename[:-4] + '.c'
-    asm_code_filepath = input_filename[:-4] + '.asm'
-    open_files(input_filename, intermediate_code_filepath, c_equivalent_filepath, asm_code_filepath)
-
-    global token
-    # Begin syntax analysis
-    token = lex()
-    program()
-    if token.get_tk_type() is not TokenType.EOF_TK:
-        error_line_message(token.get_tk_lineno(), token.get_tk_charno(),
-                           'Expected \'EOF\' but found \'%s\' instead.' % token.get_tk_value())
-
-    generate_intermediate_code_file()
-    if not subprogram_exists:
-        generate_c_code_file()
+def error_file_not_found(infile):
+    print(
+        '[' + ShellColors.RED + 'ERROR' + ShellColors.END + ']' + ' File:' + ShellColors.GREEN + ' ' + infile + ' ' + ShellColors.END + 'does not exist.')
+    sys.exit(1)
+
+
+def error(*args):
+    print('[' + ShellColors.RED + 'ERROR' + ShellColors.END + ']', *args)
+    sys.exit(1)
+
+
+# Print a compile error the way the command line compiler always reported it.
+def print_compile_error(compile_error):
+    if isinstance(compile_error, MultipleCompileErrors):
+        for error in compile_error.get_errors():
+            print_compile_error(error)
+        print('%d errors generated.' % len(compile_error.get_errors()))
+        return
+    if compile_error.get_lineno() is None:
+        print('[' + ShellColors.RED + 'ERROR' + ShellColors.END + ']', compile_error.get_message())
+        return
+    print('[' + ShellColors.RED + 'ERROR' + ShellColors.END + ']',
+          ShellColors.BOLD + '%s:%d:%d:' % (compile_error.get_filename(), compile_error.get_lineno(),
+                                            compile_error.get_charno()) + ShellColors.END,
+          compile_error.get_message())
+    if compile_error.get_snippet() is not None:
+        print(compile_error.get_snippet().replace('\t', ' ') + ' ')  # \t and \n count as 1 character
+        print(ShellColors.GREEN + ' ' * (compile_error.get_charno() - 2) + '^' + ShellColors.END)
+
+
+file_creation_mask = os.umask(0)  # the umask can only be read by replacing it, so put it back right away
+os.umask(file_creation_mask)
+
+
+# Write contents through a temporary file renamed over filepath, so filepath never holds a half written file.
+# contents is a str or, for binary files, bytes.
+def write_file(filepath, contents):
+    with replacing_file(filepath, binary=isinstance(contents, bytes)) as outfile:
+        outfile.write(contents)
+
+
+# A temporary file next to filepath, renamed over it once the with block ends and removed if it raises.
+@contextlib.contextmanager
+def replacing_file(filepath, binary=False):
+    descriptor, temporary_filepath = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(filepath)),
+                                                      prefix='.' + os.path.basename(filepath) + '.')
+    try:
+        with os.fdopen(descriptor, 'wb') if binary else os.fdopen(descriptor, 'w', encoding='utf-8') as outfile:
+            yield outfile
+        os.chmod(temporary_filepath, 0o666 & ~file_creation_mask)  # mkstemp() creates the file private
+        os.replace(temporary_filepath, filepath)
+    except BaseException:
+        os.remove(temporary_filepath)
+        raise
+
+
+# Compile input_filename, a .min file or with backend an .int or .intb file with the .layout file next to it.
+# With a cache, the result of a source compiled before with the same compiler and options is read back from it
+# and the messages of that compilation are printed again.
+def compile_input(compiler, input_filename, backend=False, cache=None):
+    if not backend and cache is not None:
+        with open(input_filename, 'rb') as infile:
+            source = infile.read()
+        key = cache.key(source)
+        entry = cache.load(key)
+        if entry is not None:
+            print(entry['console'].replace(file_reference(cached_filename), file_reference(input_filename)), end='')
+            return result_from_cache_entry(entry, input_filename)
+        console = io.StringIO()
+        try:
+            with contextlib.redirect_stdout(console):
+                # decoded as compile_file() reads it, with universal newlines
+                result = compiler.compile(source.decode('utf-8').replace('\r\n', '\n').replace('\r', '\n'),
+                                          input_filename)
+        finally:
+            print(console.getvalue(), end='')
+        cache.store(key, result.to_cache_entry(console.getvalue().replace(file_reference(input_filename),
+                                                                          file_reference(cached_filename))),
+                    write_file)
+        return result
+    if not backend:
+        return compiler.compile_file(input_filename)
+    layout_filepath = os.path.splitext(input_filename)[0] + '.layout'
+    if not os.path.exists(layout_filepath):
+        raise IntermediateCodeError('Frame layout \'%s\' not found, compile the source with --layout first.'
+                                    % layout_filepath, input_filename)
+    return compiler.compile_intermediate(load_intermediate_code(input_filename), load_layout(layout_filepath),
+                                         input_filename)
+
+
+# Compile input_filename and write the .int, .c and .asm files next to it, the .intb file if intb and the
+# .layout file if layout. The backend only writes the .c and .asm files. With stream the .int and .asm files
+# are written block by block while compiling, and neither the cache nor the .intb and .layout files are used.
+def compile_to_files(compiler, input_filename, intb=False, layout=False, backend=False, cache=None, stream=False):
+    base_filepath = os.path.splitext(input_filename)[0]
+    intermediate_code_filepath = base_filepath + '.int'
+    c_equivalent_filepath = base_filepath + '.c'
+    asm_code_filepath = base_filepath + '.asm'
+
+    if stream:
+        with replacing_file(intermediate_code_filepath) as intermediate_file, \
+                replacing_file(asm_code_filepath) as asm_file:
+            result = compiler.compile_file_streaming(input_filename, intermediate_file, asm_file)
     else:
-        warning("Subprogram declared. Intermediate code to C equivalent file generation aborted.")
-        # close and delete the empty file
-        global c_code_file
-        c_code_file.close()
+        result = compile_input(compiler, input_filename, backend, cache)
+
+    start = time.perf_counter()
+    if not backend and not stream:
+        write_file(intermediate_code_filepath, result.get_intermediate_code())
+        if intb:
+            write_file(base_filepath + '.intb', result.get_intermediate_code_binary())
+        if layout:
+            write_file(base_filepath + '.layout', layout_to_json(result.get_frame_layout()))
+    if result.get_c_code() is not None:
+        write_file(c_equivalent_filepath, result.get_c_code())
+    elif os.path.exists(c_equivalent_filepath):
+        # do not leave a stale C equivalent file from a previous compilation
         os.remove(c_equivalent_filepath)
+    if not stream:
+        write_file(asm_code_filepath, result.get_asm_code())
+    if result.get_profile() is not None:
+        result.get_profile().add_time('write', time.perf_counter() - start)
+    return result
+
+
+def print_counters(profile):
+    total = profile.get_total()
+    counters = total.get_counters()
+    print('Compilation counters:')
+    for counter in ('tokens', 'quads', 'temporaries', 'lookups', 'instructions'):
+        print('    %-24s %d' % (counter, counters[counter]))
+    print('    %-24s %.2f' % ('average lookup depth', total.get_average_lookup_depth()))
+
+
+# Integers separated by white space in infile, read as the program asks for them.
+def read_integers(infile):
+    for line in infile:
+        for word in line.split():
+            try:
+                yield int(word)
+            except ValueError:
+                raise ExecutionError('Expected an integer as input but found \'%s\'.' % word)
+
+
+# Run the compiled program with the quad interpreter, reading its input from stdin.
+def run_program(result, show_stats=False):
+    start = time.perf_counter()
+    try:
+        steps = Interpreter(result.get_quads(), result.get_frame_layout(), result.get_filename()).run(
+            read_integers(sys.stdin), sys.stdout.write)
+    except ExecutionError as execution_error:
+        sys.stdout.flush()
+        with contextlib.redirect_stdout(sys.stderr):
+            error('Execution stopped at %s' % execution_error)
+    sys.stdout.flush()
+    if show_stats:
+        print('Executed %d quads in %.3fs' % (steps, time.perf_counter() - start), file=sys.stderr)
+
+
+# compiler_options holds the keyword arguments every Compiler of this run is created with and file_options
+# those of compile_to_files(), cache_options those of CompileCache or None without a cache. With stdout_artifact
+# set ('asm', 'int', 'intb' or 'c') no file is written, that artifact is printed instead and every other message
+# goes to stderr. With run set no file is written either and the program runs with the quad interpreter.
+# A compiler created with profile=True prints its profile with show_profile and writes it to profile_filepath.
+# dump_symbols ('text' or 'json') prints the symbol table of every closed scope to stdout, every other message
+# then goes to stderr, unless stdout_artifact or run already take stdout and the dump goes to stderr as well.
+def main(input_filename, compiler_options, show_stats=False, stdout_artifact=None, file_options=None,
+         cache_options=None, run=False, show_profile=False, profile_filepath=None, dump_symbols=None):
+    file_options = file_options or dict()
+    cache = CompileCache(options=compiler_options, **cache_options) if cache_options is not None else None
+    symbols_file = sys.stdout if stdout_artifact is None and not run else sys.stderr
+    quiet = stdout_artifact is not None or run or dump_symbols is not None
+    with contextlib.redirect_stdout(sys.stderr if quiet else sys.stdout):
+        try:
+            if stdout_artifact is None and not run:
+                result = compile_to_files(Compiler(**compiler_options), input_filename, cache=cache, **file_options)
+            else:
+                result = compile_input(Compiler(**compiler_options), input_filename, file_options.get('backend', False),
+                                       cache)
+        except CompileError as compile_error:
+            print_compile_error(compile_error)
+            sys.exit(1)
+        print("Main program framelength: %d" % result.get_main_program_framelength())
+        for subprogram_name, framelength, shared_framelength in result.get_frame_lengths():
+            print("Framelength of '%s': %d -> %d with shared temporary slots" % (subprogram_name, framelength, shared_framelength))
+        if show_stats:
+            print('Peephole rule hits:')
+            for rule, hits in result.get_peephole_hits().items():
+                print('    %-24s %d' % (rule, hits))
+        profile = result.get_profile()
+        if show_stats and profile is not None:
+            print_counters(profile)
+        if show_profile and profile is not None:
+            print(profile.to_text(), end='')
+        if profile_filepath is not None and profile is not None:
+            write_file(profile_filepath, profiles_to_json([profile]))
+        if dump_symbols == 'json':
+            print(symbols_to_json(result.get_frame_layout()), end='', file=symbols_file)
+        elif dump_symbols is not None:
+            print(symbols_to_text(result.get_frame_layout()), end='', file=symbols_file)
+        if stdout_artifact is None and not run:
+            return
+        if stdout_artifact == 'intb':
+            artifact = result.get_intermediate_code_binary()
+        elif stdout_artifact is not None:
+            artifact = {'asm': result.get_asm_code(), 'int': result.get_intermediate_code(),
+                        'c': result.get_c_code()}[stdout_artifact]
+            if artifact is None:
+                error('No C equivalent code for a program declaring subprograms.')
+    if run:
+        run_program(result, show_stats)
+    elif isinstance(artifact, bytes):
+        sys.stdout.flush()
+        sys.stdout.buffer.write(artifact)
+    else:
+        sys.stdout.write(artifact)
+
+
+# Print every token of the input file with its line and character number.
+def dump_tokens(input_filename, compiler_options):
+    with open(input_filename, 'r', encoding='utf-8') as infile:
+        source = infile.read()
+    try:
+        for tk in Compiler(**compiler_options).tokenize(source, input_filename):
+            print('%d:%d %s' % (tk.get_tk_lineno(), tk.get_tk_charno(), tk))
+    except CompileError as compile_error:
+        print_compile_error(compile_error)
+        sys.exit(1)
 
-    # print quad equivalent code
-    '''for Quad in quads_list:
-        print(Quad)'''
-    print("Main program framelength: %d" % main_program_framelength)
-    close_files()
+
+##############################################################
+#                                                            #
+#                   batch compilation                        #
+#                                                            #
+##############################################################
+worker_compiler = None  # Compiler reused by every job of a batch worker process
+worker_file_options = dict()  # keyword arguments of compile_to_files() for every job
+
+
+def batch_worker_init(compiler_options, file_options, cache_options=None):
+    global worker_compiler, worker_file_options
+    worker_compiler = Compiler(**compiler_options)
+    worker_file_options = dict(file_options)
+    if cache_options is not None:
+        worker_file_options['cache'] = CompileCache(options=compiler_options, **cache_options)
+
+
+# Compile one file of a batch. Everything the compiler prints is captured, and a failed
+# compilation is reported in the returned tuple instead of ending the worker process.
+def batch_compile(input_filename):
+    output = io.StringIO()
+    start = time.perf_counter()
+    succeeded = True
+    profile = None
+    with contextlib.redirect_stdout(output):
+        try:
+            profile = compile_to_files(worker_compiler, input_filename, **worker_file_options).get_profile()
+        except CompileError as compile_error:
+            succeeded = False
+            print_compile_error(compile_error)
+        except Exception:
+            succeeded = False
+            print('[' + ShellColors.RED + 'ERROR' + ShellColors.END + '] Internal compiler error while compiling %s:'
+                  % input_filename)
+            print(traceback.format_exc(), end='')
+    return input_filename, succeeded, output.getvalue(), time.perf_counter() - start, profile
+
+
+# Expand directories into the files with the given extension they contain.
+def collect_input_files(paths, extension='.min'):
+    input_files = list()
+    for path in paths:
+        if os.path.isdir(path):
+            for dirpath, dirnames, filenames in os.walk(path):
+                dirnames.sort()
+                input_files.extend(os.path.join(dirpath, filename) for filename in sorted(filenames)
+                                   if filename.endswith(extension))
+        else:
+            input_files.append(path)
+    return input_files
+
+
+def batch_main(paths, jobs, compiler_options, file_options, cache_options=None, show_profile=False,
+               profile_filepath=None):
+    input_files = collect_input_files(paths, '.int' if file_options['backend'] else '.min')
+    start = time.perf_counter()
+    if jobs == 1:
+        batch_worker_init(compiler_options, file_options, cache_options)
+        results = map(batch_compile, input_files)
+        executor = None
+    else:
+        executor = concurrent.futures.ProcessPoolExecutor(jobs, initializer=batch_worker_init,
+                                                          initargs=(compiler_options, file_options, cache_options))
+        results = executor.map(batch_compile, input_files, chunksize=max(1, len(input_files) // (jobs * 8)))
+    failed = 0
+    profiles = list()
+    for input_filename, succeeded, output, elapsed, profile in results:
+        if profile is not None:
+            profiles.append(profile)
+        if succeeded:
+            print('[' + ShellColors.GREEN + ' OK ' + ShellColors.END + '] %s (%.3fs)' % (input_filename, elapsed))
+            if show_profile and profile is not None:
+                print(profile.to_text(), end='')
+        else:
+            failed += 1
+            print('[' + ShellColors.RED + 'FAIL' + ShellColors.END + '] %s (%.3fs)' % (input_filename, elapsed))
+            print(output, end='')
+    if executor is not None:
+        executor.shutdown()
+    elapsed = time.perf_counter() - start
+    if profile_filepath is not None:
+        write_file(profile_filepath, profiles_to_json(profiles))
+    print('\nCompiled %d files, %d failed, in %.2fs with %d jobs (%.1f files/s)'
+          % (len(input_files), failed, elapsed, jobs, len(input_files) / elapsed if elapsed else 0.0))
+    return failed == 0
 
 
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Minimal++ compiler targeting the MIPS32 architecture.')
+    parser.add_argument('infile', nargs='*', help='minimal++ source files (.min) or directories containing them')
+    parser.add_argument('-j', '--jobs', type=int,
+                        help='compile the input files in batch mode using JOBS worker processes')
+    parser.add_argument('--legacy-lexer', action='store_true',
+                        help='read the input one character at a time with the original lexer')
+    parser.add_argument('--dump-tokens', action='store_true',
+                        help='print the token stream of the input file and exit')
+    parser.add_argument('--dump-symbols', action='store_true',
+                        help='print the symbol table of every scope as it was closed to stdout, other messages go '
+                             'to stderr')
+    parser.add_argument('--symbols-format', choices=('text', 'json'),
+                        help='format of the --dump-symbols output (default: text)')
+    parser.add_argument('--max-errors', type=int, default=1, metavar='N',
+                        help='recover from syntax errors and report up to N errors per file (default: 1)')
+    parser.add_argument('-O', '--optimize', type=int, choices=(0, 1, 2), default=0, metavar='LEVEL',
+                        help='optimization level, 1 folds and propagates constants and removes dead code, '
+                             '2 also keeps variables in registers (default: 0)')
+    parser.add_argument('--peephole', metavar='RULES',
+                        help='comma separated peephole rules to run over the assembly, or none '
+                             '(default: all of %s with -O 2, none otherwise)' % ', '.join(peephole_rule_names))
+    parser.add_argument('--stdout', action='store_true',
+                        help='write no files and print the --emit artifact to stdout, other messages go to stderr')
+    parser.add_argument('--intb', action='store_true',
+                        help='also write the intermediate code in the binary .intb format')
+    parser.add_argument('--layout', action='store_true',
+                        help='also write the frame layout the backend needs to compile the intermediate code alone')
+    parser.add_argument('--stream', action='store_true',
+                        help='write the .int and .asm code of every subprogram as soon as it is compiled and free it, '
+                             'so memory grows with the largest subprogram instead of the whole program')
+    parser.add_argument('--backend', action='store_true',
+                        help='generate the .asm and .c files from .int or .intb files and the .layout files '
+                             'next to them, without the front end')
+    parser.add_argument('--cache-dir', default=default_cache_directory(), metavar='DIR',
+                        help='directory of the compilation cache (default: %(default)s)')
+    parser.add_argument('--cache-size', type=int, default=default_cache_size // 2 ** 20, metavar='MIB',
+                        help='evict the least recently used cache entries past this size (default: %(default)s)')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='always compile and leave the compilation cache untouched')
+    parser.add_argument('--emit', choices=('asm', 'int', 'intb', 'c'), default='asm',
+                        help='artifact printed by --stdout (default: asm)')
+    parser.add_argument('--stats', action='store_true',
+                        help='print how many times every peephole rule applied, the compilation counters, '
+                             'and with --run how many quads ran')
+    parser.add_argument('--profile', action='store_true',
+                        help='print the time of every compiler phase and the counters of every block')
+    parser.add_argument('--profile-json', metavar='FILE',
+                        help='write the profile of every compiled file to FILE as JSON')
+    parser.add_argument('--run', action='store_true',
+                        help='write no files and run the program with the quad interpreter, reading its input '
+                             'from stdin, other messages go to stderr')
+    args = parser.parse_args()
+    if args.symbols_format is not None and not args.dump_symbols:
+        error('--symbols-format is only used with --dump-symbols.')
+    symbols_format = (args.symbols_format or 'text') if args.dump_symbols else None
+    compiler_options = dict(legacy_lexer=args.legacy_lexer, max_errors=args.max_errors,
+                            optimization_level=args.optimize)
+    file_options = dict(intb=args.intb, layout=args.layout, backend=args.backend, stream=args.stream)
+    if args.stream and (args.intb or args.layout or args.backend or args.stdout or args.run or args.dump_symbols):
+        error('--stream writes the .int and .asm files only, it cannot be used with --intb, --layout, --backend, '
+              '--stdout, --run or --dump-symbols.')
+    if args.stats or args.profile or args.profile_json is not None:
+        compiler_options['profile'] = True
+    cache_options = None
+    # a cached result has no profile and a streamed compilation keeps no code to cache
+    if not args.no_cache and not compiler_options.get('profile') and not args.stream:
+        cache_options = dict(directory=args.cache_dir, max_size=args.cache_size * 2 ** 20)
+
+    if args.peephole is not None:
+        selected_rules = [rule for rule in args.peephole.split(',') if rule and rule != 'none']
+        for rule in selected_rules:
+            if rule not in peephole_rule_names:
+                error('Unknown peephole rule \'%s\', expected one of: %s.' % (rule, ', '.join(peephole_rule_names)))
+        compiler_options['peephole_rules'] = selected_rules
+
+    if args.max_errors < 1:
+        error('--max-errors should be at least 1.')
 
     # No arguments passed
-    if len(sys.argv) == 1:
+    if not args.infile:
         error(':no input files.')
         sys.exit(1)
 
     # File does not exist
-    if not os.path.exists(sys.argv[1]):
-        error_file_not_found(sys.argv[1])
-        sys.exit(1)
+    for infile in args.infile:
+        if not os.path.exists(infile):
+            error_file_not_found(infile)
+            sys.exit(1)
+
+    if args.jobs is not None or len(args.infile) > 1 or os.path.isdir(args.infile[0]):
+        if args.stdout or args.run or args.dump_symbols:
+            error('--stdout, --run and --dump-symbols take a single input file.')
+        jobs = args.jobs if args.jobs is not None else os.cpu_count() or 1
+        if jobs < 1:
+            error('--jobs should be at least 1.')
+        sys.exit(0 if batch_main(args.infile, jobs, compiler_options, file_options, cache_options, args.profile,
+                                 args.profile_json) else 1)
+
+    if args.dump_tokens:
+        dump_tokens(args.infile[0], compiler_options)
+        sys.exit(0)
+
+    if args.stdout and args.run:
+        error('--stdout and --run cannot be used together.')
 
     # Call main function
-    main(sys.argv[1])
+    main(args.infile[0], compiler_options, args.stats, args.emit if args.stdout else None, file_options, cache_options,
+         args.run, args.profile, args.profile_json, symbols_format)
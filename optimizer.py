@@ -0,0 +1,212 @@
+# This file holds the optimization passes run over the quads of a block once the block has been parsed.
+# A pass may delete quads. The surviving quads keep their labels, so jumps to a deleted quad are
+# retargeted to the next surviving one.
+
+from quad import is_constant
+from cfg import ControlFlowGraph, relational_operators, is_jump, jump_targets, jump_tables
+
+
+arithmetic_operators = ('+', '-', '*', '/')
+max_constant = 32767  # same bound the lexer applies to number constants
+
+
+# newtemp() names temporary variables T_1, T_2 ... and identifiers of a program cannot contain '_'.
+def is_temporary(name):
+    return str(name).startswith('T_')
+
+
+# Remove the quads whose labels are in deleted_labels and retarget the jumps that led to them.
+def remove_quads(quads, deleted_labels):
+    if not deleted_labels:
+        return quads
+    next_label = dict()
+    following = None
+    for quad in reversed(quads):
+        if quad.get_label() in deleted_labels:
+            next_label[quad.get_label()] = following
+        else:
+            following = quad.get_label()
+    kept_quads = [quad for quad in quads if quad.get_label() not in deleted_labels]
+    for quad in kept_quads:
+        if is_jump(quad) and quad.get_z() in next_label:
+            quad.set_z(next_label[quad.get_z()])
+    return kept_quads
+
+
+def evaluate_arithmetic(op, x, y):
+    if op == '+':
+        return x + y
+    if op == '-':
+        return x - y
+    if op == '*':
+        return x * y
+    if y == 0:
+        return None  # leave the division by zero to run time
+    quotient = abs(x) // abs(y)  # integer division truncates towards zero as MIPS div does
+    return quotient if (x < 0) == (y < 0) else -quotient
+
+
+def evaluate_relation(op, x, y):
+    if op == '=':
+        return x == y
+    if op == '<>':
+        return x != y
+    if op == '<':
+        return x < y
+    if op == '<=':
+        return x <= y
+    if op == '>':
+        return x > y
+    return x >= y
+
+
+# Constant folding and propagation over the quads of one block.
+# is_local_value(name) tells whether name is a temporary variable, a local variable or an 'in' parameter
+# of the block. Only those are propagated, everything else may be written by a called subprogram.
+def fold_constants(quads, is_local_value):
+    targets = jump_targets(quads)
+    constants = dict()  # name -> constant value known to be held at the current quad
+    deleted_labels = set()
+
+    def value_of(operand):
+        if is_constant(operand):
+            return int(operand)
+        return constants.get(operand)
+
+    def substitute(operand):
+        value = value_of(operand)
+        return operand if value is None or is_constant(operand) else value
+
+    def assign(name, value):
+        if value is not None and is_local_value(name):
+            constants[name] = value
+        else:
+            constants.pop(name, None)
+
+    for quad in quads:
+        if quad.get_label() in targets:
+            constants.clear()
+        op = quad.get_op()
+        if op in arithmetic_operators:
+            quad.set_x(substitute(quad.get_x()))
+            quad.set_y(substitute(quad.get_y()))
+            x, y = value_of(quad.get_x()), value_of(quad.get_y())
+            result = None
+            if x is not None and y is not None:
+                result = evaluate_arithmetic(op, x, y)
+                if result is not None and abs(result) > max_constant:
+                    result = None
+            if result is not None:
+                quad.set_op(':=')
+                quad.set_x(result)
+                quad.set_y('_')
+            assign(quad.get_z(), result)
+        elif op == ':=':
+            quad.set_x(substitute(quad.get_x()))
+            assign(quad.get_z(), value_of(quad.get_x()))
+        elif op in relational_operators:
+            quad.set_x(substitute(quad.get_x()))
+            quad.set_y(substitute(quad.get_y()))
+            x, y = value_of(quad.get_x()), value_of(quad.get_y())
+            if x is not None and y is not None:
+                if evaluate_relation(op, x, y):
+                    quad.set_op('jump')
+                    quad.set_x('_')
+                    quad.set_y('_')
+                else:
+                    deleted_labels.add(quad.get_label())
+        elif op == 'out' or op == 'retv':
+            quad.set_x(substitute(quad.get_x()))
+        elif op == 'inp':
+            constants.pop(quad.get_x(), None)
+        elif op == 'par':
+            if quad.get_y() == 'CV':
+                quad.set_x(substitute(quad.get_x()))
+            else:
+                constants.pop(quad.get_x(), None)
+        elif op == 'call':
+            # the callee may write any variable it can see, only temporary variables are safe
+            for name in list(constants):
+                if not is_temporary(name):
+                    del constants[name]
+    return remove_quads(quads, deleted_labels)
+
+
+# Retarget jumps leading to a 'jump' quad straight to the end of the jump chain.
+def thread_jumps(quads):
+    quad_of_label = {quad.get_label(): quad for quad in quads}
+    changed = False
+    for quad in quads:
+        if not is_jump(quad):
+            continue
+        target = quad.get_z()
+        seen = {quad.get_label()}
+        while target in quad_of_label and target not in seen and quad_of_label[target].get_op() == 'jump':
+            seen.add(target)
+            target = quad_of_label[target].get_z()
+        if target != quad.get_z() and isinstance(target, int):
+            quad.set_z(target)
+            changed = True
+    return changed
+
+
+# Labels of the quads no path from begin_block reaches. begin_block and end_block are always kept.
+def unreachable_labels(quads):
+    graph = ControlFlowGraph(quads)
+    reachable = graph.reachable_blocks()
+    labels = set()
+    for block in graph.get_blocks():
+        if block not in reachable:
+            for quad in block.get_quads():
+                if quad.get_op() not in ('begin_block', 'end_block'):
+                    labels.add(quad.get_label())
+    return labels
+
+
+# Labels of the jumps whose target is the quad right after them, both ways lead to the same quad.
+# The entries of a table are kept, they are found by their position.
+def jumps_to_next_labels(quads):
+    entries = {entry.get_label() for following in jump_tables(quads).values() for entry in following[:-1]}
+    labels = set()
+    for quad, following in zip(quads, quads[1:]):
+        if is_jump(quad) and quad.get_z() == following.get_label() and quad.get_label() not in entries:
+            labels.add(quad.get_label())
+    return labels
+
+
+# Labels of the quads storing to a temporary variable that no quad reads.
+def dead_temporary_labels(quads):
+    read = set()
+    for quad in quads:
+        read.add(quad.get_x())
+        read.add(quad.get_y())
+    labels = set()
+    for quad in quads:
+        if (quad.get_op() == ':=' or quad.get_op() in arithmetic_operators) and \
+                is_temporary(quad.get_z()) and quad.get_z() not in read:
+            labels.add(quad.get_label())
+    return labels
+
+
+# Dead code elimination over the quads of one block, repeated until nothing changes.
+def eliminate_dead_code(quads):
+    changed = True
+    while changed:
+        changed = thread_jumps(quads)
+        for find_labels in (unreachable_labels, jumps_to_next_labels, dead_temporary_labels):
+            deleted_labels = find_labels(quads)
+            if deleted_labels:
+                quads = remove_quads(quads, deleted_labels)
+                changed = True
+    return quads
+
+
+# Constant folding and dead code elimination, repeated until no quad is removed. Removing a quad can remove a
+# jump target, and fold_constants propagates constants across the quads that are no longer one, eg. after a
+# condition known at compile time. Over the same quads fold_constants finds nothing new.
+def optimize_quads(quads, is_local_value):
+    count = None
+    while len(quads) != count:
+        count = len(quads)
+        quads = eliminate_dead_code(fold_constants(quads, is_local_value))
+    return quads
@@ -0,0 +1,187 @@
+# This file holds the peephole optimizer run over the MIPS instructions of a block before they are written.
+# Every rule rewrites a short window of instructions and the rules are repeated until none applies.
+# Labels nothing jumps to do not break a window. $t0, $t1, $t2 and $t9 are the scratch registers of
+# loadvr() and storerv(), they are always written before being read inside the code of a single quad.
+
+from mips import Instruction, Label
+
+peephole_rules = ('store_load_forwarding', 'redundant_load', 'immediate_folding', 'branch_to_next')
+
+scratch_registers = ('$t0', '$t1', '$t2', '$t9')
+branch_instructions = ('beq', 'bne', 'blt', 'ble', 'bgt', 'bge')
+inverse_branches = {'beq': 'bne', 'bne': 'beq', 'blt': 'bge', 'bge': 'blt', 'ble': 'bgt', 'bgt': 'ble'}
+writes_first_argument = ('lw', 'li', 'la', 'addi', 'add', 'sub', 'mul', 'div', 'move', 'sll')
+
+
+# Split a memory operand, eg. '-12($sp)' => (-12, '$sp').
+def memory_operand(operand):
+    offset, base = operand[:-1].split('(')
+    return int(offset or 0), base
+
+
+def is_immediate(operand, low=-32768, high=32767):
+    try:
+        return low <= int(operand, 0) <= high
+    except ValueError:
+        return False
+
+
+# Labels some instruction of items jumps to. The first label of a block is entered from outside it.
+def referenced_labels(items):
+    labels = set()
+    for item in items:
+        if isinstance(item, Instruction) and (item.get_op() in branch_instructions or item.get_op() in ('j', 'jal')):
+            labels.add(item.get_args()[-1])
+        elif isinstance(item, Instruction) and item.get_op() == '.word':  # a jump table, entered with jr
+            labels.update(item.get_args())
+    for item in items:
+        if isinstance(item, Label):
+            labels.add(item.get_name())
+            break
+    return labels
+
+
+# Forward the value of a memory word still held in a register from an earlier sw (store_load_forwarding)
+# or lw (redundant_load) to a later lw of the same word.
+def forward_memory(items, rules, hits, barriers):
+    known = dict()  # memory operand -> (register holding its value, rule that recorded it)
+
+    def invalidate(register):
+        for operand, (holder, rule) in list(known.items()):
+            if holder == register or memory_operand(operand)[1] == register:
+                del known[operand]
+
+    def invalidate_aliases(operand):
+        offset, base = memory_operand(operand)
+        for other in list(known):
+            other_offset, other_base = memory_operand(other)
+            if other_base != base or other_offset == offset:
+                del known[other]  # words reached through different registers may be the same word
+
+    result = list()
+    for item in items:
+        if isinstance(item, Label):
+            if item.get_name() in barriers:
+                known.clear()
+            result.append(item)
+            continue
+        if not isinstance(item, Instruction):
+            result.append(item)
+            continue
+        op, args = item.get_op(), item.get_args()
+        if op == 'lw' and args[1] in known:
+            holder, rule = known[args[1]]
+            hits[rule] += 1
+            if holder == args[0]:
+                continue
+            item = Instruction('move', args[0], holder)
+            invalidate(args[0])
+        elif op == 'lw':
+            invalidate(args[0])
+            if 'redundant_load' in rules and memory_operand(args[1])[1] != args[0]:
+                known[args[1]] = (args[0], 'redundant_load')
+        elif op == 'sw':
+            invalidate_aliases(args[1])
+            if 'store_load_forwarding' in rules:
+                known[args[1]] = (args[0], 'store_load_forwarding')
+        elif op in ('j', 'jr', 'jal'):
+            known.clear()  # a called subprogram may write any word
+        elif op == 'syscall':
+            invalidate('$v0')
+        elif op in writes_first_argument:
+            invalidate(args[0])
+        result.append(item)
+    return result
+
+
+# Index of the next instruction after position i, skipping labels nothing jumps to. None at a jump target.
+def next_instruction(items, i, barriers):
+    i += 1
+    while i < len(items) and not isinstance(items[i], Instruction):
+        if isinstance(items[i], Label) and items[i].get_name() in barriers:
+            return None
+        i += 1
+    return i if i < len(items) else None
+
+
+# li of a scratch register used right away by add, sub, move or a branch becomes an immediate operand.
+def fold_immediates(items, hits, barriers):
+    deleted = set()
+    for i, item in enumerate(items):
+        if not isinstance(item, Instruction) or item.get_op() != 'li' or item.get_args()[0] not in scratch_registers:
+            continue
+        j = next_instruction(items, i, barriers)
+        if j is None:
+            continue
+        register, immediate = item.get_args()
+        following = items[j]
+        op, args = following.get_op(), following.get_args()
+        if op == 'add' and args[2] == register and args[1] != register and is_immediate(immediate):
+            following.set_op('addi')
+            following.set_args(args[0], args[1], int(immediate, 0))
+        elif op == 'add' and args[1] == register and args[2] != register and is_immediate(immediate):
+            following.set_op('addi')
+            following.set_args(args[0], args[2], int(immediate, 0))
+        elif op == 'sub' and args[2] == register and args[1] != register and is_immediate(immediate, -32767, 32768):
+            following.set_op('addi')
+            following.set_args(args[0], args[1], -int(immediate, 0))
+        elif op == 'move' and args[1] == register:
+            following.set_op('li')
+            following.set_args(args[0], immediate)
+        elif op in branch_instructions and register in args[:2] and args[0] != args[1] and int(immediate, 0) == 0:
+            following.set_args(*['$0' if arg == register else arg for arg in args])
+        else:
+            continue
+        deleted.add(i)
+        hits['immediate_folding'] += 1
+    return [item for i, item in enumerate(items) if i not in deleted]
+
+
+# Remove jumps to the label right after them, and turn a branch over a single j into the inverse branch.
+def remove_branches_to_next(items, hits, barriers):
+    deleted = set()
+    for i, item in enumerate(items):
+        if not isinstance(item, Instruction) or i in deleted:
+            continue
+        op = item.get_op()
+        if op == 'j' or op in branch_instructions:
+            target = item.get_args()[-1]
+            k = i + 1
+            while k < len(items) and isinstance(items[k], Label):
+                if items[k].get_name() == target:
+                    deleted.add(i)
+                    hits['branch_to_next'] += 1
+                    break
+                k += 1
+            if i in deleted or op == 'j':
+                continue
+            j = next_instruction(items, i, barriers)
+            if j is None or items[j].get_op() != 'j':
+                continue
+            k = j + 1
+            while k < len(items) and isinstance(items[k], Label):
+                if items[k].get_name() == target:
+                    args = item.get_args()
+                    item.set_op(inverse_branches[op])
+                    item.set_args(args[0], args[1], items[j].get_args()[0])
+                    deleted.add(j)
+                    hits['branch_to_next'] += 1
+                    break
+                k += 1
+    return [item for i, item in enumerate(items) if i not in deleted]
+
+
+# Run the enabled rules over the instructions of a block until nothing changes.
+# hits maps every rule name to the number of times it applied and is updated in place.
+def optimize(items, rules, hits):
+    while True:
+        before = sum(hits.values())
+        barriers = referenced_labels(items)
+        if 'store_load_forwarding' in rules or 'redundant_load' in rules:
+            items = forward_memory(items, rules, hits, barriers)
+        if 'immediate_folding' in rules:
+            items = fold_immediates(items, hits, barriers)
+        if 'branch_to_next' in rules:
+            items = remove_branches_to_next(items, hits, barriers)
+        if sum(hits.values()) == before:
+            return items
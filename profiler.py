@@ -0,0 +1,115 @@
+# This file holds the profile of a compilation: the wall time of every compiler phase and counters of the work
+# done, for the whole program and for every block. Lexing, parsing and code generation interleave, so every
+# phase but parse is timed where it runs and parse is charged with the rest of the time spent in a block.
+# Only a Compiler created with profile=True keeps a profile, the counters cost a test per event otherwise.
+
+import json
+import time
+
+phase_names = ('lex', 'parse', 'backpatch', 'optimize', 'final_code', 'write')
+counter_names = ('tokens', 'quads', 'temporaries', 'lookups', 'lookup_depth', 'instructions')
+
+
+class BlockProfile:
+    def __init__(self, name):
+        self.__name = name
+        self.__times = {phase: 0.0 for phase in phase_names}  # seconds, parse is derived from elapsed
+        self.__counters = {counter: 0 for counter in counter_names}  # lookup_depth sums the scopes searched
+        self.__elapsed = 0.0  # seconds spent in the block, nested blocks left out
+
+    def get_name(self):
+        return self.__name
+
+    def add_time(self, phase, seconds):
+        self.__times[phase] += seconds
+
+    def count(self, counter, n=1):
+        self.__counters[counter] += n
+
+    def add_elapsed(self, seconds):
+        self.__elapsed += seconds
+
+    def get_times(self):
+        times = dict(self.__times)
+        measured = sum(seconds for phase, seconds in times.items() if phase not in ('parse', 'write'))
+        times['parse'] = max(0.0, self.__elapsed - measured)
+        return times
+
+    def get_counters(self):
+        return dict(self.__counters)
+
+    def get_average_lookup_depth(self):
+        lookups = self.__counters['lookups']
+        return self.__counters['lookup_depth'] / lookups if lookups else 0.0
+
+    def to_dict(self):
+        times = self.get_times()
+        return {'name': self.__name, 'time': sum(times.values()), 'phases': times, 'counters': self.get_counters(),
+                'average_lookup_depth': self.get_average_lookup_depth()}
+
+
+class CompileProfile:
+    def __init__(self, filename):
+        self.__total = BlockProfile(filename)  # the whole compilation
+        self.__blocks = list()  # profiles of the finished blocks in closing order
+        self.__open_blocks = list()  # [profile, start time, seconds spent in nested blocks] of every open block
+        self.__start = time.perf_counter()
+
+    def get_filename(self):
+        return self.__total.get_name()
+
+    def get_total(self):
+        return self.__total
+
+    def get_blocks(self):
+        return self.__blocks
+
+    def stop(self):
+        self.__total.add_elapsed(time.perf_counter() - self.__start)
+
+    def enter_block(self, name):
+        self.__open_blocks.append([BlockProfile(name), time.perf_counter(), 0.0])
+
+    def exit_block(self):
+        block, start, nested = self.__open_blocks.pop()
+        elapsed = time.perf_counter() - start
+        block.add_elapsed(elapsed - nested)
+        if self.__open_blocks:
+            self.__open_blocks[-1][2] += elapsed
+        self.__blocks.append(block)
+
+    # Time and counters go to the whole compilation and to the innermost open block.
+    def add_time(self, phase, seconds):
+        self.__total.add_time(phase, seconds)
+        if self.__open_blocks:
+            self.__open_blocks[-1][0].add_time(phase, seconds)
+
+    def count(self, counter, n=1):
+        self.__total.count(counter, n)
+        if self.__open_blocks:
+            self.__open_blocks[-1][0].count(counter, n)
+
+    def to_dict(self):
+        profile = self.__total.to_dict()
+        profile['filename'] = profile.pop('name')
+        profile['blocks'] = [block.to_dict() for block in self.__blocks]
+        return profile
+
+    # One row per block and one for the whole compilation, times in milliseconds.
+    def to_text(self):
+        lines = ['Profile of %s:' % self.get_filename(),
+                 '    %-16s' % 'block' + ''.join('%11s' % phase for phase in phase_names) +
+                 '%9s%8s%8s%9s%7s%9s' % ('tokens', 'quads', 'temps', 'lookups', 'depth', 'instrs')]
+        for block in self.__blocks + [self.__total]:
+            name = 'total' if block is self.__total else block.get_name()
+            times = block.get_times()
+            counters = block.get_counters()
+            lines.append('    %-16s' % name + ''.join('%11.3f' % (times[phase] * 1000) for phase in phase_names) +
+                         '%9d%8d%8d%9d%7.2f%9d' % (counters['tokens'], counters['quads'], counters['temporaries'],
+                                                   counters['lookups'], block.get_average_lookup_depth(),
+                                                   counters['instructions']))
+        return '\n'.join(lines) + '\n'
+
+
+def profiles_to_json(profiles):
+    return json.dumps([profile.to_dict() for profile in profiles], indent=1) + '\n'
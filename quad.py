@@ -1,11 +1,53 @@
 # This class is responsible to hold the data for every quad generated.
 
 
+# Quad operators are kept as small integers so the backends can dispatch on them with a table lookup.
+class Opcode:
+    def __init__(self):
+        pass
+
+    # Arithmetic operators
+    ADD = 0
+    SUB = 1
+    MUL = 2
+    DIV = 3
+    ASSIGN = 4
+    # Relational operators
+    EQUAL = 5
+    NOT_EQUAL = 6
+    LESS = 7
+    LESS_OR_EQUAL = 8
+    GREATER = 9
+    GREATER_OR_EQUAL = 10
+    JUMP = 11
+    # Blocks and subprograms
+    BEGIN_BLOCK = 12
+    END_BLOCK = 13
+    HALT = 14
+    PAR = 15
+    CALL = 16
+    RETV = 17
+    # Input and output
+    OUT = 18
+    INP = 19
+    # Multiway jump: the n quads after 'table, x, low, n' are the entries of values low ... low + n - 1 of x,
+    # a value out of range continues at the quad after the entries
+    TABLE = 20
+
+
+# Operator of every opcode as written in the .int file.
+opcode_names = ('+', '-', '*', '/', ':=', '=', '<>', '<', '<=', '>', '>=', 'jump',
+                'begin_block', 'end_block', 'halt', 'par', 'call', 'retv', 'out', 'inp', 'table')
+opcodes = {name: opcode for opcode, name in enumerate(opcode_names)}
+
+
 class Quad:
+    __slots__ = ('__label', '__opcode', '__x', '__y', '__z')
+
     # eg. 100: -,a,b,c => c := a - b
     def __init__(self, label, op, x, y, z):
         self.__label = label  # eg. 100,101
-        self.__op = op  # +,-,*,/
+        self.__opcode = opcodes[op]  # Opcode of +,-,*,/ etc.
         self.__x = x  # variable name or constant
         self.__y = y  # variable name or constant
         self.__z = z  # variable name
@@ -17,10 +59,13 @@ class Quad:
         self.__label = label
 
     def get_op(self):
-        return self.__op
+        return opcode_names[self.__opcode]
 
     def set_op(self, op):
-        self.__op = op
+        self.__opcode = opcodes[op]
+
+    def get_opcode(self):
+        return self.__opcode
 
     def get_x(self):
         return self.__x
@@ -42,10 +87,18 @@ class Quad:
 
     # tostring for debugging purposes
     def __str__(self):
-        return '(' + str(self.__label) + ': ' + str(self.__op) + ', ' + str(self.__x) + ', ' + str(
+        return '(' + str(self.__label) + ': ' + opcode_names[self.__opcode] + ', ' + str(self.__x) + ', ' + str(
             self.__y) + ', ' + str(self.__z) + ')'
 
     # tostring for intermediate code file generation
     def quad_to_file(self):
-        return str(self.__label) + ': ' + str(self.__op) + ', ' + str(self.__x) + ', ' + str(self.__y) + ', ' + str(
+        return str(self.__label) + ': ' + opcode_names[self.__opcode] + ', ' + str(self.__x) + ', ' + str(self.__y) + ', ' + str(
             self.__z) + '\n'
+
+
+# True if operand is an integer constant, eg. 5, '5' or '-5' after constant folding.
+def is_constant(operand):
+    operand = str(operand)
+    if operand.startswith('-'):
+        operand = operand[1:]
+    return operand.isdigit()
@@ -0,0 +1,223 @@
+# This file holds the quad interpreter, which runs the quads of a compiled program without MARS.
+# Memory is a flat list of 32 bit words laid out the way the MIPS code lays out its stack: the frame of a
+# subprogram sits right above its caller's frame and the slot at offset k of a frame is word sp - k // 4,
+# sp being the frame's $sp divided by 4. As in the MIPS code, word 0 of a frame holds the return position,
+# -4 the access link, -8 the address the function result is written to and parameters start at -12.
+# Operands are resolved against the frame layout and jump targets against the quad positions once, before the
+# program runs, so the loop never looks up a name or a label.
+
+import operator
+import sys
+from errors import ExecutionError, IntermediateCodeError
+from frame_layout import block_scopes
+from intermediate_code import split_blocks
+from quad import Opcode, is_constant
+
+default_memory_size = 2 ** 22  # words, the largest stack a program may grow
+word_min = -2 ** 31
+word_max = 2 ** 31 - 1
+relations = {Opcode.EQUAL: operator.eq, Opcode.NOT_EQUAL: operator.ne, Opcode.LESS: operator.lt,
+             Opcode.LESS_OR_EQUAL: operator.le, Opcode.GREATER: operator.gt, Opcode.GREATER_OR_EQUAL: operator.ge}
+
+
+# Where an operand lives. Resolved operands are (kind, value, access links): the constant value or the
+# slot number of the variable, and for nonlocal variables how many access links lead to their frame.
+class Operand:
+    CONSTANT = 0
+    LOCAL = 1  # temporary variables, local variables and 'in' parameters of the running block
+    GLOBAL = 2  # variables of the main program, reached from its frame like $s0
+    LOCAL_REFERENCE = 3  # 'inout' parameters of the running block, the slot holds the variable's address
+    NONLOCAL = 4
+    NONLOCAL_REFERENCE = 5
+
+
+class Interpreter:
+    def __init__(self, quads, layout, filename='<string>', memory_size=default_memory_size):
+        self.__filename = filename
+        self.__memory_size = memory_size
+        self.__labels = list()  # label of the quad at every position
+        self.__code = list()  # resolved form of the quad at every position
+        self.__main_position = 0  # position of the main program's begin_block
+        self.__main_framelength = 0  # in words
+        self.__resolve(quads, layout)
+
+    def __resolve(self, quads, layout):
+        blocks = split_blocks(quads, self.__filename)
+        chains = block_scopes(layout, self.__filename)
+        if len(chains) != len(blocks):
+            raise IntermediateCodeError('The frame layout describes %d blocks but the intermediate code holds %d.'
+                                        % (len(chains), len(blocks)), self.__filename)
+        positions = dict()
+        starts = dict()  # label of every begin_block -> (position, frame length in words)
+        for (name, scopes), block_quads in zip(chains, blocks):
+            starts[block_quads[0].get_label()] = (len(self.__labels), scopes[-1].get_current_offset() // 4)
+            for quad in block_quads:
+                positions[quad.get_label()] = len(self.__labels)
+                self.__labels.append(quad.get_label())
+        self.__main_position, self.__main_framelength = starts[blocks[-1][0].get_label()]
+        for i, ((name, scopes), block_quads) in enumerate(zip(chains, blocks)):
+            is_main = i == len(blocks) - 1
+            for previous, quad in zip([None] + block_quads, block_quads):
+                self.__code.append(self.__resolve_quad(quad, previous, scopes, positions, starts, is_main))
+
+    def __resolve_quad(self, quad, previous, scopes, positions, starts, is_main):
+        opcode = quad.get_opcode()
+        if opcode <= Opcode.DIV:
+            return (opcode, self.__operand(quad.get_x(), scopes), self.__operand(quad.get_y(), scopes),
+                    self.__operand(quad.get_z(), scopes))
+        if opcode == Opcode.ASSIGN:
+            return opcode, self.__operand(quad.get_x(), scopes), None, self.__operand(quad.get_z(), scopes)
+        if opcode in relations:
+            return (opcode, self.__operand(quad.get_x(), scopes), self.__operand(quad.get_y(), scopes),
+                    positions.get(quad.get_z()), relations[opcode])
+        if opcode == Opcode.JUMP:
+            return opcode, None, None, positions.get(quad.get_z())
+        if opcode == Opcode.PAR:
+            # a RET parameter passes the address of the temporary variable the result is written to
+            return opcode, self.__operand(quad.get_x(), scopes), quad.get_y() != 'CV'
+        if opcode == Opcode.CALL:
+            callee, callee_nesting_level = scopes[-1].lookup_by_type(quad.get_x(), 'Function')
+            if callee is None:
+                raise IntermediateCodeError('Call of undeclared subprogram \'%s\'.' % quad.get_x(), self.__filename)
+            position, framelength = starts[callee.get_startQuad()]
+            returns = previous is not None and previous.get_opcode() == Opcode.PAR and previous.get_y() == 'RET'
+            # the access link of the callee points to the frame of the block it was declared in
+            access_links = scopes[-1].get_nesting_level() - callee_nesting_level
+            return opcode, position, framelength, len(callee.get_arguments_list()), returns, access_links
+        if opcode == Opcode.END_BLOCK:
+            return opcode, is_main, scopes[-1].get_current_offset() // 4
+        if opcode == Opcode.TABLE:
+            return opcode, self.__operand(quad.get_x(), scopes), int(quad.get_y()), int(quad.get_z())
+        if opcode in (Opcode.OUT, Opcode.INP, Opcode.RETV):
+            return opcode, self.__operand(quad.get_x(), scopes)
+        return (opcode,)
+
+    def __operand(self, name, scopes):
+        if is_constant(name):
+            return Operand.CONSTANT, int(name), 0
+        entity, entity_nesting_level = scopes[-1].lookup(name)
+        if entity is None or entity.get_entityType() == 'Function':
+            raise IntermediateCodeError('Undeclared variable \'%s\'.' % name, self.__filename)
+        words = entity.get_offset() // 4
+        reference = entity.get_entityType() == 'Parameter' and entity.get_parMode() == 'inout'
+        access_links = scopes[-1].get_nesting_level() - entity_nesting_level
+        if access_links == 0:
+            return (Operand.LOCAL_REFERENCE if reference else Operand.LOCAL), words, 0
+        if entity_nesting_level == 0:
+            return Operand.GLOBAL, words, 0
+        return (Operand.NONLOCAL_REFERENCE if reference else Operand.NONLOCAL), words, access_links
+
+    # Run the program reading the integers of input statements from inputs and passing what it prints to
+    # write, sys.stdout.write by default. Returns the number of quads executed. A program running longer
+    # than max_steps quads is stopped with an ExecutionError.
+    def run(self, inputs=(), write=None, max_steps=None):
+        write = write or sys.stdout.write
+        inputs = iter(inputs)
+        code = self.__code
+        memory = [0] * (self.__main_framelength + 1)
+        sp = global_sp = self.__main_framelength
+        pending = list()  # values and addresses passed by the par quads of the calls not made yet
+        pc = self.__main_position
+        steps = 0
+
+        def address(operand):
+            kind, words, access_links = operand
+            if kind == Operand.LOCAL:
+                return sp - words
+            if kind == Operand.GLOBAL:
+                return global_sp - words
+            if kind == Operand.LOCAL_REFERENCE:
+                return memory[sp - words]
+            frame = sp
+            for _ in range(access_links):
+                frame = memory[frame - 1]
+            if kind == Operand.NONLOCAL:
+                return frame - words
+            return memory[frame - words]
+
+        def load(operand):
+            if operand[0] == Operand.CONSTANT:
+                return operand[1]
+            return memory[address(operand)]
+
+        try:
+            while True:
+                steps += 1
+                if max_steps is not None and steps > max_steps:
+                    raise ExecutionError('Stopped after %d quads.' % max_steps)
+                instruction = code[pc]
+                opcode = instruction[0]
+                pc += 1
+                if opcode == Opcode.ASSIGN:
+                    memory[address(instruction[3])] = load(instruction[1])
+                elif opcode <= Opcode.DIV:
+                    x, y = load(instruction[1]), load(instruction[2])
+                    if opcode == Opcode.ADD:
+                        value = x + y
+                    elif opcode == Opcode.SUB:
+                        value = x - y
+                    elif opcode == Opcode.MUL:
+                        value = (x * y + 2 ** 31) % 2 ** 32 - 2 ** 31  # mul keeps the low 32 bits
+                    elif y == 0:
+                        raise ExecutionError('Division by zero.')
+                    else:
+                        value = abs(x) // abs(y) if (x < 0) == (y < 0) else -(abs(x) // abs(y))
+                    if not word_min <= value <= word_max:  # add and sub trap on overflow
+                        raise ExecutionError('Arithmetic overflow.')
+                    memory[address(instruction[3])] = value
+                elif opcode in relations:
+                    if instruction[4](load(instruction[1]), load(instruction[2])):
+                        if instruction[3] is None:
+                            raise ExecutionError('Jump to a label that is not in the program.')
+                        pc = instruction[3]
+                elif opcode == Opcode.JUMP:
+                    if instruction[3] is None:
+                        raise ExecutionError('Jump to a label that is not in the program.')
+                    pc = instruction[3]
+                elif opcode == Opcode.TABLE:
+                    index = load(instruction[1]) - instruction[2]
+                    pc += index if 0 <= index < instruction[3] else instruction[3]
+                elif opcode == Opcode.PAR:
+                    pending.append(address(instruction[1]) if instruction[2] else load(instruction[1]))
+                elif opcode == Opcode.CALL:
+                    position, framelength, arguments, returns, access_links = instruction[1:]
+                    frame = sp + framelength
+                    if frame >= len(memory):
+                        if frame >= self.__memory_size:
+                            raise ExecutionError('Stack overflow.')
+                        memory.extend([0] * min(max(len(memory), frame + 1 - len(memory)),
+                                                self.__memory_size - len(memory)))
+                    if returns:
+                        memory[frame - 2] = pending.pop()
+                    if arguments:
+                        memory[frame - 2 - arguments:frame - 2] = reversed(pending[-arguments:])
+                        del pending[-arguments:]
+                    access_link = sp
+                    for _ in range(access_links):
+                        access_link = memory[access_link - 1]
+                    memory[frame - 1] = access_link
+                    memory[frame] = pc
+                    sp = frame
+                    pc = position
+                elif opcode == Opcode.END_BLOCK:
+                    if instruction[1]:
+                        return steps
+                    pc = memory[sp]
+                    sp -= instruction[2]
+                elif opcode == Opcode.OUT:
+                    write('%d\n' % load(instruction[1]))
+                elif opcode == Opcode.INP:
+                    try:
+                        value = next(inputs)
+                    except StopIteration:
+                        raise ExecutionError('The input ended.')
+                    memory[address(instruction[1])] = value
+                    write('\n')  # the MIPS code prints a new line after reading an integer too
+                elif opcode == Opcode.RETV:
+                    memory[memory[sp - 2]] = load(instruction[1])
+                elif opcode == Opcode.HALT:
+                    return steps
+        except ExecutionError as execution_error:
+            raise ExecutionError(execution_error.get_message(), self.__labels[pc - 1])
+        except IndexError:
+            raise ExecutionError('Memory access out of range.', self.__labels[pc - 1])
@@ -0,0 +1,151 @@
+# This file holds the linear scan register allocator used by the MIPS backend.
+# Liveness is computed over the basic blocks of one subprogram's quads, every candidate variable gets
+# a live interval over the quad positions and intervals are packed into the free registers.
+# $t0, $t1, $t2 and $t9 stay reserved for loadvr() and storerv().
+# The same intervals let temporary variables left in memory share their stack slots.
+
+import heapq
+from cfg import ControlFlowGraph, relational_operators
+from quad import is_constant
+
+
+allocatable_registers = ('$t3', '$t4', '$t5', '$t6', '$t7', '$t8',
+                         '$s1', '$s2', '$s3', '$s4', '$s5', '$s6', '$s7')
+arithmetic_operators = ('+', '-', '*', '/')
+
+
+# Variables read and written by quad. Names passed by reference with par are left out,
+# allocate_registers() keeps them in memory where the called subprogram can reach them.
+# The temporary variable of a par RET quad is written by the call that follows it.
+def quad_uses_defs(quad):
+    op = quad.get_op()
+    if op in arithmetic_operators:
+        uses, defs = [quad.get_x(), quad.get_y()], [quad.get_z()]
+    elif op == ':=':
+        uses, defs = [quad.get_x()], [quad.get_z()]
+    elif op in relational_operators:
+        uses, defs = [quad.get_x(), quad.get_y()], []
+    elif op == 'out' or op == 'retv' or op == 'table':
+        uses, defs = [quad.get_x()], []
+    elif op == 'inp':
+        uses, defs = [], [quad.get_x()]
+    elif op == 'par' and quad.get_y() == 'CV':
+        uses, defs = [quad.get_x()], []
+    elif op == 'par' and quad.get_y() == 'RET':
+        uses, defs = [], [quad.get_x()]
+    else:
+        return set(), set()
+    return {name for name in uses if not is_constant(name)}, {name for name in defs if not is_constant(name)}
+
+
+# Variables live after every quad, as a list parallel to quads.
+def live_out_sets(quads, graph=None):
+    graph = graph or ControlFlowGraph(quads)
+    uses_defs = [quad_uses_defs(quad) for quad in quads]
+    position = {quad.get_label(): i for i, quad in enumerate(quads)}
+    blocks = graph.get_blocks()
+    block_use = dict()
+    block_def = dict()
+    for block in blocks:
+        used, defined = set(), set()
+        for quad in block.get_quads():
+            uses, defs = uses_defs[position[quad.get_label()]]
+            used |= uses - defined
+            defined |= defs
+        block_use[block], block_def[block] = used, defined
+    live_in = {block: set() for block in blocks}
+    live_out = {block: set() for block in blocks}
+    changed = True
+    while changed:
+        changed = False
+        for block in reversed(blocks):
+            out = set()
+            for successor in block.get_successors():
+                out |= live_in[successor]
+            new_in = block_use[block] | (out - block_def[block])
+            if out != live_out[block] or new_in != live_in[block]:
+                live_out[block], live_in[block] = out, new_in
+                changed = True
+    result = [None] * len(quads)
+    for block in blocks:
+        live = set(live_out[block])
+        for quad in reversed(block.get_quads()):
+            i = position[quad.get_label()]
+            result[i] = set(live)
+            uses, defs = uses_defs[i]
+            live = (live - defs) | uses
+    return result
+
+
+# Live interval [first position, last position] of every variable of quads, and the live_out_sets().
+def live_intervals(quads):
+    live_out = live_out_sets(quads)
+    intervals = dict()
+    for i, quad in enumerate(quads):
+        uses, defs = quad_uses_defs(quad)
+        live_in = (live_out[i] - defs) | uses
+        for name in live_in | defs:
+            interval = intervals.setdefault(name, [i, i])
+            interval[1] = i
+        for name in live_out[i]:
+            interval = intervals.setdefault(name, [i, i])
+            interval[1] = max(interval[1], i + 1)
+    return intervals, live_out
+
+
+# Map the candidate variables of quads to registers.
+# is_candidate(name) tells whether name may live in a register at all. Variables live across a call
+# are left in memory because the called subprogram uses the same registers.
+def allocate_registers(quads, is_candidate):
+    intervals, live_out = live_intervals(quads)
+    excluded = set()
+    for i, quad in enumerate(quads):
+        if quad.get_op() == 'call':
+            excluded |= live_out[i]
+        elif quad.get_op() == 'par' and quad.get_y() != 'CV':
+            excluded.add(quad.get_x())
+    registers = dict()
+    free = list(reversed(allocatable_registers))
+    active = list()  # (end, name) of the intervals holding a register
+    for name, (start, end) in sorted(intervals.items(), key=lambda item: (item[1][0], item[0])):
+        if name in excluded or not is_candidate(name):
+            continue
+        for active_end, active_name in list(active):
+            if active_end < start:
+                active.remove((active_end, active_name))
+                free.append(registers[active_name])
+        if free:
+            registers[name] = free.pop()
+            active.append((end, name))
+        else:
+            # spill the interval ending last, it would block a register the longest
+            spilled_end, spilled_name = max(active)
+            if spilled_end > end:
+                registers[name] = registers.pop(spilled_name)
+                active.remove((spilled_end, spilled_name))
+                active.append((end, name))
+    return registers
+
+
+# Give the variables in names stack slots shared by the variables not live at the same time.
+# Returns name -> slot number, slots are numbered from 0 and the lowest free slot is used first.
+def share_slots(quads, names):
+    intervals = live_intervals(quads)[0]
+    slots = dict()
+    free = list()  # heap of the slot numbers released by expired intervals
+    active = list()  # (end, name) of the intervals holding a slot
+    next_slot = 0
+    for name, (start, end) in sorted(intervals.items(), key=lambda item: (item[1][0], item[0])):
+        if name not in names:
+            continue
+        for active_end, active_name in list(active):
+            if active_end < start:
+                active.remove((active_end, active_name))
+                heapq.heappush(free, slots[active_name])
+        if free:
+            slots[name] = heapq.heappop(free)
+        else:
+            slots[name] = next_slot
+            next_slot += 1
+        active.append((end, name))
+    return slots
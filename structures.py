@@ -1,6 +1,6 @@
-# This file is responsible to construct bound words and tokens with their values( see token.py ).
+# This file is responsible to construct bound words and tokens with their values( see lexer_token.py ).
 
-from token import TokenType
+from lexer_token import TokenType
 
 
 tokens = {
@@ -52,3 +52,18 @@ tokens = {
     'print': TokenType.PRINT_TK,
     'then': TokenType.THEN_TK
 }
+
+# Tokens a statement can start with apart from an assignment's variable id.
+statement_keywords = (
+    TokenType.IF_TK,
+    TokenType.WHILE_TK,
+    TokenType.DOUBLEWHILE_TK,
+    TokenType.LOOP_TK,
+    TokenType.EXIT_TK,
+    TokenType.FORCASE_TK,
+    TokenType.INCASE_TK,
+    TokenType.RETURN_TK,
+    TokenType.CALL_TK,
+    TokenType.PRINT_TK,
+    TokenType.INPUT_TK
+)
@@ -4,8 +4,12 @@ from colors import ShellColors
 
 
 class Scope:
+    __slots__ = ('__entities_list', '__entities_by_name', '__entities_by_type', '__nesting_level', '__current_offset', '__enclosing_scope')
+
     def __init__(self, nestinglevel=0, enclosing_scope=None):
         self.__entities_list = list()
+        self.__entities_by_name = dict()  # name -> first entity declared with that name
+        self.__entities_by_type = dict()  # entity type -> (name -> first entity of that type)
         self.__nesting_level = nestinglevel
         self.__current_offset = 12
         self.__enclosing_scope = enclosing_scope
@@ -15,6 +19,39 @@ class Scope:
 
     def add_Entity(self, Entity):
         self.__entities_list.append(Entity)
+        self.__entities_by_name.setdefault(Entity.get_name(), Entity)
+        self.__entities_by_type.setdefault(Entity.get_entityType(), dict()).setdefault(Entity.get_name(), Entity)
+
+    def get_entity(self, name):
+        return self.__entities_by_name.get(name)
+
+    def get_entity_by_type(self, name, entityType):
+        entities = self.__entities_by_type.get(entityType)
+        if entities is None:
+            return None
+        return entities.get(name)
+
+    def has_entity_type(self, entityType):
+        return entityType in self.__entities_by_type
+
+    # Search this scope and its enclosing ones. Returns the entity and the nesting level it was found at.
+    def lookup(self, name):
+        scope = self
+        while scope is not None:
+            entity = scope.__entities_by_name.get(name)
+            if entity is not None:
+                return entity, scope.__nesting_level
+            scope = scope.__enclosing_scope
+        return None, None
+
+    def lookup_by_type(self, name, entityType):
+        scope = self
+        while scope is not None:
+            entity = scope.get_entity_by_type(name, entityType)
+            if entity is not None:
+                return entity, scope.__nesting_level
+            scope = scope.__enclosing_scope
+        return None, None
 
     def get_nesting_level(self):
         return self.__nesting_level
@@ -22,6 +59,9 @@ class Scope:
     def get_current_offset(self):
         return self.__current_offset
 
+    def set_current_offset(self, offset):
+        self.__current_offset = offset
+
     def get_current_offset_and_advance(self):
         current = self.__current_offset
         self.__current_offset += 4  # this is the next offset
@@ -37,6 +77,8 @@ class Scope:
 
 
 class Argument:
+    __slots__ = ('__parMode', '__nextArgument')
+
     def __init__(self, parMode, nextArgument=None):
         self.__parMode = parMode
         self.__nextArgument = nextArgument
@@ -60,6 +102,8 @@ class Argument:
 
 
 class Entity:
+    __slots__ = ('__name', '__entityType')
+
     # Entity type can be Variable or Function or Parameter or TemporaryVariable
     def __init__(self, name, entityType):
         self.__name = name
@@ -78,6 +122,8 @@ class Entity:
 
 
 class Variable(Entity):
+    __slots__ = ('__offset',)
+
     def __init__(self, name, offset):
         super().__init__(name, 'Variable')
         self.__offset = offset
@@ -94,6 +140,8 @@ class Variable(Entity):
 
 
 class Function(Entity):
+    __slots__ = ('__startQuad', '__arguments_list', '__framelength')
+
     def __init__(self, name, startQuad=-1):
         super().__init__(name, 'Function')
         self.__startQuad = startQuad
@@ -125,6 +173,8 @@ class Function(Entity):
 
 
 class Parameter(Entity):
+    __slots__ = ('__parMode', '__offset')
+
     def __init__(self, name, parMode, offset=-1):
         super().__init__(name, 'Parameter')
         self.__parMode = parMode
@@ -148,6 +198,8 @@ class Parameter(Entity):
 
 
 class TemporaryVariable(Entity):
+    __slots__ = ('__offset',)
+
     def __init__(self, name, offset=-1):
         super().__init__(name, 'Tempvar')
         self.__offset = offset
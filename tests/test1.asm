@@ -3,8 +3,8 @@
     j    Lmain
 
 Lmain:
-    addi  $sp, $sp, 36
-    move  $s0, $sp
+    addi    $sp, $sp, 36
+    move    $s0, $sp
 
 L_1:
     li    $t1, 100
@@ -13,7 +13,7 @@ L_1:
 L_2:
     lw    $t1, -12($s0)
     li    $t2, 10
-   add    $t1, $t1, $t2
+    add    $t1, $t1, $t2
     sw    $t1, -20($sp)
 
 L_3:
@@ -23,13 +23,13 @@ L_3:
 L_4:
     li    $t1, 0
     li    $t2, 3
-   sub    $t1, $t1, $t2
+    sub    $t1, $t1, $t2
     sw    $t1, -24($sp)
 
 L_5:
     lw    $t1, -24($sp)
     li    $t2, 5
-   blt    $t1, $t2, L_17
+    blt    $t1, $t2, L_17
 
 L_6:
     j    L_7
@@ -37,7 +37,7 @@ L_6:
 L_7:
     li    $t1, 5
     li    $t2, 4
-   bgt    $t1, $t2, L_9
+    bgt    $t1, $t2, L_9
 
 L_8:
     j    L_17
@@ -45,7 +45,7 @@ L_8:
 L_9:
     lw    $t1, -12($s0)
     lw    $t2, -16($s0)
-   blt    $t1, $t2, L_15
+    blt    $t1, $t2, L_15
 
 L_10:
     j    L_11
@@ -53,7 +53,7 @@ L_10:
 L_11:
     lw    $t1, -12($s0)
     lw    $t2, -16($s0)
-   bgt    $t1, $t2, L_13
+    bgt    $t1, $t2, L_13
 
 L_12:
     j    L_15
@@ -75,7 +75,7 @@ L_16:
 L_17:
     lw    $t1, -12($s0)
     li    $t2, 1
-   bgt    $t1, $t2, L_19
+    bgt    $t1, $t2, L_19
 
 L_18:
     j    L_23
@@ -83,7 +83,7 @@ L_18:
 L_19:
     lw    $t1, -12($s0)
     li    $t2, 2
-   blt    $t1, $t2, L_21
+    blt    $t1, $t2, L_21
 
 L_20:
     j    L_23
@@ -106,7 +106,7 @@ L_24:
 L_25:
     lw    $t1, -12($s0)
     li    $t2, 3
-   bgt    $t1, $t2, L_27
+    bgt    $t1, $t2, L_27
 
 L_26:
     j    L_30
@@ -114,7 +114,7 @@ L_26:
 L_27:
     lw    $t1, -12($s0)
     li    $t2, 3
-   sub    $t1, $t1, $t2
+    sub    $t1, $t1, $t2
     sw    $t1, -28($sp)
 
 L_28:
@@ -127,7 +127,7 @@ L_29:
 L_30:
     li    $v0, 5
     syscall
-    move $t0, $v0
+    move    $t0, $v0
     addi    $a0, $0, 0xA
     addi    $v0, $0, 0xB
     syscall
@@ -136,7 +136,7 @@ L_30:
 L_31:
     lw    $t9, -12($s0)
     li    $v0, 1
-    move  $a0, $t9
+    move    $a0, $t9
     syscall
     addi    $a0, $0, 0xA
     addi    $v0, $0, 0xB
@@ -145,7 +145,7 @@ L_31:
 L_32:
     lw    $t1, -16($s0)
     li    $t2, 0
-   bgt    $t1, $t2, L_34
+    bgt    $t1, $t2, L_34
 
 L_33:
     j    L_38
@@ -153,7 +153,7 @@ L_33:
 L_34:
     li    $t9, 10
     li    $v0, 1
-    move  $a0, $t9
+    move    $a0, $t9
     syscall
     addi    $a0, $0, 0xA
     addi    $v0, $0, 0xB
@@ -162,7 +162,7 @@ L_34:
 L_35:
     lw    $t1, -16($s0)
     li    $t2, 100
-   sub    $t1, $t1, $t2
+    sub    $t1, $t1, $t2
     sw    $t1, -32($sp)
 
 L_36:
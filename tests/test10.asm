@@ -30,19 +30,19 @@ L_5:
     sw    $t1, -16($s0)
 
 L_6:
-    addi    $fp, $sp, 20
+    addi    $fp, $sp, 12
     sw    $sp, -4($fp)
-    addi    $sp, $sp, 20
-    jal     L_0
-    addi    $sp, $sp, -20
+    addi    $sp, $sp, 12
+    jal    L_0
+    addi    $sp, $sp, -12
 
 L_7:
     lw    $ra, 0($sp)
     jr    $ra
 
 Lmain:
-    addi  $sp, $sp, 24
-    move  $s0, $sp
+    addi    $sp, $sp, 24
+    move    $s0, $sp
 
 L_9:
     li    $t1, 3
@@ -53,7 +53,7 @@ L_10:
     sw    $t1, -16($s0)
 
 L_11:
-    addi    $fp, $sp, 24
+    addi    $fp, $sp, 20
     lw    $t0, -12($s0)
     sw    $t0, -12($fp)
 
@@ -64,14 +64,14 @@ L_12:
 L_13:
     lw    $t0, -4($sp)
     sw    $t0, -4($fp)
-    addi    $sp, $sp, 24
-    jal     L_4
-    addi    $sp, $sp, -24
+    addi    $sp, $sp, 20
+    jal    L_4
+    addi    $sp, $sp, -20
 
 L_14:
     lw    $t9, -16($s0)
     li    $v0, 1
-    move  $a0, $t9
+    move    $a0, $t9
     syscall
     addi    $a0, $0, 0xA
     addi    $v0, $0, 0xB
@@ -80,7 +80,7 @@ L_14:
 L_15:
     lw    $t9, -20($s0)
     li    $v0, 1
-    move  $a0, $t9
+    move    $a0, $t9
     syscall
     addi    $a0, $0, 0xA
     addi    $v0, $0, 0xB
@@ -3,13 +3,13 @@
     j    Lmain
 
 Lmain:
-    addi  $sp, $sp, 84
-    move  $s0, $sp
+    addi    $sp, $sp, 84
+    move    $s0, $sp
 
 L_1:
     li    $t1, 1
     li    $t2, 2
-   bgt    $t1, $t2, L_3
+    bgt    $t1, $t2, L_3
 
 L_2:
     j    L_6
@@ -17,7 +17,7 @@ L_2:
 L_3:
     lw    $t1, -16($s0)
     li    $t2, 3
-   add    $t1, $t1, $t2
+    add    $t1, $t1, $t2
     sw    $t1, -20($sp)
 
 L_4:
@@ -30,7 +30,7 @@ L_5:
 L_6:
     lw    $t1, -16($s0)
     li    $t2, 4
-   add    $t1, $t1, $t2
+    add    $t1, $t1, $t2
     sw    $t1, -24($sp)
 
 L_7:
@@ -40,7 +40,7 @@ L_7:
 L_8:
     lw    $t1, -16($s0)
     li    $t2, 5
-   add    $t1, $t1, $t2
+    add    $t1, $t1, $t2
     sw    $t1, -28($sp)
 
 L_9:
@@ -50,7 +50,7 @@ L_9:
 L_10:
     li    $t1, 6
     li    $t2, 7
-   bgt    $t1, $t2, L_12
+    bgt    $t1, $t2, L_12
 
 L_11:
     j    L_15
@@ -58,7 +58,7 @@ L_11:
 L_12:
     lw    $t1, -16($s0)
     li    $t2, 8
-   add    $t1, $t1, $t2
+    add    $t1, $t1, $t2
     sw    $t1, -32($sp)
 
 L_13:
@@ -71,7 +71,7 @@ L_14:
 L_15:
     lw    $t1, -16($s0)
     li    $t2, 9
-   add    $t1, $t1, $t2
+    add    $t1, $t1, $t2
     sw    $t1, -36($sp)
 
 L_16:
@@ -81,73 +81,73 @@ L_16:
 L_17:
     li    $t1, 0
     li    $t2, 3
-   sub    $t1, $t1, $t2
+    sub    $t1, $t1, $t2
     sw    $t1, -40($sp)
 
 L_18:
     lw    $t1, -40($sp)
     li    $t2, 4
-   add    $t1, $t1, $t2
+    add    $t1, $t1, $t2
     sw    $t1, -44($sp)
 
 L_19:
     li    $t1, 0
     li    $t2, 3
-   sub    $t1, $t1, $t2
+    sub    $t1, $t1, $t2
     sw    $t1, -48($sp)
 
 L_20:
     lw    $t1, -48($sp)
     li    $t2, 10
-   add    $t1, $t1, $t2
+    add    $t1, $t1, $t2
     sw    $t1, -52($sp)
 
 L_21:
     lw    $t1, -44($sp)
     lw    $t2, -52($sp)
-   mul    $t1, $t1, $t2
+    mul    $t1, $t1, $t2
     sw    $t1, -56($sp)
 
 L_22:
     li    $t1, 0
     li    $t2, 3
-   sub    $t1, $t1, $t2
+    sub    $t1, $t1, $t2
     sw    $t1, -60($sp)
 
 L_23:
     lw    $t1, -60($sp)
     li    $t2, 4
-   add    $t1, $t1, $t2
+    add    $t1, $t1, $t2
     sw    $t1, -64($sp)
 
 L_24:
     li    $t1, 0
     li    $t2, 3
-   sub    $t1, $t1, $t2
+    sub    $t1, $t1, $t2
     sw    $t1, -68($sp)
 
 L_25:
     lw    $t1, -68($sp)
     li    $t2, 10
-   add    $t1, $t1, $t2
+    add    $t1, $t1, $t2
     sw    $t1, -72($sp)
 
 L_26:
     lw    $t1, -64($sp)
     lw    $t2, -72($sp)
-   mul    $t1, $t1, $t2
+    mul    $t1, $t1, $t2
     sw    $t1, -76($sp)
 
 L_27:
     lw    $t1, -56($sp)
     lw    $t2, -76($sp)
-   add    $t1, $t1, $t2
+    add    $t1, $t1, $t2
     sw    $t1, -80($sp)
 
 L_28:
     lw    $t9, -80($sp)
     li    $v0, 1
-    move  $a0, $t9
+    move    $a0, $t9
     syscall
     addi    $a0, $0, 0xA
     addi    $v0, $0, 0xB
@@ -156,7 +156,7 @@ L_28:
 L_29:
     li    $t9, 1000
     li    $v0, 1
-    move  $a0, $t9
+    move    $a0, $t9
     syscall
     addi    $a0, $0, 0xA
     addi    $v0, $0, 0xB
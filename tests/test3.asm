@@ -8,7 +8,7 @@ L_0:
 L_1:
     lw    $t1, -12($sp)
     li    $t2, 1
-   add    $t1, $t1, $t2
+    add    $t1, $t1, $t2
     sw    $t1, -20($sp)
 
 L_2:
@@ -31,15 +31,15 @@ L_5:
     jr    $ra
 
 Lmain:
-    addi  $sp, $sp, 28
-    move  $s0, $sp
+    addi    $sp, $sp, 28
+    move    $s0, $sp
 
 L_7:
     li    $t1, 1
     sw    $t1, -12($s0)
 
 L_8:
-    addi    $fp, $sp, 28
+    addi    $fp, $sp, 24
     lw    $t0, -12($s0)
     sw    $t0, -12($fp)
 
@@ -54,9 +54,9 @@ L_10:
 L_11:
     lw    $t0, -4($sp)
     sw    $t0, -4($fp)
-    addi    $sp, $sp, 28
-    jal     L_0
-    addi    $sp, $sp, -28
+    addi    $sp, $sp, 24
+    jal    L_0
+    addi    $sp, $sp, -24
 
 L_12:
     lw    $t1, -24($sp)
@@ -65,7 +65,7 @@ L_12:
 L_13:
     lw    $t9, -16($s0)
     li    $v0, 1
-    move  $a0, $t9
+    move    $a0, $t9
     syscall
     addi    $a0, $0, 0xA
     addi    $v0, $0, 0xB
@@ -74,7 +74,7 @@ L_13:
 L_14:
     lw    $t9, -20($s0)
     li    $v0, 1
-    move  $a0, $t9
+    move    $a0, $t9
     syscall
     addi    $a0, $0, 0xA
     addi    $v0, $0, 0xB
@@ -3,8 +3,8 @@
     j    Lmain
 
 Lmain:
-    addi  $sp, $sp, 40
-    move  $s0, $sp
+    addi    $sp, $sp, 40
+    move    $s0, $sp
 
 L_1:
     li    $t1, 50
@@ -21,7 +21,7 @@ L_3:
 L_4:
     lw    $t1, -16($s0)
     li    $t2, 70
-   blt    $t1, $t2, L_6
+    blt    $t1, $t2, L_6
 
 L_5:
     j    L_13
@@ -29,13 +29,13 @@ L_5:
 L_6:
     li    $t1, 0
     li    $t2, 300
-   sub    $t1, $t1, $t2
+    sub    $t1, $t1, $t2
     sw    $t1, -24($sp)
 
 L_7:
     lw    $t1, -16($s0)
     lw    $t2, -24($sp)
-   bgt    $t1, $t2, L_9
+    bgt    $t1, $t2, L_9
 
 L_8:
     j    L_13
@@ -43,7 +43,7 @@ L_8:
 L_9:
     lw    $t1, -16($s0)
     li    $t2, 10
-   sub    $t1, $t1, $t2
+    sub    $t1, $t1, $t2
     sw    $t1, -28($sp)
 
 L_10:
@@ -53,7 +53,7 @@ L_10:
 L_11:
     lw    $t9, -16($s0)
     li    $v0, 1
-    move  $a0, $t9
+    move    $a0, $t9
     syscall
     addi    $a0, $0, 0xA
     addi    $v0, $0, 0xB
@@ -65,7 +65,7 @@ L_12:
 L_13:
     lw    $t1, -20($s0)
     li    $t2, 4
-   bgt    $t1, $t2, L_15
+    bgt    $t1, $t2, L_15
 
 L_14:
     j    L_18
@@ -73,7 +73,7 @@ L_14:
 L_15:
     lw    $t1, -20($s0)
     li    $t2, 1
-   sub    $t1, $t1, $t2
+    sub    $t1, $t1, $t2
     sw    $t1, -32($sp)
 
 L_16:
@@ -86,7 +86,7 @@ L_17:
 L_18:
     lw    $t1, -12($s0)
     li    $t2, 30
-   bgt    $t1, $t2, L_20
+    bgt    $t1, $t2, L_20
 
 L_19:
     j    L_23
@@ -94,7 +94,7 @@ L_19:
 L_20:
     lw    $t1, -12($s0)
     li    $t2, 5
-   sub    $t1, $t1, $t2
+    sub    $t1, $t1, $t2
     sw    $t1, -36($sp)
 
 L_21:
@@ -107,7 +107,7 @@ L_22:
 L_23:
     lw    $t9, -12($s0)
     li    $v0, 1
-    move  $a0, $t9
+    move    $a0, $t9
     syscall
     addi    $a0, $0, 0xA
     addi    $v0, $0, 0xB
@@ -116,7 +116,7 @@ L_23:
 L_24:
     lw    $t9, -20($s0)
     li    $v0, 1
-    move  $a0, $t9
+    move    $a0, $t9
     syscall
     addi    $a0, $0, 0xA
     addi    $v0, $0, 0xB
@@ -125,7 +125,7 @@ L_24:
 L_25:
     lw    $t9, -16($s0)
     li    $v0, 1
-    move  $a0, $t9
+    move    $a0, $t9
     syscall
     addi    $a0, $0, 0xA
     addi    $v0, $0, 0xB
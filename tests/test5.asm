@@ -24,15 +24,15 @@ L_4:
     sw    $ra, 0($sp)
 
 L_5:
-    addi    $fp, $sp, 20
+    addi    $fp, $sp, 32
     addi    $t0, $sp, -16
     sw    $t0, -8($fp)
 
 L_6:
     sw    $sp, -4($fp)
-    addi    $sp, $sp, 20
-    jal     L_0
-    addi    $sp, $sp, -20
+    addi    $sp, $sp, 32
+    jal    L_0
+    addi    $sp, $sp, -32
 
 L_7:
     lw    $t1, -16($sp)
@@ -48,8 +48,8 @@ L_9:
     jr    $ra
 
 Lmain:
-    addi  $sp, $sp, 20
-    move  $s0, $sp
+    addi    $sp, $sp, 20
+    move    $s0, $sp
 
 L_11:
     addi    $fp, $sp, 20
@@ -60,13 +60,13 @@ L_12:
     lw    $t0, -4($sp)
     sw    $t0, -4($fp)
     addi    $sp, $sp, 20
-    jal     L_4
+    jal    L_4
     addi    $sp, $sp, -20
 
 L_13:
     lw    $t9, -16($sp)
     li    $v0, 1
-    move  $a0, $t9
+    move    $a0, $t9
     syscall
     addi    $a0, $0, 0xA
     addi    $v0, $0, 0xB
@@ -75,7 +75,7 @@ L_13:
 L_14:
     lw    $t9, -12($s0)
     li    $v0, 1
-    move  $a0, $t9
+    move    $a0, $t9
     syscall
     addi    $a0, $0, 0xA
     addi    $v0, $0, 0xB
@@ -8,7 +8,7 @@ L_0:
 L_1:
     lw    $t1, -12($sp)
     li    $t2, 1
-   beq    $t1, $t2, L_3
+    beq    $t1, $t2, L_3
 
 L_2:
     j    L_5
@@ -24,7 +24,7 @@ L_4:
 L_5:
     lw    $t1, -12($sp)
     li    $t2, 1
-   sub    $t1, $t1, $t2
+    sub    $t1, $t1, $t2
     sw    $t1, -20($sp)
 
 L_6:
@@ -34,7 +34,7 @@ L_6:
 L_7:
     lw    $t9, -12($sp)
     li    $v0, 1
-    move  $a0, $t9
+    move    $a0, $t9
     syscall
     addi    $a0, $0, 0xA
     addi    $v0, $0, 0xB
@@ -59,7 +59,7 @@ L_11:
     lw    $t0, -4($sp)
     sw    $t0, -4($fp)
     addi    $sp, $sp, 28
-    jal     L_0
+    jal    L_0
     addi    $sp, $sp, -28
 
 L_12:
@@ -72,8 +72,8 @@ L_13:
     jr    $ra
 
 Lmain:
-    addi  $sp, $sp, 28
-    move  $s0, $sp
+    addi    $sp, $sp, 28
+    move    $s0, $sp
 
 L_15:
     li    $t1, 10
@@ -100,7 +100,7 @@ L_20:
     lw    $t0, -4($sp)
     sw    $t0, -4($fp)
     addi    $sp, $sp, 28
-    jal     L_0
+    jal    L_0
     addi    $sp, $sp, -28
 
 L_21:
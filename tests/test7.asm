@@ -10,7 +10,7 @@ L_1:
     lw    $t1, 0($t0)
     lw    $t0, -16($sp)
     lw    $t2, 0($t0)
-   bgt    $t1, $t2, L_3
+    bgt    $t1, $t2, L_3
 
 L_2:
     j    L_5
@@ -33,8 +33,8 @@ L_6:
     jr    $ra
 
 Lmain:
-    addi  $sp, $sp, 32
-    move  $s0, $sp
+    addi    $sp, $sp, 32
+    move    $s0, $sp
 
 L_8:
     li    $t1, 1
@@ -45,7 +45,7 @@ L_9:
     sw    $t1, -16($s0)
 
 L_10:
-    addi    $fp, $sp, 32
+    addi    $fp, $sp, 20
     addi    $t0, $sp, -12
     sw    $t0, -12($fp)
 
@@ -56,14 +56,14 @@ L_11:
 L_12:
     lw    $t0, -4($sp)
     sw    $t0, -4($fp)
-    addi    $sp, $sp, 32
-    jal     L_0
-    addi    $sp, $sp, -32
+    addi    $sp, $sp, 20
+    jal    L_0
+    addi    $sp, $sp, -20
 
 L_13:
     lw    $t9, -12($s0)
     li    $v0, 1
-    move  $a0, $t9
+    move    $a0, $t9
     syscall
     addi    $a0, $0, 0xA
     addi    $v0, $0, 0xB
@@ -30,15 +30,15 @@ L_4:
     sw    $ra, 0($sp)
 
 L_5:
-    addi    $fp, $sp, 24
+    addi    $fp, $sp, 12
     addi    $t0, $sp, -20
     sw    $t0, -8($fp)
 
 L_6:
     sw    $sp, -4($fp)
-    addi    $sp, $sp, 24
-    jal     L_0
-    addi    $sp, $sp, -24
+    addi    $sp, $sp, 12
+    jal    L_0
+    addi    $sp, $sp, -12
 
 L_7:
     lw    $t1, -20($sp)
@@ -49,8 +49,8 @@ L_8:
     jr    $ra
 
 Lmain:
-    addi  $sp, $sp, 24
-    move  $s0, $sp
+    addi    $sp, $sp, 24
+    move    $s0, $sp
 
 L_10:
     li    $t1, 3
@@ -73,13 +73,13 @@ L_14:
     lw    $t0, -4($sp)
     sw    $t0, -4($fp)
     addi    $sp, $sp, 24
-    jal     L_4
+    jal    L_4
     addi    $sp, $sp, -24
 
 L_15:
     lw    $t9, -12($s0)
     li    $v0, 1
-    move  $a0, $t9
+    move    $a0, $t9
     syscall
     addi    $a0, $0, 0xA
     addi    $v0, $0, 0xB
@@ -88,7 +88,7 @@ L_15:
 L_16:
     lw    $t9, -16($s0)
     li    $v0, 1
-    move  $a0, $t9
+    move    $a0, $t9
     syscall
     addi    $a0, $0, 0xA
     addi    $v0, $0, 0xB
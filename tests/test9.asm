@@ -10,7 +10,7 @@ L_1:
     addi    $t0, $t0, -12
     lw    $t1, 0($t0)
     li    $t2, 1
-   add    $t1, $t1, $t2
+    add    $t1, $t1, $t2
     sw    $t1, -12($sp)
 
 L_2:
@@ -40,15 +40,15 @@ L_6:
     sw    $ra, 0($sp)
 
 L_7:
-    addi    $fp, $sp, 24
+    addi    $fp, $sp, 16
     addi    $t0, $sp, -20
     sw    $t0, -8($fp)
 
 L_8:
     sw    $sp, -4($fp)
-    addi    $sp, $sp, 24
-    jal     L_0
-    addi    $sp, $sp, -24
+    addi    $sp, $sp, 16
+    jal    L_0
+    addi    $sp, $sp, -16
 
 L_9:
     lw    $t1, -20($sp)
@@ -64,15 +64,15 @@ L_11:
     jr    $ra
 
 Lmain:
-    addi  $sp, $sp, 32
-    move  $s0, $sp
+    addi    $sp, $sp, 32
+    move    $s0, $sp
 
 L_13:
     li    $t1, 100
     sw    $t1, -12($s0)
 
 L_14:
-    addi    $fp, $sp, 32
+    addi    $fp, $sp, 24
     lw    $t0, -12($s0)
     sw    $t0, -12($fp)
 
@@ -87,9 +87,9 @@ L_16:
 L_17:
     lw    $t0, -4($sp)
     sw    $t0, -4($fp)
-    addi    $sp, $sp, 32
-    jal     L_6
-    addi    $sp, $sp, -32
+    addi    $sp, $sp, 24
+    jal    L_6
+    addi    $sp, $sp, -24
 
 L_18:
     lw    $t1, -28($sp)
@@ -98,7 +98,7 @@ L_18:
 L_19:
     lw    $t9, -20($s0)
     li    $v0, 1
-    move  $a0, $t9
+    move    $a0, $t9
     syscall
     addi    $a0, $0, 0xA
     addi    $v0, $0, 0xB